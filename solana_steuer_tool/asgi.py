@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Asynchrone Views (z.B. ``wallet_transactions_async_view``) laufen nur unter einem
+ASGI-Server ohne Thread-Blockade, z.B.:
+
+    gunicorn -k uvicorn.workers.UvicornWorker solana_steuer_tool.asgi:application
 """
 
 import os
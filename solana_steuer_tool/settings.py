@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os # Hinzugefügt
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "wallet_manager.middleware.RequestMetricsMiddleware", # Zeitmessung pro Seitenaufruf (RPC/DB/Template), zuerst, damit alles erfasst wird
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware", # Whitenoise Middleware hinzugefügt
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -96,6 +98,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Der Cache muss von allen Gunicorn-Workern geteilt werden (z.B. für die Invalidierung der
+# Transaktionsseiten), daher standardmäßig dateibasiert statt prozesslokal. Für mehrere Hosts
+# z.B. DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache und DJANGO_CACHE_LOCATION=redis://...
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get('DJANGO_CACHE_BACKEND', "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get('DJANGO_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), "solana_steuer_tool_cache")),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -139,6 +155,26 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 
+# Logging
+# Meldungen der App (Logger `wallet_manager.*`) gehen auf stderr, z.B. ins journald von systemd.
+# LOG_FORMAT=json gibt eine JSON-Zeile pro Meldung aus (mit Feldern wie wallet, method, rpc_ms; siehe
+# wallet_manager/structured_logging.py), LOG_LEVEL steuert die Ausführlichkeit (DEBUG, INFO, WARNING, ...).
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "text": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"},
+        "json": {"()": "wallet_manager.structured_logging.JSONFormatter"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": os.environ.get('LOG_FORMAT', 'text')},
+    },
+    "loggers": {
+        "wallet_manager": {"handlers": ["console"], "level": os.environ.get('LOG_LEVEL', 'INFO'), "propagate": False},
+    },
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -17,8 +17,10 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include # include hinzugefügt
+from wallet_manager.views import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('wallets/', include('wallet_manager.urls', namespace='wallet_manager')), # wallet_manager URLs eingebunden
+    path('metrics', metrics_view, name='metrics'), # Prometheus-Kennzahlen (siehe wallet_manager/metrics.py)
 ]
@@ -0,0 +1,389 @@
+"""
+Benchmarks für Übersichtsseite, Import und Dekodierer, ausgeführt von `manage.py benchmark`.
+
+Alle Messungen laufen gegen eine eigene Testdatenbank (wie bei `manage.py test`) und einen lokalen
+Mock-RPC-Server (siehe mock_rpc.py), nie gegen Mainnet oder die Produktionsdatenbank. Gemessen werden:
+
+*   `decoder`: `describe_transaction` und `compute_balance_deltas` (Transaktionen pro Sekunde).
+*   `ingest`: `ingest_transactions` ohne RPC (Transaktionen pro Sekunde).
+*   `sync`: Abruf über `SolanaAPI` (Signaturseiten, JSON-RPC-Batches) und Speichern, wie im Sync-Worker.
+    Hier wirken Latenz, Fehler und Rate Limits des Mock-Servers.
+*   `view_*`: Antwortzeit (p50/p95) von `wallet_transactions_view` ohne und mit Seiten-Cache, als
+    bedingte Anfrage (304) und für eine weiter hinten liegende Seite.
+
+Jede Stufe wird für den Speicherbedarf ein zweites Mal unter tracemalloc ausgeführt, da tracemalloc die
+Laufzeit verfälscht. Die Ergebnisse werden als JSON gespeichert und mit einem früheren Lauf verglichen.
+"""
+import datetime
+import glob
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from .decoder import compute_balance_deltas, describe_transaction
+from .ingest import ingest_transactions
+from .metrics import temporary_registry
+from .mock_rpc import MockRPCServer, RPCFixtures
+from .models import Transaction, Wallet, WalletTransaction
+from .page_cache import invalidate_wallet_pages, mark_synced
+from .rate_limit import RateLimiter
+from .rpc_cache import RPCCache
+from .rpc_pool import get_endpoint_stats
+from .solana_utils import SolanaAPI, get_health_state
+from .sync import SignaturesUnavailable, sync_new_transactions, sync_older_transactions
+
+RESULT_FORMAT_VERSION = 1
+# Abweichung (Prozent), ab der eine Verschlechterung gegenüber dem Vergleichslauf als Regression gilt.
+DEFAULT_REGRESSION_THRESHOLD = 10.0
+# So viele Abrufe ohne Fortschritt beenden die sync-Stufe (z.B. bei hoher Fehlerrate).
+MAX_STALLED_SYNCS = 3
+
+# Die Benchmarks verwenden einen eigenen Cache im Speicher, damit Seiten- und Sync-Einträge der
+# laufenden Anwendung weder gelesen noch überschrieben werden.
+BENCHMARK_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "wallet-benchmark"}}
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    """
+    Fasst Laufzeiten (Sekunden) in Millisekunden zusammen.
+    """
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": ms(percentile(latencies, 0.5)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": ms(max(latencies)) if latencies else None,
+    }
+
+
+def _throughput(count: int, elapsed: float) -> Optional[float]:
+    return round(count / elapsed, 1) if elapsed > 0 else None
+
+
+def _max_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError: # z.B. Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet Kilobyte, macOS Bytes.
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True,
+                              text=True, timeout=5, check=True).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@contextmanager
+def isolated_environment(verbose: bool = False) -> Iterator[None]:
+    """
+    Legt wie `manage.py test` eine leere Testdatenbank an (Name mit Präfix "test_") und verwendet einen
+    Cache im Speicher sowie ein eigenes Kennzahlen-Verzeichnis. Ohne `verbose` werden nur Fehler der
+    Anwendung protokolliert.
+    """
+    app_logger = logging.getLogger("wallet_manager")
+    previous_level = app_logger.level
+    if not verbose:
+        app_logger.setLevel(logging.ERROR)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES), tempfile.TemporaryDirectory() as metrics_dir, \
+                temporary_registry(metrics_dir):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        app_logger.setLevel(previous_level)
+
+
+def _reset_transactions() -> None:
+    # Verknüpfungen, Saldoänderungen und Rohdaten hängen per CASCADE an den Transaktionen.
+    Transaction.objects.all().delete()
+    Wallet.objects.all().delete()
+
+
+def measure(setup: Callable[[], Any], run: Callable[[Any], Dict[str, Any]], trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Führt `run(setup())` aus und ergänzt bei `trace_memory` den Spitzenwert des Python-Speichers
+    aus einem zweiten Durchlauf unter tracemalloc.
+    """
+    metrics = run(setup())
+    if trace_memory:
+        state = setup()
+        tracemalloc.start()
+        try:
+            run(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        metrics["peak_memory_kb"] = peak // 1024
+    return metrics
+
+
+def benchmark_decoder(fixtures: RPCFixtures, rounds: int = 5, trace_memory: bool = True) -> Dict[str, Any]:
+    details = fixtures.details()
+
+    def run(_) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        for _ in range(max(1, rounds)):
+            for tx_detail in details:
+                describe_transaction(tx_detail)
+                compute_balance_deltas(fixtures.address, tx_detail)
+        elapsed = time.perf_counter() - started_at
+        return {"transactions": len(details) * max(1, rounds), "elapsed_s": round(elapsed, 3),
+                "transactions_per_second": _throughput(len(details) * max(1, rounds), elapsed)}
+
+    return measure(lambda: None, run, trace_memory)
+
+
+def benchmark_ingest(fixtures: RPCFixtures, trace_memory: bool = True) -> Dict[str, Any]:
+    details = fixtures.details()
+    sig_infos = {sig_info["signature"]: sig_info for sig_info in fixtures.signatures}
+
+    def setup() -> Wallet:
+        _reset_transactions()
+        return Wallet.objects.create(address=fixtures.address)
+
+    def run(wallet: Wallet) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        result = ingest_transactions(wallet, details, sig_infos)
+        elapsed = time.perf_counter() - started_at
+        return {"transactions": result.inserted, "elapsed_s": round(elapsed, 3),
+                "transactions_per_second": _throughput(result.inserted, elapsed)}
+
+    return measure(setup, run, trace_memory)
+
+
+def benchmark_sync(fixtures: RPCFixtures, server: MockRPCServer, page_size: int = 100,
+                   batch_size: Optional[int] = None, trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Importiert die Historie über den Mock-Server: erst die neueste Seite (`sync_new_transactions`),
+    dann rückwärts blätternd (`sync_older_transactions`), bis alle Transaktionen gespeichert sind oder
+    MAX_STALLED_SYNCS Abrufe in Folge (auch nicht abrufbare Signaturseiten) nichts gespeichert haben.
+    """
+    state_path = os.path.join(tempfile.gettempdir(), f"wallet_benchmark_rate_limit_{os.getpid()}.json")
+
+    def setup() -> Tuple[Wallet, SolanaAPI]:
+        _reset_transactions()
+        server.reset_stats()
+        get_endpoint_stats(server.url).samples.clear()
+        # Ein im vorigen Lauf geöffneter Circuit Breaker soll die Messung nicht verfälschen.
+        get_health_state(server.url).record_success()
+        # Ohne Cache und mit eigenem (unbegrenztem) Limiter, damit jeder Lauf alle Abrufe misst.
+        sol_api = SolanaAPI(rpc_endpoint=server.url, batch_size=batch_size, cache=RPCCache())
+        sol_api.rate_limiter = RateLimiter({}, state_path)
+        return Wallet.objects.create(address=fixtures.address), sol_api
+
+    def run(state: Tuple[Wallet, SolanaAPI]) -> Dict[str, Any]:
+        wallet, sol_api = state
+        started_at = time.perf_counter()
+        stalled = 0
+        unavailable = 0
+        stored = 0
+        while stored < len(fixtures) and stalled < MAX_STALLED_SYNCS:
+            # Solange nichts gespeichert ist (z.B. nach einem Fehler beim ersten Abruf), wie im Sync-Worker von vorn.
+            try:
+                if stored:
+                    progressed = sync_older_transactions(wallet, sol_api, page_size)
+                else:
+                    progressed = sync_new_transactions(wallet, sol_api, initial_limit=page_size)
+            except SignaturesUnavailable:
+                # Signaturseite nicht abrufbar (eingestreute Fehler, Rate Limit): zählt als Stillstand.
+                progressed = 0
+                unavailable += 1
+            stalled = 0 if progressed else stalled + 1
+            stored = WalletTransaction.objects.filter(wallet=wallet).count()
+        elapsed = time.perf_counter() - started_at
+        rpc = get_endpoint_stats(server.url).snapshot()
+        return {
+            "transactions": stored,
+            "complete": stored >= len(fixtures),
+            "elapsed_s": round(elapsed, 3),
+            "transactions_per_second": _throughput(stored, elapsed),
+            "rpc_p50_ms": round(rpc["p50"] * 1000, 3) if rpc["p50"] is not None else None,
+            "rpc_p95_ms": round(rpc["p95"] * 1000, 3) if rpc["p95"] is not None else None,
+            "http_requests": server.stats["http_requests"],
+            "connections": server.stats["connections"],
+            "rate_limited": server.stats["rate_limited"],
+            "server_errors": server.stats["server_errors"],
+            "injected_errors": server.stats["injected_errors"],
+            "signatures_unavailable": unavailable,
+        }
+
+    try:
+        return measure(setup, run, trace_memory)
+    finally:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+
+def _view_latencies(client: Client, url: str, requests: int, before_request: Optional[Callable[[], None]] = None,
+                    **headers) -> Dict[str, Any]:
+    latencies = []
+    status = None
+    for _ in range(requests):
+        if before_request is not None:
+            before_request()
+        started_at = time.perf_counter()
+        response = client.get(url, **headers)
+        latencies.append(time.perf_counter() - started_at)
+        status = response.status_code
+    summary = latency_summary(latencies)
+    summary["status"] = status
+    return summary
+
+
+def benchmark_views(fixtures: RPCFixtures, requests: int = 50, trace_memory: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Misst die Übersichtsseite für das Wallet der Fixtures. Dessen Transaktionen müssen bereits gespeichert sein.
+    Das Wallet gilt als abgeglichen, sodass keine Sync-Aufträge eingestellt werden.
+    """
+    wallet = Wallet.objects.get(address=fixtures.address)
+    client = Client()
+    url = reverse("wallet_manager:wallet_transactions", args=[wallet.address])
+    # Cursor mitten in der Historie für eine ältere Seite.
+    middle = (WalletTransaction.objects.filter(wallet=wallet).order_by("-block_time", "-id")
+              .select_related("transaction")[WalletTransaction.objects.filter(wallet=wallet).count() // 2])
+    deep_url = f"{url}?before={middle.block_time},{middle.transaction.signature}"
+
+    def uncached() -> None:
+        mark_synced(wallet.pk)
+        invalidate_wallet_pages(wallet.pk)
+
+    def queries(page_url: str) -> int:
+        uncached()
+        with CaptureQueriesContext(connection) as captured:
+            client.get(page_url)
+        return len(captured)
+
+    def scenario(page_url: str, before_request: Optional[Callable[[], None]] = None):
+        def run(headers: Optional[Dict[str, str]]) -> Dict[str, Any]:
+            return _view_latencies(client, page_url, requests, before_request, **(headers or {}))
+        return run
+
+    def cached() -> None:
+        mark_synced(wallet.pk)
+        client.get(url)
+
+    def conditional() -> Dict[str, str]:
+        mark_synced(wallet.pk)
+        return {"HTTP_IF_NONE_MATCH": client.get(url)["ETag"]}
+
+    results = {
+        "view_first_page_uncached": measure(lambda: None, scenario(url, uncached), trace_memory),
+        "view_first_page_cached": measure(cached, scenario(url), trace_memory),
+        "view_first_page_not_modified": measure(conditional, scenario(url), trace_memory),
+        "view_deep_page_uncached": measure(lambda: None, scenario(deep_url, uncached), trace_memory),
+    }
+    results["view_first_page_uncached"]["queries"] = queries(url)
+    results["view_deep_page_uncached"]["queries"] = queries(deep_url)
+    return results
+
+
+def run_benchmarks(fixtures: RPCFixtures, server_options: Dict[str, Any], page_size: int = 100,
+                   batch_size: Optional[int] = None, view_requests: int = 50, decoder_rounds: int = 5,
+                   trace_memory: bool = True, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Führt alle Stufen aus und liefert das Ergebnis im Format von `save_results`.
+    """
+    results: Dict[str, Any] = {}
+    with isolated_environment(verbose), MockRPCServer(fixtures, **server_options) as server:
+        results["decoder"] = benchmark_decoder(fixtures, decoder_rounds, trace_memory)
+        results["ingest"] = benchmark_ingest(fixtures, trace_memory)
+        results["sync"] = benchmark_sync(fixtures, server, page_size, batch_size, trace_memory)
+        # Die Seiten werden mit den zuletzt importierten Transaktionen gemessen.
+        if results["sync"]["transactions"]:
+            results.update(benchmark_views(fixtures, view_requests, trace_memory))
+    return {
+        "format": RESULT_FORMAT_VERSION,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "database": connection.vendor,
+        "config": {"transactions": len(fixtures), "page_size": page_size, "batch_size": batch_size,
+                   "view_requests": view_requests, "decoder_rounds": decoder_rounds, **server_options},
+        "max_rss_kb": _max_rss_kb(),
+        "results": results,
+    }
+
+
+def save_results(result: Dict[str, Any], output_dir: str) -> str:
+    """
+    Speichert das Ergebnis als `<Zeitstempel>-<Commit>.json` in `output_dir`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = result["timestamp"].replace(":", "").replace("-", "").replace("+0000", "Z")
+    path = os.path.join(output_dir, f"{stamp}-{result.get('git_commit') or 'unknown'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latest_result(output_dir: str) -> Optional[str]:
+    paths = sorted(glob.glob(os.path.join(output_dir, "*.json")))
+    return paths[-1] if paths else None
+
+
+def _lower_is_better(metric: str) -> Optional[bool]:
+    # Mittelwert und Maximum schwanken zu stark, um sie als Regression zu werten.
+    if metric.endswith(("p50_ms", "p95_ms", "_kb")) or metric == "queries":
+        return True
+    if metric.endswith("_per_second"):
+        return False
+    return None
+
+
+def compare_results(previous: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Vergleicht die Kennzahlen mit bekannter Richtung (p50/p95, Speicher, Abfragen, Durchsatz).
+
+    :return: Pro Kennzahl ein Dictionary mit altem und neuem Wert, Änderung in Prozent und ob sie
+             sich um mehr als `threshold` Prozent verschlechtert hat.
+    """
+    rows = []
+    for stage, metrics in current.get("results", {}).items():
+        previous_metrics = previous.get("results", {}).get(stage, {})
+        for metric, value in metrics.items():
+            lower_is_better = _lower_is_better(metric)
+            old = previous_metrics.get(metric)
+            if lower_is_better is None or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old * 100
+            worse = change if lower_is_better else -change
+            rows.append({"stage": stage, "metric": metric, "previous": old, "current": value,
+                         "change_percent": round(change, 1), "regression": worse > threshold})
+    return rows
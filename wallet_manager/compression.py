@@ -0,0 +1,41 @@
+import json
+import os
+import zlib
+from typing import Any, Tuple
+
+try:
+    import zstandard
+except ImportError: # Optional: ohne zstandard wird zlib verwendet
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+# Kompressionsverfahren für neue Rohdaten. Bereits gespeicherte Daten bleiben mit ihrem Verfahren lesbar.
+DEFAULT_CODEC = os.getenv("TRANSACTION_PAYLOAD_CODEC", CODEC_ZSTD if zstandard else CODEC_ZLIB)
+
+
+def compress_json(data: Any, codec: str = DEFAULT_CODEC) -> Tuple[bytes, str, int]:
+    """
+    Serialisiert `data` kompakt als JSON und komprimiert es.
+
+    :return: Tupel (komprimierte Bytes, verwendetes Verfahren, unkomprimierte Größe in Bytes).
+    """
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if codec == CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=6).compress(raw), CODEC_ZSTD, len(raw)
+    return zlib.compress(raw, 6), CODEC_ZLIB, len(raw)
+
+
+def decompress_json(blob: bytes, codec: str) -> Any:
+    """
+    Dekomprimiert und deserialisiert Daten, die mit `compress_json` erzeugt wurden.
+    """
+    blob = bytes(blob) # MySQL liefert ggf. bytearray/memoryview
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Zum Lesen von zstd-komprimierten Rohdaten muss das Paket 'zstandard' installiert sein.")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = zlib.decompress(blob)
+    return json.loads(raw)
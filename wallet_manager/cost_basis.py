@@ -0,0 +1,338 @@
+"""
+FIFO-Anschaffungskosten und Haltefristen für private Veräußerungsgeschäfte (§ 23 EStG).
+
+Die Saldoänderungen (`BalanceDelta`) eines Portfolios aus einem oder mehreren Wallets werden in
+zeitlicher Reihenfolge verarbeitet. Zugänge bilden Lots pro Mint, Abgänge verbrauchen die ältesten
+Lots zuerst (FIFO). Für jeden Abgang werden Veräußerungserlös, Anschaffungskosten und Gewinn
+ermittelt und danach aufgeteilt, ob die Haltefrist von einem Jahr eingehalten wurde. Fehlt ein Preis,
+werden Lot bzw. Abgang als `price_missing` markiert, statt mit einem Preis von 0 zu rechnen; solche Abgänge
+fließen nicht in die Jahressummen ein, sondern werden dort gezählt.
+
+Überweisungen zwischen den Wallets desselben Portfolios heben sich auf, da die Änderungen pro
+Transaktion über alle Wallets saldiert werden. Der Zustand (offene Lots, Jahressummen, Position)
+wird als `CostBasisSnapshot` gespeichert, sodass neue Transaktionen inkrementell verarbeitet werden.
+"""
+import datetime
+from array import array
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.db.models import Q, QuerySet
+
+from .models import BalanceDelta, CostBasisSnapshot, Wallet
+from .queries import iter_keyset
+
+# Bulk-Preisabfrage: erhält (Mint, Unix-Timestamp)-Paare und liefert den EUR-Preis pro ganzer Einheit.
+PriceLookup = Callable[[Sequence[Tuple[str, int]]], Dict[Tuple[str, int], Optional[Decimal]]]
+
+# Anzahl der BalanceDelta-Zeilen, die gemeinsam gelesen und für die Preise gesammelt abgefragt werden.
+DEFAULT_CHUNK_SIZE = 5000
+
+ZERO = Decimal(0)
+
+# Fristen und Kalenderjahre werden in deutscher Ortszeit bestimmt.
+TAX_TIMEZONE = ZoneInfo("Europe/Berlin")
+
+
+def holding_period_end(block_time: int) -> int:
+    """
+    Ende der Haltefrist (§ 23 EStG, §§ 187, 188 BGB): Ablauf des Kalendertags in deutscher Ortszeit, der ein Jahr
+    nach dem Tag der Anschaffung liegt (Anschaffung am 29.02. -> 28.02.). Eine Veräußerung bis einschließlich
+    zu diesem Zeitpunkt (letzte Sekunde des Tages) ist steuerpflichtig.
+    """
+    acquired = datetime.datetime.fromtimestamp(block_time, tz=TAX_TIMEZONE).date()
+    try:
+        anniversary = acquired.replace(year=acquired.year + 1)
+    except ValueError:
+        anniversary = acquired.replace(year=acquired.year + 1, day=28)
+    next_day = datetime.datetime.combine(anniversary + datetime.timedelta(days=1), datetime.time(), tzinfo=TAX_TIMEZONE)
+    return int(next_day.timestamp()) - 1
+
+
+def tax_year(block_time: int) -> int:
+    """
+    Kalenderjahr (deutsche Ortszeit), dem ein Abgang zugerechnet wird.
+    """
+    return datetime.datetime.fromtimestamp(block_time, tz=TAX_TIMEZONE).year
+
+
+class LotQueue:
+    """
+    Offene Lots eines Mints in Anschaffungsreihenfolge.
+
+    Die Lots liegen in parallelen Arrays; verbrauchte Lots werden nicht einzeln entfernt, sondern
+    über `head` übersprungen und nur gelegentlich abgeschnitten. `missing` markiert Lots, deren
+    Anschaffungspreis unbekannt ist (Kosten 0).
+    """
+    __slots__ = ("times", "amounts", "costs", "missing", "head")
+
+    def __init__(self):
+        self.times = array("q")
+        self.amounts: List[int] = []
+        self.costs: List[Decimal] = []
+        self.missing = array("b")
+        self.head = 0
+
+    def add(self, block_time: int, amount: int, cost: Decimal, price_missing: bool = False) -> None:
+        self.times.append(block_time)
+        self.amounts.append(amount)
+        self.costs.append(cost)
+        self.missing.append(int(price_missing))
+
+    def consume(self, amount: int) -> Tuple[List[Tuple[int, int, Decimal, bool]], int]:
+        """
+        Verbraucht `amount` (Rohbetrag) nach FIFO.
+
+        :return: Tupel (Liste von (Anschaffungszeit, verbrauchter Betrag, anteilige Kosten, Preis fehlt),
+                 nicht gedeckter Betrag).
+        """
+        consumed = []
+        while amount > 0 and self.head < len(self.amounts):
+            index = self.head
+            lot_amount = self.amounts[index]
+            if lot_amount <= amount:
+                consumed.append((self.times[index], lot_amount, self.costs[index], bool(self.missing[index])))
+                amount -= lot_amount
+                self.head += 1
+            else:
+                cost = self.costs[index] * amount / lot_amount
+                consumed.append((self.times[index], amount, cost, bool(self.missing[index])))
+                self.amounts[index] = lot_amount - amount
+                self.costs[index] -= cost
+                amount = 0
+        self._compact()
+        return consumed, amount
+
+    def balance(self) -> int:
+        return sum(self.amounts[self.head:])
+
+    def _compact(self) -> None:
+        if self.head > 1024 and self.head * 2 > len(self.amounts):
+            del self.times[:self.head]
+            del self.amounts[:self.head]
+            del self.costs[:self.head]
+            del self.missing[:self.head]
+            self.head = 0
+
+    def to_state(self) -> Dict[str, list]:
+        return {
+            "t": self.times[self.head:].tolist(),
+            "a": [str(amount) for amount in self.amounts[self.head:]],
+            "c": [str(cost) for cost in self.costs[self.head:]],
+            "m": self.missing[self.head:].tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, list]) -> "LotQueue":
+        queue = cls()
+        queue.times = array("q", state["t"])
+        queue.amounts = [int(amount) for amount in state["a"]]
+        queue.costs = [Decimal(cost) for cost in state["c"]]
+        # Zwischenstände ohne "m" stammen aus der Zeit vor der Markierung fehlender Preise.
+        queue.missing = array("b", state.get("m") or [0] * len(queue.amounts))
+        return queue
+
+
+class Disposal:
+    """
+    Ein Abgang eines Mints mit Erlös, Anschaffungskosten und Aufteilung nach Haltefrist (Beträge in EUR).
+    `uncovered_amount` ist der Teil des Abgangs, für den keine Anschaffung bekannt ist. `price_missing` ist
+    gesetzt, wenn der Preis des Abgangs oder einer verbrauchten Anschaffung fehlt; die EUR-Beträge sind dann unvollständig.
+    """
+    __slots__ = ("transaction_id", "block_time", "mint", "amount", "decimals", "proceeds", "cost_basis",
+                 "taxable_gain", "tax_free_gain", "uncovered_amount", "price_missing")
+
+    def __init__(self, transaction_id: int, block_time: int, mint: str, amount: int, decimals: int):
+        self.transaction_id = transaction_id
+        self.block_time = block_time
+        self.mint = mint
+        self.amount = amount
+        self.decimals = decimals
+        self.proceeds = ZERO
+        self.cost_basis = ZERO
+        self.taxable_gain = ZERO
+        self.tax_free_gain = ZERO
+        self.uncovered_amount = 0
+        self.price_missing = False
+
+    @property
+    def gain(self) -> Decimal:
+        return self.taxable_gain + self.tax_free_gain
+
+
+_YEAR_FIELDS = ("proceeds", "cost_basis", "taxable_gain", "tax_free_gain")
+# Anzahl der Abgänge eines Jahres, die wegen fehlender Preise nicht in den Summen enthalten sind.
+PRICE_MISSING_FIELD = "price_missing"
+# Version des gespeicherten Zwischenstands; ältere Snapshots werden verworfen und neu berechnet.
+STATE_VERSION = 2
+
+
+class CostBasisEngine:
+    """
+    Verarbeitet Saldoänderungen nach FIFO und summiert die Ergebnisse pro Kalenderjahr.
+
+    :param price_lookup: Bulk-Preisabfrage (siehe `PriceLookup`). Ohne Preise werden nur Mengen und
+                         Haltefristen ermittelt; alle EUR-Beträge sind dann 0. Mit Preisabfrage wird ein
+                         fehlender Preis (None) als `price_missing` markiert.
+    """
+    def __init__(self, price_lookup: Optional[PriceLookup] = None):
+        self.price_lookup = price_lookup
+        self.lots: Dict[str, LotQueue] = {}
+        self.yearly: Dict[int, Dict[str, Decimal]] = {}
+        self.disposals: List[Disposal] = []
+        self.cursor: Tuple[int, int] = (0, 0)
+        self.event_count = 0
+
+    def process_chunk(self, rows: Sequence[Tuple[int, int, str, Decimal, int]]) -> None:
+        """
+        Verarbeitet BalanceDelta-Zeilen (transaction_id, block_time, mint, delta, decimals),
+        sortiert nach (block_time, transaction_id). Die Preise des Blocks werden gesammelt abgefragt.
+        """
+        if not rows:
+            return
+        prices: Dict[Tuple[str, int], Optional[Decimal]] = {}
+        if self.price_lookup is not None:
+            prices = self.price_lookup(list({(mint, block_time) for _, block_time, mint, _, _ in rows}))
+
+        # Änderungen pro Transaktion und Mint über alle Wallets des Portfolios saldieren.
+        netted: Dict[Tuple[int, int, str], List] = {}
+        for transaction_id, block_time, mint, delta, decimals in rows:
+            entry = netted.setdefault((block_time, transaction_id, mint), [0, decimals])
+            entry[0] += int(delta)
+        for (block_time, transaction_id, mint), (delta, decimals) in netted.items():
+            if delta:
+                price = prices.get((mint, block_time)) if self.price_lookup is not None else ZERO
+                self._apply(transaction_id, block_time, mint, delta, decimals, price)
+
+        last = rows[-1]
+        self.cursor = (last[1], last[0])
+        self.event_count += len(rows)
+
+    def _apply(self, transaction_id: int, block_time: int, mint: str, delta: int, decimals: int,
+               price: Optional[Decimal]) -> None:
+        """
+        Verbucht eine saldierte Änderung. `price` None bedeutet: kein Preis bekannt.
+        """
+        scale = Decimal(10) ** decimals
+        queue = self.lots.get(mint)
+        if queue is None:
+            queue = self.lots[mint] = LotQueue()
+        if delta > 0:
+            queue.add(block_time, delta, delta / scale * (price or ZERO), price_missing=price is None)
+            return
+
+        amount = -delta
+        disposal = Disposal(transaction_id, block_time, mint, amount, decimals)
+        disposal.price_missing = price is None
+        price = price or ZERO
+        consumed, disposal.uncovered_amount = queue.consume(amount)
+        for acquired_at, consumed_amount, cost, cost_missing in consumed:
+            disposal.price_missing = disposal.price_missing or cost_missing
+            proceeds = consumed_amount / scale * price
+            disposal.proceeds += proceeds
+            disposal.cost_basis += cost
+            if block_time <= holding_period_end(acquired_at):
+                disposal.taxable_gain += proceeds - cost
+            else:
+                disposal.tax_free_gain += proceeds - cost
+        if disposal.uncovered_amount:
+            # Ohne bekannte Anschaffung (z.B. unvollständige Historie) wird der Erlös voll als steuerpflichtig gewertet.
+            proceeds = disposal.uncovered_amount / scale * price
+            disposal.proceeds += proceeds
+            disposal.taxable_gain += proceeds
+        self.disposals.append(disposal)
+
+        totals = self.yearly.setdefault(tax_year(block_time), {field: ZERO for field in _YEAR_FIELDS})
+        if disposal.price_missing:
+            # Mit Kosten bzw. Erlös 0 wäre der Gewinn frei erfunden; der Abgang wird nur gezählt.
+            totals[PRICE_MISSING_FIELD] = totals.get(PRICE_MISSING_FIELD, ZERO) + 1
+            return
+        for field in _YEAR_FIELDS:
+            totals[field] += getattr(disposal, field)
+
+    def to_state(self) -> Dict[str, dict]:
+        return {
+            "version": STATE_VERSION,
+            "lots": {mint: queue.to_state() for mint, queue in self.lots.items() if queue.head < len(queue.amounts)},
+            "yearly": {str(year): {field: str(value) for field, value in totals.items()} for year, totals in self.yearly.items()},
+        }
+
+    def load_state(self, state: Dict[str, dict], cursor: Tuple[int, int], event_count: int) -> None:
+        self.lots = {mint: LotQueue.from_state(lot_state) for mint, lot_state in state.get("lots", {}).items()}
+        self.yearly = {int(year): {field: Decimal(value) for field, value in totals.items()}
+                       for year, totals in state.get("yearly", {}).items()}
+        self.cursor = cursor
+        self.event_count = event_count
+
+
+def _scope_key(wallets: Iterable[Wallet]) -> str:
+    return ",".join(str(wallet_id) for wallet_id in sorted({wallet.pk for wallet in wallets}))
+
+
+def _delta_chunks(deltas: QuerySet, chunk_size: int) -> Iterator[List[Tuple[int, int, str, Decimal, int]]]:
+    """
+    Liefert die Saldoänderungen als Blöcke von Zeilen (transaction_id, block_time, mint, delta, decimals),
+    sortiert nach (block_time, transaction_id). Blöcke werden nur an Transaktionsgrenzen geschnitten,
+    damit pro Transaktion saldiert werden kann.
+    """
+    rows = deltas.values_list("block_time", "transaction_id", "id", "mint", "delta", "decimals")
+    chunk: List[Tuple[int, int, str, Decimal, int]] = []
+    for block_time, transaction_id, _, mint, delta, decimals in iter_keyset(rows, ("block_time", "transaction_id", "id"), chunk_size):
+        if len(chunk) >= chunk_size and transaction_id != chunk[-1][0]:
+            yield chunk
+            chunk = []
+        chunk.append((transaction_id, block_time, mint, delta, decimals))
+    if chunk:
+        yield chunk
+
+
+def compute_cost_basis(wallets: Sequence[Wallet], price_lookup: Optional[PriceLookup] = None,
+                       full: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> CostBasisEngine:
+    """
+    Berechnet FIFO-Lots und Jahressummen für ein Portfolio aus `wallets`.
+
+    Existiert ein Snapshot für genau diese Wallets, werden nur die danach hinzugekommenen
+    Saldoänderungen verarbeitet. Wurden inzwischen ältere Transaktionen nachimportiert (z.B. per
+    Backfill), stimmt die Anzahl der Zeilen bis zur gespeicherten Position nicht mehr und die
+    Berechnung beginnt von vorn.
+
+    :param full: Snapshot ignorieren und die gesamte Historie neu berechnen.
+    :return: Die Engine mit offenen Lots, Jahressummen und den Abgängen dieses Laufs.
+    """
+    scope_key = _scope_key(wallets)
+    deltas = BalanceDelta.objects.filter(wallet__in=list(wallets))
+    snapshot, _ = CostBasisSnapshot.objects.get_or_create(scope_key=scope_key)
+    engine = CostBasisEngine(price_lookup)
+
+    last_time, last_transaction_id = snapshot.last_block_time, snapshot.last_transaction_id
+    upto_cursor = Q(block_time__lt=last_time) | Q(block_time=last_time, transaction_id__lte=last_transaction_id)
+    if (not full and snapshot.event_count and snapshot.state.get("version") == STATE_VERSION
+            and deltas.filter(upto_cursor).count() == snapshot.event_count):
+        engine.load_state(snapshot.state, (last_time, last_transaction_id), snapshot.event_count)
+        deltas = deltas.exclude(upto_cursor)
+
+    for chunk in _delta_chunks(deltas, chunk_size):
+        engine.process_chunk(chunk)
+
+    snapshot.state = engine.to_state()
+    snapshot.last_block_time, snapshot.last_transaction_id = engine.cursor
+    snapshot.event_count = engine.event_count
+    snapshot.save()
+    return engine
+
+
+def iter_disposals(wallets: Sequence[Wallet], price_lookup: Optional[PriceLookup] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Disposal]]:
+    """
+    Berechnet die gesamte Historie neu und liefert die Abgänge blockweise, ohne sie zu sammeln.
+
+    Im Speicher liegen nur die offenen Lots und ein Block, z.B. für den Export großer Wallets.
+    Der gespeicherte Snapshot wird weder gelesen noch verändert.
+    """
+    engine = CostBasisEngine(price_lookup)
+    for chunk in _delta_chunks(BalanceDelta.objects.filter(wallet__in=list(wallets)), chunk_size):
+        engine.process_chunk(chunk)
+        if engine.disposals:
+            yield engine.disposals
+            engine.disposals = []
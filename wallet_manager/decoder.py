@@ -0,0 +1,397 @@
+"""
+Dekodierung von Solana-Transaktionen (jsonParsed) in typisierte Ereignisse.
+
+Für jede Transaktion werden alle äußeren Instruktionen und die zugehörigen inneren Instruktionen
+(`meta.innerInstructions`, z.B. Token-Bewegungen aus Swaps per CPI) in einem Durchlauf verarbeitet.
+Die Zuordnung erfolgt über eine Registry, die pro Programm-ID eine Dekodierfunktion hält:
+
+    @register_decoder(MEIN_PROGRAMM_ID)
+    def _decode_mein_programm(instruction, ctx, position):
+        ...
+        return [Ereignis(...)]
+
+Die Ereignisklassen verwenden `__slots__`, damit auch große Mengen (z.B. beim Auswerten aller
+gespeicherten Transaktionen) wenig Speicher brauchen und schnell erzeugt werden.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+ASSOCIATED_TOKEN_PROGRAM_ID = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+STAKE_PROGRAM_ID = "Stake11111111111111111111111111111111111111"
+
+# Verbreitete DEX-/Aggregator-Programme. Deren Instruktionen sind nicht jsonParsed; die eigentlichen
+# Token-Bewegungen erscheinen als innere SPL-Token-Instruktionen.
+DEX_PROGRAMS = {
+    "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4": "Jupiter",
+    "JUP4Fb2cqiRUcaTHdrPC8h2gNsA2ETXiPDD33WcGuJB": "Jupiter",
+    "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8": "Raydium",
+    "CAMMCzo5YL8w4VFF8KVHrK22GGUsp5VTaW7grrKgrWqK": "Raydium CLMM",
+    "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc": "Orca Whirlpool",
+    "9W959DqEETiGZocYWCQPaJ6sBmUzgfxXfqGeTEdp3aQP": "Orca",
+    "LBUZKhRxPF3XUpBCjp4YzTKgLccjZhTSDM9YuVaPwxo": "Meteora DLMM",
+}
+
+LAMPORTS_PER_SOL = 1_000_000_000
+SOL_DECIMALS = 9
+# Platzhalter-Mint für natives SOL in Saldoänderungen (Wrapped SOL behält seinen echten Mint).
+NATIVE_SOL_MINT = "SOL"
+
+# Position einer Instruktion: (Index der äußeren Instruktion, Index der inneren Instruktion oder None).
+Position = Tuple[int, Optional[int]]
+
+
+class Event:
+    """
+    Basisklasse aller Ereignisse. `inner_index` ist None für äußere Instruktionen.
+    """
+    __slots__ = ("program_id", "instruction_index", "inner_index")
+    kind = "event"
+
+    def __init__(self, program_id: str, position: Position):
+        self.program_id = program_id
+        self.instruction_index, self.inner_index = position
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for cls in type(self).__mro__
+                           for name in getattr(cls, "__slots__", ()))
+        return f"{type(self).__name__}({fields})"
+
+
+class SolTransfer(Event):
+    """SOL-Überweisung (System-Programm `transfer`/`transferWithSeed`), Betrag in Lamports."""
+    __slots__ = ("source", "destination", "lamports")
+    kind = "sol_transfer"
+
+    def __init__(self, program_id: str, position: Position, source: str, destination: str, lamports: int):
+        super().__init__(program_id, position)
+        self.source = source
+        self.destination = destination
+        self.lamports = lamports
+
+
+class AccountCreation(Event):
+    """Anlegen eines Kontos (System-Programm `createAccount*`) inkl. eingezahlter Lamports."""
+    __slots__ = ("source", "new_account", "lamports", "owner")
+    kind = "account_creation"
+
+    def __init__(self, program_id: str, position: Position, source: str, new_account: str, lamports: int, owner: Optional[str]):
+        super().__init__(program_id, position)
+        self.source = source
+        self.new_account = new_account
+        self.lamports = lamports
+        self.owner = owner
+
+
+class TokenTransfer(Event):
+    """SPL-Token-Überweisung zwischen Token-Konten. `amount` ist der Rohbetrag (ohne Dezimalstellen)."""
+    __slots__ = ("source", "destination", "authority", "mint", "amount", "decimals")
+    kind = "token_transfer"
+
+    def __init__(self, program_id: str, position: Position, source: str, destination: str, authority: Optional[str],
+                 mint: Optional[str], amount: int, decimals: Optional[int]):
+        super().__init__(program_id, position)
+        self.source = source
+        self.destination = destination
+        self.authority = authority
+        self.mint = mint
+        self.amount = amount
+        self.decimals = decimals
+
+    @property
+    def ui_amount(self) -> Optional[str]:
+        return format_token_amount(self.amount, self.decimals)
+
+
+class TokenMint(Event):
+    """Neu geprägte Token (`mintTo`/`mintToChecked`)."""
+    __slots__ = ("account", "mint", "amount", "decimals")
+    kind = "token_mint"
+
+    def __init__(self, program_id: str, position: Position, account: str, mint: Optional[str], amount: int, decimals: Optional[int]):
+        super().__init__(program_id, position)
+        self.account = account
+        self.mint = mint
+        self.amount = amount
+        self.decimals = decimals
+
+
+class TokenBurn(Event):
+    """Verbrannte Token (`burn`/`burnChecked`)."""
+    __slots__ = ("account", "mint", "amount", "decimals")
+    kind = "token_burn"
+
+    def __init__(self, program_id: str, position: Position, account: str, mint: Optional[str], amount: int, decimals: Optional[int]):
+        super().__init__(program_id, position)
+        self.account = account
+        self.mint = mint
+        self.amount = amount
+        self.decimals = decimals
+
+
+class StakeAction(Event):
+    """Staking-Vorgang (z.B. `initialize`, `delegate`, `deactivate`, `withdraw`, `split`)."""
+    __slots__ = ("action", "stake_account", "lamports")
+    kind = "stake"
+
+    def __init__(self, program_id: str, position: Position, action: str, stake_account: Optional[str], lamports: Optional[int]):
+        super().__init__(program_id, position)
+        self.action = action
+        self.stake_account = stake_account
+        self.lamports = lamports
+
+
+class Swap(Event):
+    """Aufruf eines bekannten DEX-/Aggregator-Programms. Die Token-Bewegungen folgen als innere Ereignisse."""
+    __slots__ = ("dex",)
+    kind = "swap"
+
+    def __init__(self, program_id: str, position: Position, dex: str):
+        super().__init__(program_id, position)
+        self.dex = dex
+
+
+class ProgramCall(Event):
+    """Instruktion ohne eigenen Dekodierer; `action` ist der jsonParsed-Typ, falls vorhanden."""
+    __slots__ = ("action",)
+    kind = "program_call"
+
+    def __init__(self, program_id: str, position: Position, action: Optional[str]):
+        super().__init__(program_id, position)
+        self.action = action
+
+
+class _TxContext:
+    """
+    Pro Transaktion geteilte Daten für die Dekodierer, z.B. die Zuordnung Token-Konto -> Mint,
+    die für `transfer` (ohne Mint-Angabe) aus den Token-Salden abgeleitet wird.
+    """
+    __slots__ = ("tx_detail", "_token_accounts")
+
+    def __init__(self, tx_detail: Dict[str, Any]):
+        self.tx_detail = tx_detail
+        self._token_accounts: Optional[Dict[str, Tuple[str, int]]] = None
+
+    def token_account_info(self, account: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Liefert (Mint, Dezimalstellen) eines Token-Kontos aus pre-/postTokenBalances.
+        """
+        if self._token_accounts is None:
+            account_keys = self.tx_detail.get("transaction", {}).get("message", {}).get("accountKeys", [])
+            meta = self.tx_detail.get("meta") or {}
+            mapping = {}
+            for balance in (meta.get("preTokenBalances") or []) + (meta.get("postTokenBalances") or []):
+                index = balance.get("accountIndex")
+                if index is None or index >= len(account_keys):
+                    continue
+                key = account_keys[index]
+                pubkey = key.get("pubkey") if isinstance(key, dict) else key
+                decimals = (balance.get("uiTokenAmount") or {}).get("decimals")
+                mapping[pubkey] = (balance.get("mint"), decimals)
+            self._token_accounts = mapping
+        return self._token_accounts.get(account, (None, None))
+
+
+Decoder = Callable[[Dict[str, Any], _TxContext, Position], List[Event]]
+_DECODERS: Dict[str, Decoder] = {}
+
+
+def register_decoder(*program_ids: str) -> Callable[[Decoder], Decoder]:
+    """
+    Registriert eine Dekodierfunktion für eine oder mehrere Programm-IDs.
+    """
+    def decorator(func: Decoder) -> Decoder:
+        for program_id in program_ids:
+            _DECODERS[program_id] = func
+        return func
+    return decorator
+
+
+def format_token_amount(amount: int, decimals: Optional[int]) -> str:
+    """
+    Formatiert einen Token-Rohbetrag mit seinen Dezimalstellen (ohne Rundungsfehler von float).
+    """
+    if not decimals:
+        return str(amount)
+    sign = "-" if amount < 0 else ""
+    whole, fraction = divmod(abs(amount), 10 ** decimals)
+    fraction_str = str(fraction).rjust(decimals, "0").rstrip("0")
+    return f"{sign}{whole}.{fraction_str}" if fraction_str else f"{sign}{whole}"
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+@register_decoder(SYSTEM_PROGRAM_ID)
+def _decode_system(instruction: Dict[str, Any], ctx: _TxContext, position: Position) -> List[Event]:
+    parsed = instruction.get("parsed") or {}
+    action = parsed.get("type")
+    info = parsed.get("info") or {}
+    if action in ("transfer", "transferWithSeed"):
+        return [SolTransfer(SYSTEM_PROGRAM_ID, position, info.get("source"), info.get("destination"), _int(info.get("lamports")))]
+    if action in ("createAccount", "createAccountWithSeed"):
+        return [AccountCreation(SYSTEM_PROGRAM_ID, position, info.get("source"), info.get("newAccount"),
+                                _int(info.get("lamports")), info.get("owner"))]
+    return [ProgramCall(SYSTEM_PROGRAM_ID, position, action)]
+
+
+@register_decoder(TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)
+def _decode_token(instruction: Dict[str, Any], ctx: _TxContext, position: Position) -> List[Event]:
+    program_id = instruction.get("programId")
+    parsed = instruction.get("parsed") or {}
+    action = parsed.get("type")
+    info = parsed.get("info") or {}
+    if action in ("transfer", "transferChecked"):
+        token_amount = info.get("tokenAmount")
+        if token_amount:
+            amount, decimals, mint = _int(token_amount.get("amount")), token_amount.get("decimals"), info.get("mint")
+        else:
+            amount = _int(info.get("amount"))
+            mint, decimals = ctx.token_account_info(info.get("source"))
+            if mint is None:
+                mint, decimals = ctx.token_account_info(info.get("destination"))
+        authority = info.get("authority") or info.get("multisigAuthority")
+        return [TokenTransfer(program_id, position, info.get("source"), info.get("destination"), authority, mint, amount, decimals)]
+    if action in ("mintTo", "mintToChecked", "burn", "burnChecked"):
+        token_amount = info.get("tokenAmount") or {}
+        amount = _int(token_amount.get("amount", info.get("amount")))
+        mint, decimals = info.get("mint"), token_amount.get("decimals")
+        if mint is None or decimals is None:
+            account_mint, account_decimals = ctx.token_account_info(info.get("account"))
+            mint = mint or account_mint
+            decimals = account_decimals if decimals is None else decimals
+        event_class = TokenMint if action.startswith("mint") else TokenBurn
+        return [event_class(program_id, position, info.get("account"), mint, amount, decimals)]
+    return [ProgramCall(program_id, position, action)]
+
+
+@register_decoder(STAKE_PROGRAM_ID)
+def _decode_stake(instruction: Dict[str, Any], ctx: _TxContext, position: Position) -> List[Event]:
+    parsed = instruction.get("parsed") or {}
+    info = parsed.get("info") or {}
+    stake_account = info.get("stakeAccount") or info.get("newSplitAccount")
+    lamports = info.get("lamports")
+    return [StakeAction(STAKE_PROGRAM_ID, position, parsed.get("type") or "unknown", stake_account,
+                        _int(lamports) if lamports is not None else None)]
+
+
+def _decode_dex(instruction: Dict[str, Any], ctx: _TxContext, position: Position) -> List[Event]:
+    program_id = instruction.get("programId")
+    return [Swap(program_id, position, DEX_PROGRAMS[program_id])]
+
+
+for _dex_program_id in DEX_PROGRAMS:
+    register_decoder(_dex_program_id)(_decode_dex)
+
+
+def _decode_instruction(instruction: Dict[str, Any], ctx: _TxContext, position: Position) -> List[Event]:
+    program_id = instruction.get("programId")
+    decoder = _DECODERS.get(program_id)
+    if decoder is not None:
+        return decoder(instruction, ctx, position)
+    # `parsed` ist z.B. beim Memo-Programm ein String statt eines Objekts.
+    parsed = instruction.get("parsed")
+    return [ProgramCall(program_id, position, parsed.get("type") if isinstance(parsed, dict) else None)]
+
+
+def decode_transaction(tx_detail: Dict[str, Any]) -> List[Event]:
+    """
+    Dekodiert alle äußeren und inneren Instruktionen einer Transaktion (jsonParsed) in einem Durchlauf.
+
+    :param tx_detail: Das Ergebnis von get_transaction (jsonParsed).
+    :return: Die Ereignisse in Ausführungsreihenfolge (jede äußere Instruktion gefolgt von ihren inneren).
+    """
+    ctx = _TxContext(tx_detail)
+    instructions = tx_detail.get("transaction", {}).get("message", {}).get("instructions", [])
+    inner_by_index = {
+        inner.get("index"): inner.get("instructions") or []
+        for inner in (tx_detail.get("meta") or {}).get("innerInstructions") or []
+    }
+    events: List[Event] = []
+    for index, instruction in enumerate(instructions):
+        events.extend(_decode_instruction(instruction, ctx, (index, None)))
+        for inner_index, inner_instruction in enumerate(inner_by_index.get(index, ())):
+            events.extend(_decode_instruction(inner_instruction, ctx, (index, inner_index)))
+    return events
+
+
+_FALLBACK_ACTIONS = {
+    AccountCreation.kind: "createAccount",
+    TokenMint.kind: "mintTo",
+    TokenBurn.kind: "burn",
+    SolTransfer.kind: "transfer",
+}
+
+
+def describe_events(events: List[Event]) -> str:
+    """
+    Erzeugt eine kurze, lesbare Beschreibung aus den dekodierten Ereignissen.
+    Swaps und Staking haben Vorrang vor den darin enthaltenen Überweisungen.
+    """
+    for event in events:
+        if isinstance(event, Swap):
+            return f"Swap über {event.dex}"
+    for event in events:
+        if isinstance(event, StakeAction):
+            return f"Staking: {event.action}"
+    for event in events:
+        if isinstance(event, TokenTransfer):
+            return f"Token Transfer: {event.ui_amount} von {(event.source or '')[:5]}... zu {(event.destination or '')[:5]}..."
+        if isinstance(event, SolTransfer) and event.lamports:
+            return f"SOL Transfer: {event.lamports / LAMPORTS_PER_SOL:.6f} SOL von {(event.source or '')[:5]}... zu {(event.destination or '')[:5]}..."
+    for event in events:
+        if event.inner_index is None:
+            action = getattr(event, "action", None) or _FALLBACK_ACTIONS.get(event.kind, "Unbekannt")
+            return f"Typ: {action}"
+    return "Transaktion"
+
+
+def describe_transaction(tx_detail: Dict[str, Any]) -> str:
+    """
+    Erzeugt eine kurze, lesbare Beschreibung einer Transaktion aus allen (auch inneren) Instruktionen.
+    """
+    return describe_events(decode_transaction(tx_detail))
+
+
+def compute_balance_deltas(address: str, tx_detail: Dict[str, Any]) -> List[Tuple[str, int, int]]:
+    """
+    Berechnet die Saldoänderungen eines Wallets in einer Transaktion.
+
+    SOL wird aus meta.preBalances/postBalances des Wallet-Kontos berechnet (inkl. Gebühr, falls das
+    Wallet Gebührenzahler ist), Token aus pre-/postTokenBalances aller Token-Konten mit `owner == address`.
+
+    :return: Liste von (Mint, Änderung als Rohbetrag, Dezimalstellen); Mint NATIVE_SOL_MINT steht für SOL.
+             Mints ohne Änderung sind nicht enthalten.
+    """
+    meta = tx_detail.get("meta") or {}
+    deltas: List[Tuple[str, int, int]] = []
+
+    account_keys = tx_detail.get("transaction", {}).get("message", {}).get("accountKeys", [])
+    pre_balances = meta.get("preBalances") or []
+    post_balances = meta.get("postBalances") or []
+    for index, key in enumerate(account_keys):
+        if (key.get("pubkey") if isinstance(key, dict) else key) == address:
+            if index < len(pre_balances) and index < len(post_balances):
+                sol_delta = post_balances[index] - pre_balances[index]
+                if sol_delta:
+                    deltas.append((NATIVE_SOL_MINT, sol_delta, SOL_DECIMALS))
+            break
+
+    # Pro Mint summieren: (Mint) -> [Änderung, Dezimalstellen]. Pre- und Post-Salden werden über accountIndex gepaart.
+    token_deltas: Dict[str, List[int]] = {}
+    for sign, balances in ((-1, meta.get("preTokenBalances")), (1, meta.get("postTokenBalances"))):
+        for balance in balances or []:
+            if balance.get("owner") != address or not balance.get("mint"):
+                continue
+            ui_amount = balance.get("uiTokenAmount") or {}
+            entry = token_deltas.setdefault(balance["mint"], [0, ui_amount.get("decimals") or 0])
+            entry[0] += sign * _int(ui_amount.get("amount"))
+    for mint, (delta, decimals) in token_deltas.items():
+        if delta:
+            deltas.append((mint, delta, decimals))
+    return deltas
@@ -0,0 +1,77 @@
+"""
+CSV-Export der Transaktionen und Steuerergebnisse eines Wallets als Generatoren.
+
+Die Generatoren liefern die CSV-Zeilen einzeln, sodass sie direkt an eine
+`StreamingHttpResponse` übergeben werden können: Die Kopfzeile geht sofort raus und der
+Speicherbedarf bleibt unabhängig von der Anzahl der Zeilen.
+"""
+import csv
+import datetime
+from typing import Iterator, Optional
+
+from .cost_basis import PriceLookup, iter_disposals
+from .decoder import SOL_DECIMALS, format_token_amount
+from .models import Transaction, Wallet, WalletTransaction
+from .queries import iter_keyset
+
+# Anzahl der Zeilen pro Datenbankabfrage.
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    Pseudo-Puffer für `csv.writer`: `write` gibt die Zeile zurück, statt sie zu speichern.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def _utc(block_time: int) -> str:
+    if not block_time:
+        return ""
+    return datetime.datetime.fromtimestamp(block_time, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def transaction_rows(wallet: Wallet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Liefert die Transaktionen eines Wallets als CSV-Zeilen, älteste zuerst.
+    Gelesen werden nur die exportierten Spalten, nicht die Rohdaten.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(["Datum (UTC)", "Signatur", "Slot", "Gebühr (SOL)", "Status", "Rolle", "Beschreibung"])
+    rows = (WalletTransaction.objects.filter(wallet=wallet)
+            .values_list("block_time", "id", "role", "transaction__signature", "transaction__slot",
+                         "transaction__fee", "transaction__success", "transaction__description"))
+    for block_time, _, role, signature, slot, fee, success, description in iter_keyset(rows, ("block_time", "id"), chunk_size):
+        yield writer.writerow([
+            _utc(block_time), signature, slot, format_token_amount(fee, SOL_DECIMALS),
+            "Erfolgreich" if success else "Fehlgeschlagen", role, description or "Transaktion",
+        ])
+
+
+def tax_rows(wallet: Wallet, price_lookup: Optional[PriceLookup] = None,
+             chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Liefert die Abgänge eines Wallets mit FIFO-Anschaffungskosten und Haltefrist als CSV-Zeilen.
+    Die Berechnung läuft dabei blockweise über die gesamte Historie (siehe `iter_disposals`).
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([
+        "Datum (UTC)", "Signatur", "Mint", "Menge", "Erlös (EUR)", "Anschaffungskosten (EUR)",
+        "Gewinn steuerpflichtig (EUR)", "Gewinn steuerfrei (EUR)", "Menge ohne Anschaffung", "Preis fehlt",
+    ])
+    for disposals in iter_disposals([wallet], price_lookup, chunk_size=chunk_size):
+        signatures = dict(Transaction.objects.filter(id__in={disposal.transaction_id for disposal in disposals})
+                          .values_list("id", "signature"))
+        for disposal in disposals:
+            # Ohne Preis sind Erlös, Kosten und Gewinn unbekannt und bleiben leer.
+            amounts = (["", "", "", ""] if disposal.price_missing else
+                       [f"{disposal.proceeds:.2f}", f"{disposal.cost_basis:.2f}",
+                        f"{disposal.taxable_gain:.2f}", f"{disposal.tax_free_gain:.2f}"])
+            yield writer.writerow([
+                _utc(disposal.block_time), signatures.get(disposal.transaction_id, ""), disposal.mint,
+                format_token_amount(disposal.amount, disposal.decimals),
+                *amounts,
+                format_token_amount(disposal.uncovered_amount, disposal.decimals),
+                "ja" if disposal.price_missing else "",
+            ])
@@ -0,0 +1,232 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.db import transaction as db_transaction
+
+from .decoder import compute_balance_deltas, describe_transaction
+from .models import BalanceDelta, Transaction, TransactionPayload, Wallet, WalletTransaction
+from .page_cache import invalidate_wallet_pages
+from .rollups import refresh_daily_rollups
+
+# Anzahl der Zeilen pro INSERT bzw. pro Datenbanktransaktion.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class IngestResult(NamedTuple):
+    """
+    Ergebnis eines Imports: neu gespeicherte und übersprungene (bereits vorhandene oder ungültige) Transaktionen.
+
+    `inserted` zählt die Signaturen, die nach dem Import gespeichert sind und vorher nicht waren. Von einem
+    gleichzeitigen Import derselben Transaktion (ignore_conflicts) wird sie dabei nicht unterschieden; eine von
+    der Datenbank verworfene Zeile zählt dagegen als übersprungen.
+    """
+    inserted: int
+    skipped: int
+
+
+def signature_of(tx_detail: Dict[str, Any]) -> Optional[str]:
+    """
+    Liefert die (erste) Signatur eines get_transaction-Ergebnisses.
+    """
+    signatures = tx_detail.get("transaction", {}).get("signatures") or [None]
+    return signatures[0]
+
+
+def wallet_role(address: str, tx_detail: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+    """
+    Bestimmt die Rolle eines Wallets in einer Transaktion und seinen Index in accountKeys.
+
+    :return: Tupel (Rolle aus WalletTransaction.ROLE_CHOICES, Index oder None).
+    """
+    account_keys = tx_detail.get("transaction", {}).get("message", {}).get("accountKeys", [])
+    for index, key in enumerate(account_keys):
+        pubkey = key.get("pubkey") if isinstance(key, dict) else key
+        if pubkey != address:
+            continue
+        if index == 0:
+            return WalletTransaction.ROLE_FEE_PAYER, index
+        if isinstance(key, dict) and key.get("signer"):
+            return WalletTransaction.ROLE_SIGNER, index
+        if isinstance(key, dict) and key.get("writable"):
+            return WalletTransaction.ROLE_WRITABLE, index
+        return WalletTransaction.ROLE_READONLY, index
+
+    # Nicht direkt beteiligt, aber Eigentümer eines beteiligten Token-Kontos.
+    meta = tx_detail.get("meta") or {}
+    for balance in (meta.get("preTokenBalances") or []) + (meta.get("postTokenBalances") or []):
+        if balance.get("owner") == address:
+            return WalletTransaction.ROLE_TOKEN_OWNER, None
+    return WalletTransaction.ROLE_UNKNOWN, None
+
+
+def wallet_link(wallet: Wallet, transaction_id: int, block_time: int, tx_detail: Dict[str, Any]) -> WalletTransaction:
+    """
+    Erzeugt eine (noch nicht gespeicherte) Verknüpfung zwischen Wallet und Transaktion.
+    """
+    role, account_index = wallet_role(wallet.address, tx_detail)
+    return WalletTransaction(wallet=wallet, transaction_id=transaction_id, block_time=block_time,
+                             role=role, account_index=account_index)
+
+
+def balance_delta_rows(wallet: Wallet, transaction_id: int, block_time: int, tx_detail: Dict[str, Any]) -> List[BalanceDelta]:
+    """
+    Erzeugt die (noch nicht gespeicherten) Saldoänderungen eines Wallets für eine Transaktion.
+    """
+    return [
+        BalanceDelta(wallet=wallet, transaction_id=transaction_id, mint=mint, delta=delta,
+                     decimals=decimals, block_time=block_time)
+        for mint, delta, decimals in compute_balance_deltas(wallet.address, tx_detail)
+    ]
+
+
+def stored_signatures(signatures: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Set[str]:
+    """
+    Liefert die Signaturen, die bereits als `Transaction` gespeichert sind (z.B. über ein anderes Wallet).
+    """
+    stored: Set[str] = set()
+    for start in range(0, len(signatures), chunk_size):
+        stored.update(Transaction.objects.filter(signature__in=signatures[start:start + chunk_size])
+                      .values_list("signature", flat=True))
+    return stored
+
+
+def link_existing_transactions(wallet: Wallet, signatures: List[str],
+                               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Set[str]:
+    """
+    Verknüpft bereits gespeicherte Transaktionen mit dem Wallet, ohne sie erneut abzurufen.
+
+    Transaktionen, die z.B. schon über ein anderes eigenes Wallet importiert wurden, kosten so keinen
+    weiteren RPC-Aufruf: Vor dem Abruf der Details werden sie über `stored_signatures` ausgenommen und
+    zusammen mit den übrigen Transaktionen verknüpft, sobald feststeht, bis wohin gespeichert wird.
+
+    :return: Die Menge der Signaturen, die bereits gespeichert sind (und nun verknüpft sind).
+    """
+    known: Set[str] = set()
+    block_times: List[int] = []
+    for start in range(0, len(signatures), chunk_size):
+        chunk = signatures[start:start + chunk_size]
+        linked = set(WalletTransaction.objects.filter(wallet=wallet, transaction__signature__in=chunk)
+                     .values_list("transaction__signature", flat=True))
+        known.update(linked)
+        # Die Rohdaten werden nur für gespeicherte, aber noch nicht verknüpfte Transaktionen geladen.
+        unlinked = (Transaction.objects.filter(signature__in=[signature for signature in chunk if signature not in linked])
+                    .select_related("payload").only("id", "signature", "block_time", "payload"))
+        links = []
+        deltas = []
+        for tx in unlinked:
+            links.append(wallet_link(wallet, tx.id, tx.block_time, tx.raw_data))
+            deltas.extend(balance_delta_rows(wallet, tx.id, tx.block_time, tx.raw_data))
+            known.add(tx.signature)
+        with db_transaction.atomic():
+            WalletTransaction.objects.bulk_create(links, ignore_conflicts=True)
+            BalanceDelta.objects.bulk_create(deltas, ignore_conflicts=True)
+            if links:
+                invalidate_wallet_pages(wallet.pk)
+        block_times.extend(link.block_time for link in links)
+    refresh_daily_rollups(wallet, block_times)
+    return known
+
+
+def transaction_from_details(wallet: Wallet, signature: str, tx_detail: Dict[str, Any],
+                             sig_info: Optional[Dict[str, Any]] = None) -> Transaction:
+    """
+    Erzeugt eine (noch nicht gespeicherte) `Transaction`-Instanz aus einem get_transaction-Ergebnis.
+
+    :param wallet: Das Wallet, dem die Transaktion zugeordnet wird.
+    :param signature: Die Transaktionssignatur.
+    :param tx_detail: Das Ergebnis von get_transaction (jsonParsed).
+    :param sig_info: Optional der Eintrag aus getSignaturesForAddress als Fallback für blockTime/slot.
+    """
+    sig_info = sig_info or {}
+    block_time = tx_detail.get("blockTime")
+    if block_time is None:
+        block_time = sig_info.get("blockTime") or 0
+    return Transaction(
+        wallet=wallet,
+        signature=signature,
+        block_time=block_time,
+        slot=tx_detail.get("slot", sig_info.get("slot", 0)),
+        fee=tx_detail.get("meta", {}).get("fee", 0),
+        description=describe_transaction(tx_detail),
+        success=not (tx_detail.get("meta") or {}).get("err"),
+    )
+
+
+def ingest_transactions(wallet: Wallet, tx_details: Iterable[Optional[Dict[str, Any]]],
+                        sig_infos: Optional[Dict[str, Dict[str, Any]]] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> IngestResult:
+    """
+    Speichert rohe get_transaction-Ergebnisse als `Transaction`-Zeilen.
+
+    Die Zeilen werden in Blöcken von `chunk_size` geschrieben: pro Block eine Abfrage der bereits
+    vorhandenen Signaturen, ein `bulk_create(ignore_conflicts=True)` und das Anlegen der
+    Wallet-Verknüpfungen und Saldoänderungen, alles in einer Datenbanktransaktion. Statt eines Roundtrips pro Zeile
+    fallen so wenige pro Block an. Bereits (z.B. über ein anderes Wallet) gespeicherte Transaktionen
+    werden nicht erneut gespeichert, aber mit dem Wallet verknüpft. Nach dem letzten Block werden die
+    Tageswerte der betroffenen Tage einmal aktualisiert (siehe rollups.py).
+
+    :param wallet: Das Wallet, dem die Transaktionen zugeordnet werden.
+    :param tx_details: Die Ergebnisse von get_transaction (jsonParsed); None-Einträge werden übersprungen.
+    :param sig_infos: Optional Signatur -> Eintrag aus getSignaturesForAddress (Fallback für blockTime/slot).
+    :param chunk_size: Anzahl der Zeilen pro Block.
+    :return: Anzahl der eingefügten und der übersprungenen Transaktionen.
+    """
+    sig_infos = sig_infos or {}
+    chunk_size = max(1, chunk_size)
+    inserted = 0
+    skipped = 0
+    chunk: Dict[str, Dict[str, Any]] = {}
+    block_times: List[int] = []
+
+    def flush() -> None:
+        nonlocal inserted, skipped
+        if not chunk:
+            return
+        with db_transaction.atomic():
+            existing = set(Transaction.objects.filter(signature__in=list(chunk)).values_list("signature", flat=True))
+            new_rows = [
+                transaction_from_details(wallet, signature, tx_detail, sig_infos.get(signature))
+                for signature, tx_detail in chunk.items()
+                if signature not in existing
+            ]
+            # ignore_conflicts fängt parallel eingefügte Zeilen (z.B. aus einem anderen Worker) ab.
+            Transaction.objects.bulk_create(new_rows, ignore_conflicts=True)
+            # bulk_create liefert unter MySQL keine IDs zurück, daher werden sie für die Verknüpfung nachgeladen.
+            stored = list(Transaction.objects.filter(signature__in=list(chunk)).values_list("signature", "id", "block_time"))
+            WalletTransaction.objects.bulk_create(
+                [wallet_link(wallet, transaction_id, block_time, chunk[signature]) for signature, transaction_id, block_time in stored],
+                ignore_conflicts=True,
+            )
+            BalanceDelta.objects.bulk_create(
+                [delta for signature, transaction_id, block_time in stored
+                 for delta in balance_delta_rows(wallet, transaction_id, block_time, chunk[signature])],
+                ignore_conflicts=True,
+            )
+            # Die vollständige Antwort wird komprimiert in der Nebentabelle abgelegt.
+            TransactionPayload.objects.bulk_create(
+                [TransactionPayload.from_details(transaction_id, chunk[signature])
+                 for signature, transaction_id, _ in stored if signature not in existing],
+                ignore_conflicts=True,
+            )
+            if stored:
+                invalidate_wallet_pages(wallet.pk)
+        block_times.extend(block_time for _, _, block_time in stored)
+        # Gezählt wird, was nach dem Commit tatsächlich gespeichert ist, nicht was bulk_create übergeben wurde.
+        stored_new = sum(1 for signature, _, _ in stored if signature not in existing)
+        inserted += stored_new
+        skipped += len(chunk) - stored_new
+        chunk.clear()
+
+    for tx_detail in tx_details:
+        signature = signature_of(tx_detail) if tx_detail else None
+        if not signature or signature in chunk:
+            skipped += 1
+            continue
+        chunk[signature] = tx_detail
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    # Nach dem Commit, damit gleichzeitige Importe desselben Wallets sich gegenseitig sehen (siehe rollups.py).
+    refresh_daily_rollups(wallet, block_times)
+
+    return IngestResult(inserted=inserted, skipped=skipped)
+
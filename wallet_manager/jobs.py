@@ -0,0 +1,182 @@
+"""
+Warteschlange für Wallet-Abgleiche in der Datenbank (ohne Celery/Redis).
+
+Die Weboberfläche stellt Aufträge (`SyncJob`) nur ein; `manage.py run_sync_worker` holt sie mit
+`SELECT ... FOR UPDATE SKIP LOCKED` ab, sodass mehrere Worker-Prozesse und -Threads parallel arbeiten,
+ohne sich gegenseitig zu blockieren oder einen Auftrag doppelt auszuführen.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import SyncJob, Wallet
+from .page_cache import mark_synced
+from .solana_utils import SolanaAPI
+from .sync import sync_new_transactions, sync_older_transactions
+
+# Laufende Aufträge, die länger als SYNC_JOB_TIMEOUT (Sekunden) nicht abgeschlossen wurden (z.B. abgestürzter
+# Worker), werden erneut eingestellt.
+SYNC_JOB_TIMEOUT = int(os.getenv("SYNC_JOB_TIMEOUT", "600"))
+# Anzahl der Versuche, bevor ein Auftrag als fehlgeschlagen gilt, und Wartezeit (Sekunden) vor dem nächsten Versuch.
+SYNC_JOB_MAX_ATTEMPTS = int(os.getenv("SYNC_JOB_MAX_ATTEMPTS", "3"))
+SYNC_JOB_RETRY_DELAY = int(os.getenv("SYNC_JOB_RETRY_DELAY", "30"))
+# Abgeschlossene und fehlgeschlagene Aufträge werden nach SYNC_JOB_RETENTION Sekunden gelöscht.
+SYNC_JOB_RETENTION = int(os.getenv("SYNC_JOB_RETENTION", "86400"))
+
+ACTIVE_STATUSES = (SyncJob.STATUS_PENDING, SyncJob.STATUS_RUNNING)
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+def enqueue_sync(wallet: Wallet, kind: str = SyncJob.KIND_NEW, limit: int = 10) -> SyncJob:
+    """
+    Stellt einen Abgleich ein. Steht für das Wallet bereits ein gleichartiger Auftrag aus, wird dieser zurückgegeben.
+    Ein bereits laufender Auftrag zählt nicht, da er neuere Transaktionen möglicherweise nicht mehr erfasst.
+
+    Die Sperre auf der Wallet-Zeile reiht gleichzeitige Aufrufe für dasselbe Wallet (mehrere Gunicorn-Worker)
+    hintereinander, sodass Prüfung und Anlegen keinen doppelten Auftrag erzeugen. Eine bedingte Eindeutigkeit
+    (nur für ausstehende Aufträge) unterstützt MySQL nicht.
+    """
+    with db_transaction.atomic():
+        Wallet.objects.select_for_update().only("id").get(pk=wallet.pk)
+        existing = (SyncJob.objects.filter(wallet=wallet, kind=kind, status=SyncJob.STATUS_PENDING)
+                    .order_by("-id").first())
+        if existing:
+            return existing
+        return SyncJob.objects.create(wallet=wallet, kind=kind, limit=limit)
+
+
+def current_job(wallet: Wallet) -> Optional[SyncJob]:
+    """
+    Der für die Fortschrittsanzeige relevante Auftrag: ein ausstehender oder laufender, sonst der zuletzt eingestellte.
+    """
+    jobs = SyncJob.objects.filter(wallet=wallet)
+    return (jobs.filter(status__in=ACTIVE_STATUSES).order_by("id").first()
+            or jobs.order_by("-id").first())
+
+
+def queue_position(job: SyncJob) -> int:
+    """
+    Anzahl der fälligen Aufträge, die vor `job` abgearbeitet werden.
+    """
+    return SyncJob.objects.filter(status=SyncJob.STATUS_PENDING, run_after__lte=timezone.now(), id__lt=job.id).count()
+
+
+def claim_jobs(worker: str, limit: int) -> List[SyncJob]:
+    """
+    Holt bis zu `limit` fällige Aufträge ab und markiert sie als laufend.
+
+    Von anderen Workern gerade gesperrte Zeilen werden übersprungen (SKIP LOCKED). Aufträge für Wallets,
+    die bereits abgeglichen werden, bleiben liegen, damit pro Wallet nur ein Abgleich läuft. Dazu wird auch die
+    Wallet-Zeile gesperrt: Zwei Worker, die gleichzeitig verschiedene Aufträge desselben Wallets sehen, überspringen
+    sich gegenseitig, statt beide die (noch leere) Liste laufender Aufträge zu prüfen und beide zu starten.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    with db_transaction.atomic():
+        busy_wallets = SyncJob.objects.filter(status=SyncJob.STATUS_RUNNING).values("wallet_id")
+        candidates = (SyncJob.objects.select_for_update(skip_locked=True, of=("self", "wallet")).select_related("wallet")
+                      .filter(status=SyncJob.STATUS_PENDING, run_after__lte=now)
+                      .exclude(wallet_id__in=busy_wallets)
+                      .order_by("run_after", "id")[:limit * 2])
+        jobs: List[SyncJob] = []
+        wallets = set()
+        for job in candidates:
+            if job.wallet_id in wallets or len(jobs) >= limit:
+                continue
+            wallets.add(job.wallet_id)
+            jobs.append(job)
+        for job in jobs:
+            job.status = SyncJob.STATUS_RUNNING
+            job.started_at = now
+            job.worker = worker
+            job.attempts += 1
+            job.save(update_fields=["status", "started_at", "worker", "attempts"])
+    return jobs
+
+
+def run_job(job: SyncJob, sol_api: SolanaAPI) -> SyncJob:
+    """
+    Führt einen abgeholten Auftrag aus und speichert das Ergebnis. Schlägt er fehl, wird er nach
+    SYNC_JOB_RETRY_DELAY erneut versucht, bis SYNC_JOB_MAX_ATTEMPTS erreicht ist.
+
+    Laufzeit, RPC- und Datenbankzeit werden pro Auftrag protokolliert (mit Wallet-Adresse) und in den Kennzahlen erfasst.
+    """
+    started_at = time.perf_counter()
+    with metrics.track_request() as stats, connection.execute_wrapper(stats.db_wrapper):
+        _execute_job(job, sol_api)
+    elapsed = time.perf_counter() - started_at
+
+    metrics.inc("sync_jobs_total", kind=job.kind, status=job.status)
+    metrics.observe("sync_job_duration_seconds", elapsed, kind=job.kind)
+    metrics.observe("sync_job_component_seconds", stats.rpc_seconds, kind=job.kind, component="rpc")
+    metrics.observe("sync_job_component_seconds", stats.db_seconds, kind=job.kind, component="db")
+    logger.info(
+        "Sync-Auftrag %s (%s) für %s: %s, %d Transaktionen in %.1f ms (RPC %.1f ms, DB %.1f ms)",
+        job.pk, job.kind, job.wallet.address, job.status, job.processed, elapsed * 1000,
+        stats.rpc_seconds * 1000, stats.db_seconds * 1000,
+        extra={"job": job.pk, "kind": job.kind, "status": job.status, "wallet": job.wallet.address,
+               "processed": job.processed, "duration_ms": round(elapsed * 1000, 1), **stats.as_dict()},
+    )
+    return job
+
+
+def _execute_job(job: SyncJob, sol_api: SolanaAPI) -> None:
+    try:
+        # Die Abruffunktionen liefern bei Verbindungsfehlern leere Ergebnisse; ohne diese Prüfung
+        # würde ein nicht erreichbarer Endpunkt als erfolgreicher Abgleich ohne neue Transaktionen gelten.
+        if not sol_api.is_connected():
+            raise ConnectionError(f"Verbindung zum Solana RPC-Endpunkt ({sol_api.rpc_endpoint}) fehlgeschlagen.")
+        if job.kind == SyncJob.KIND_OLDER:
+            job.processed = sync_older_transactions(job.wallet, sol_api, limit=job.limit)
+        else:
+            job.processed = sync_new_transactions(job.wallet, sol_api, initial_limit=job.limit)
+            mark_synced(job.wallet_id)
+    except Exception as e:
+        job.error = str(e) or type(e).__name__
+        if job.attempts < SYNC_JOB_MAX_ATTEMPTS:
+            job.status = SyncJob.STATUS_PENDING
+            job.run_after = timezone.now() + timedelta(seconds=SYNC_JOB_RETRY_DELAY * job.attempts)
+        else:
+            job.status = SyncJob.STATUS_FAILED
+    else:
+        job.status = SyncJob.STATUS_DONE
+        job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "processed", "error", "run_after", "finished_at"])
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Stellt laufende Aufträge, deren Worker offenbar abgebrochen ist, erneut ein bzw. markiert sie als fehlgeschlagen.
+
+    :return: Die Anzahl der betroffenen Aufträge.
+    """
+    stale = SyncJob.objects.filter(status=SyncJob.STATUS_RUNNING,
+                                   started_at__lt=timezone.now() - timedelta(seconds=SYNC_JOB_TIMEOUT))
+    failed = stale.filter(attempts__gte=SYNC_JOB_MAX_ATTEMPTS).update(
+        status=SyncJob.STATUS_FAILED, error="Zeitüberschreitung des Workers", finished_at=timezone.now())
+    return failed + stale.update(status=SyncJob.STATUS_PENDING, run_after=timezone.now())
+
+
+def purge_finished_jobs() -> int:
+    """
+    Löscht abgeschlossene und fehlgeschlagene Aufträge, die älter als SYNC_JOB_RETENTION sind.
+    """
+    deleted, _ = SyncJob.objects.filter(
+        status__in=(SyncJob.STATUS_DONE, SyncJob.STATUS_FAILED),
+        finished_at__lt=timezone.now() - timedelta(seconds=SYNC_JOB_RETENTION),
+    ).delete()
+    return deleted
@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_manager.ingest import ingest_transactions, link_existing_transactions, stored_signatures
+from wallet_manager.models import BackfillCheckpoint, Wallet
+from wallet_manager.solana_utils import SolanaAPI, is_valid_address
+from wallet_manager.sync import SIGNATURE_PAGE_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Importiert die vollständige Transaktionshistorie eines Wallets (neueste zuerst, rückwärts blätternd). "
+        "Der Fortschritt wird pro Wallet gespeichert, sodass ein abgebrochener Lauf fortgesetzt wird."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("address", help="Solana-Adresse des Wallets")
+        parser.add_argument("--workers", type=int, default=4, help="Anzahl gleichzeitiger Batch-Abrufe der Transaktionsdetails (Standard: 4)")
+        parser.add_argument("--page-size", type=int, default=SIGNATURE_PAGE_SIZE, help=f"Signaturen pro getSignaturesForAddress-Aufruf (max. {SIGNATURE_PAGE_SIZE})")
+        parser.add_argument("--batch-size", type=int, default=None, help="Transaktionen pro JSON-RPC-Batch (Standard: SOLANA_RPC_BATCH_SIZE)")
+        parser.add_argument("--restart", action="store_true", help="Checkpoint verwerfen und bei der neuesten Transaktion neu beginnen")
+
+    def handle(self, *args, **options):
+        address = options["address"]
+        workers = max(1, options["workers"])
+        page_size = max(1, min(options["page_size"], SIGNATURE_PAGE_SIZE))
+        if not is_valid_address(address):
+            raise CommandError(f"Ungültige Solana-Adresse: {address}")
+
+        sol_api = SolanaAPI(batch_size=options["batch_size"])
+        if not sol_api.is_connected():
+            raise CommandError(f"Verbindung zum Solana RPC-Endpunkt ({sol_api.rpc_endpoint}) fehlgeschlagen.")
+
+        wallet, _ = Wallet.objects.get_or_create(address=address)
+        checkpoint, _ = BackfillCheckpoint.objects.get_or_create(wallet=wallet)
+        if options["restart"]:
+            checkpoint.before_signature = None
+            checkpoint.processed_count = 0
+            checkpoint.completed = False
+            checkpoint.save()
+        elif checkpoint.completed:
+            self.stdout.write(f"Backfill für {address} ist bereits abgeschlossen ({checkpoint.processed_count} Signaturen). Mit --restart neu starten.")
+            return
+        elif checkpoint.before_signature:
+            self.stdout.write(f"Setze Backfill für {address} vor Signatur {checkpoint.before_signature[:10]}... fort ({checkpoint.processed_count} bereits verarbeitet).")
+
+        started_at = time.monotonic()
+        processed = 0
+        inserted = 0
+        # Ein zusätzlicher Thread lädt bereits die nächste Signaturseite, während die Details der aktuellen Seite abgerufen werden.
+        with ThreadPoolExecutor(max_workers=workers + 1) as executor:
+            next_page = executor.submit(sol_api.get_signatures_page, address, page_size, checkpoint.before_signature)
+            while True:
+                page = next_page.result()
+                if page is None:
+                    raise CommandError(
+                        f"Signaturen von {address} konnten nicht abgerufen werden. "
+                        f"Der Fortschritt wurde gespeichert; ein erneuter Aufruf setzt an dieser Stelle fort."
+                    )
+                sig_infos = [sig_info for sig_info in page if sig_info.get("signature")]
+                if not page:
+                    # Nur eine echte leere Antwort (`"result": []`) ist das Ende der Historie.
+                    checkpoint.completed = True
+                    checkpoint.save(update_fields=["completed", "updated_at"])
+                    break
+                if not sig_infos:
+                    break
+
+                # Auch nach einer kürzeren Seite weiterblättern: Provider kürzen Seiten, ohne dass die Historie endet.
+                next_page = executor.submit(sol_api.get_signatures_page, address, page_size, sig_infos[-1]["signature"])
+
+                signatures = [sig_info["signature"] for sig_info in sig_infos]
+                known_signatures = stored_signatures(signatures)
+                signatures = [signature for signature in signatures if signature not in known_signatures]
+                chunks = [signatures[start:start + sol_api.batch_size] for start in range(0, len(signatures), sol_api.batch_size)]
+                details_by_signature = {}
+                for chunk_result in executor.map(sol_api.get_transaction_details_batch, chunks):
+                    details_by_signature.update(chunk_result)
+
+                # Bis zur ersten (neuesten) fehlgeschlagenen Signatur speichern und den Checkpoint nur bis dorthin setzen.
+                stored_infos = []
+                for sig_info in sig_infos:
+                    if sig_info["signature"] not in known_signatures and not details_by_signature.get(sig_info["signature"]):
+                        break
+                    stored_infos.append(sig_info)
+
+                # Erst nach dem Abschneiden verknüpfen, damit keine Transaktion jenseits der Fehlerstelle gespeichert wird.
+                link_existing_transactions(wallet, [sig_info["signature"] for sig_info in stored_infos
+                                                    if sig_info["signature"] in known_signatures])
+                result = ingest_transactions(
+                    wallet,
+                    (details_by_signature[sig_info["signature"]] for sig_info in stored_infos
+                     if sig_info["signature"] not in known_signatures),
+                    {sig_info["signature"]: sig_info for sig_info in stored_infos},
+                )
+                inserted += result.inserted
+                if stored_infos:
+                    checkpoint.before_signature = stored_infos[-1]["signature"]
+                    checkpoint.processed_count += len(stored_infos)
+                    checkpoint.save(update_fields=["before_signature", "processed_count", "updated_at"])
+                processed += len(stored_infos)
+
+                elapsed = time.monotonic() - started_at
+                self.stdout.write(f"{processed} Transaktionen verarbeitet ({processed / max(elapsed, 1e-9):.1f} Tx/s), "
+                                  f"älteste Blockzeit: {sig_infos[-1].get('blockTime')}")
+
+                if len(stored_infos) < len(sig_infos):
+                    next_page.cancel()
+                    raise CommandError(
+                        f"Details für Signatur {sig_infos[len(stored_infos)]['signature']} konnten nicht abgerufen werden. "
+                        f"Der Fortschritt wurde gespeichert; ein erneuter Aufruf setzt an dieser Stelle fort."
+                    )
+
+        elapsed = time.monotonic() - started_at
+        status = "abgeschlossen" if checkpoint.completed else "beendet"
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfill für {address} {status}: {processed} Transaktionen in {elapsed:.1f} s "
+            f"({processed / max(elapsed, 1e-9):.1f} Tx/s), davon {inserted} neu gespeichert, insgesamt {checkpoint.processed_count}."
+        ))
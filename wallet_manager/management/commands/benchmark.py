@@ -0,0 +1,113 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_manager.benchmark import (DEFAULT_REGRESSION_THRESHOLD, compare_results, latest_result, load_results,
+                                      run_benchmarks, save_results)
+from wallet_manager.mock_rpc import load_fixtures, record_fixtures, save_fixtures, synthetic_fixtures
+from wallet_manager.rpc_pool import configured_endpoints
+from wallet_manager.solana_utils import DEFAULT_RPC_ENDPOINT
+
+DEFAULT_OUTPUT_DIR = os.path.join(settings.BASE_DIR, "benchmark_results")
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst Übersichtsseite (p50/p95), Import (Transaktionen/s), Dekodierer und Speicherbedarf gegen eine "
+        "Testdatenbank und einen lokalen Mock-RPC-Server (siehe benchmark.py). Das Ergebnis wird gespeichert und "
+        "mit dem letzten Lauf verglichen. Mit --record werden echte Transaktionen als Fixtures aufgezeichnet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixtures", default=None, help="Fixture-Datei (.json oder .json.gz); ohne Angabe werden synthetische Transaktionen erzeugt")
+        parser.add_argument("--record", metavar="ADDRESS", default=None, help="Transaktionen dieses Wallets vom RPC-Endpunkt in --fixtures aufzeichnen und beenden")
+        parser.add_argument("--record-limit", type=int, default=1000, help="Anzahl der aufzuzeichnenden Transaktionen (Standard: 1000)")
+        parser.add_argument("--transactions", type=int, default=1000, help="Anzahl synthetischer Transaktionen (Standard: 1000)")
+        parser.add_argument("--seed", type=int, default=0, help="Startwert für synthetische Fixtures und Fehlerinjektion (Standard: 0)")
+        parser.add_argument("--latency", type=float, default=20.0, help="Latenz des Mock-Servers pro HTTP-Anfrage in ms (Standard: 20)")
+        parser.add_argument("--jitter", type=float, default=10.0, help="Zusätzliche zufällige Latenz in ms (Standard: 10)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil der Aufrufe mit JSON-RPC-Fehler (0-1)")
+        parser.add_argument("--server-error-rate", type=float, default=0.0, help="Anteil der HTTP-Anfragen mit HTTP 503 (0-1)")
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Anteil der HTTP-Anfragen mit HTTP 429 (0-1)")
+        parser.add_argument("--retry-after", type=float, default=None, help="Retry-After der 429-Antworten in Sekunden (Standard: ohne Header)")
+        parser.add_argument("--page-size", type=int, default=100, help="Signaturen pro Abruf in der sync-Stufe (Standard: 100)")
+        parser.add_argument("--batch-size", type=int, default=None, help="Transaktionen pro JSON-RPC-Batch (Standard: SOLANA_RPC_BATCH_SIZE)")
+        parser.add_argument("--view-requests", type=int, default=50, help="Anfragen pro Seiten-Szenario (Standard: 50)")
+        parser.add_argument("--decoder-rounds", type=int, default=5, help="Durchläufe über alle Transaktionen im Dekodierer (Standard: 5)")
+        parser.add_argument("--no-memory", action="store_true", help="Keine Speichermessung (halbiert die Laufzeit)")
+        parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Verzeichnis der Ergebnisse (Standard: benchmark_results/)")
+        parser.add_argument("--compare", default=None, help="Ergebnisdatei zum Vergleich (Standard: letzter Lauf in --output)")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help=f"Verschlechterung in Prozent, ab der eine Regression gemeldet wird (Standard: {DEFAULT_REGRESSION_THRESHOLD:g})")
+        parser.add_argument("--fail-on-regression", action="store_true", help="Mit Fehlercode beenden, wenn eine Regression gefunden wurde")
+        parser.add_argument("--verbose", action="store_true", help="Meldungen der Anwendung während der Messung anzeigen")
+
+    def handle(self, *args, **options):
+        if options["record"]:
+            self._record(options)
+            return
+
+        if options["fixtures"]:
+            fixtures = load_fixtures(options["fixtures"])
+        else:
+            fixtures = synthetic_fixtures(options["transactions"], options["seed"])
+        if not len(fixtures):
+            raise CommandError("Die Fixtures enthalten keine Transaktionen.")
+
+        previous_path = options["compare"] or latest_result(options["output"])
+        server_options = {
+            "latency": options["latency"] / 1000,
+            "jitter": options["jitter"] / 1000,
+            "error_rate": options["error_rate"],
+            "server_error_rate": options["server_error_rate"],
+            "rate_limit_rate": options["rate_limit_rate"],
+            "retry_after": options["retry_after"],
+            "seed": options["seed"],
+        }
+        self.stdout.write(f"Benchmark mit {len(fixtures)} Transaktionen von {fixtures.address} ...")
+        result = run_benchmarks(fixtures, server_options, page_size=max(1, options["page_size"]),
+                                batch_size=options["batch_size"], view_requests=max(1, options["view_requests"]),
+                                decoder_rounds=max(1, options["decoder_rounds"]),
+                                trace_memory=not options["no_memory"], verbose=options["verbose"])
+        result["config"]["fixtures"] = options["fixtures"] or f"synthetic(seed={options['seed']})"
+
+        for stage, metrics in result["results"].items():
+            self.stdout.write(f"{stage}: " + ", ".join(f"{metric}={value}" for metric, value in metrics.items()))
+        if not result["results"]["sync"]["complete"]:
+            self.stdout.write(self.style.WARNING(
+                f"sync: nur {result['results']['sync']['transactions']} von {len(fixtures)} Transaktionen gespeichert."))
+        self.stdout.write(f"Ergebnis gespeichert in {save_results(result, options['output'])}")
+
+        if previous_path:
+            self._compare(load_results(previous_path), result, previous_path, options)
+
+    def _compare(self, previous, result, previous_path: str, options) -> None:
+        previous_config = previous.get("config", {})
+        changed = sorted(key for key, value in result["config"].items() if previous_config.get(key) != value)
+        if changed:
+            self.stdout.write(self.style.WARNING(f"Der Vergleichslauf verwendet eine andere Konfiguration: {', '.join(changed)}."))
+        rows = compare_results(previous, result, options["threshold"])
+        regressions = [row for row in rows if row["regression"]]
+        self.stdout.write(f"Vergleich mit {previous_path} ({previous.get('git_commit') or 'unbekannt'}):")
+        for row in rows:
+            line = f"  {row['stage']}.{row['metric']}: {row['previous']} -> {row['current']} ({row['change_percent']:+.1f} %)"
+            self.stdout.write(self.style.ERROR(line) if row["regression"] else line)
+        if regressions:
+            message = f"{len(regressions)} Kennzahlen um mehr als {options['threshold']:g} % verschlechtert."
+            if options["fail_on_regression"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Keine Regression gefunden."))
+
+    def _record(self, options) -> None:
+        if not options["fixtures"]:
+            raise CommandError("--record benötigt --fixtures als Zieldatei.")
+        endpoint = configured_endpoints(DEFAULT_RPC_ENDPOINT)[0]
+        self.stdout.write(f"Zeichne bis zu {options['record_limit']} Transaktionen von {options['record']} über {endpoint} auf ...")
+        try:
+            fixtures = record_fixtures(endpoint, options["record"], options["record_limit"])
+        except Exception as e:
+            raise CommandError(f"Aufzeichnung fehlgeschlagen: {e}")
+        save_fixtures(fixtures, options["fixtures"])
+        self.stdout.write(self.style.SUCCESS(f"{len(fixtures)} Transaktionen in {options['fixtures']} gespeichert."))
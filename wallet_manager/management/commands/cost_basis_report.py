@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_manager.cost_basis import DEFAULT_CHUNK_SIZE, PRICE_MISSING_FIELD, compute_cost_basis
+from wallet_manager.models import Wallet
+from wallet_manager.prices import lookup_prices
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet Anschaffungskosten (FIFO), realisierte Gewinne und Haltefristen für ein Portfolio "
+        "aus einem oder mehreren Wallets und gibt die Summen pro Jahr aus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("addresses", nargs="+", help="Die Wallet-Adressen des Portfolios")
+        parser.add_argument("--full", action="store_true", help="Gespeicherten Zwischenstand ignorieren und alles neu berechnen")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Saldoänderungen pro Block (Standard: {DEFAULT_CHUNK_SIZE})")
+
+    def handle(self, *args, **options):
+        wallets = list(Wallet.objects.filter(address__in=options["addresses"]))
+        missing = set(options["addresses"]) - {wallet.address for wallet in wallets}
+        if missing:
+            raise CommandError(f"Nicht gespeicherte Wallets: {', '.join(sorted(missing))}")
+
+        started_at = time.monotonic()
+        engine = compute_cost_basis(wallets, lookup_prices, full=options["full"], chunk_size=max(1, options["chunk_size"]))
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(f"{len(engine.disposals)} neue Abgänge in {elapsed:.1f} s verarbeitet.")
+
+        for year in sorted(engine.yearly):
+            totals = engine.yearly[year]
+            self.stdout.write(
+                f"{year}: Erlös {totals['proceeds']:.2f} EUR, Anschaffungskosten {totals['cost_basis']:.2f} EUR, "
+                f"steuerpflichtig {totals['taxable_gain']:.2f} EUR, steuerfrei (> 1 Jahr) {totals['tax_free_gain']:.2f} EUR"
+            )
+            if totals.get(PRICE_MISSING_FIELD):
+                self.stdout.write(self.style.WARNING(
+                    f"{year}: {totals[PRICE_MISSING_FIELD]:.0f} Abgänge ohne Preis nicht enthalten (Preise mit 'load_prices' ergänzen)."
+                ))
+        uncovered = sum(1 for disposal in engine.disposals if disposal.uncovered_amount)
+        if uncovered:
+            self.stdout.write(self.style.WARNING(
+                f"{uncovered} Abgänge ohne bekannte Anschaffung (Historie unvollständig? Backfill ausführen)."
+            ))
@@ -0,0 +1,92 @@
+import csv
+import datetime
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from wallet_manager.models import TokenPrice
+from wallet_manager.prices import PRICE_BUCKET_SECONDS, bucket_of, clear_price_cache
+
+CHUNK_SIZE = 1000
+
+
+def parse_timestamp(value) -> int:
+    """
+    Wandelt Unix-Sekunden, Unix-Millisekunden oder ein ISO-Datum (ohne Zeitzone = UTC) in Unix-Sekunden um.
+    """
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+            return int(parsed.timestamp())
+    value = int(value)
+    return value // 1000 if value > 10 ** 11 else value
+
+
+class Command(BaseCommand):
+    help = (
+        "Lädt historische EUR-Preise aus lokalen CSV- oder JSON-Dumps in die Preistabelle. "
+        "CSV: Spalten 'timestamp', 'price' (oder 'price_eur') und optional 'mint'. "
+        "JSON: Liste von Objekten mit denselben Feldern oder ein Objekt mit 'prices': [[timestamp, preis], ...]."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="Pfade zu den CSV- oder JSON-Dateien")
+        parser.add_argument("--mint", help="Mint für Dateien ohne 'mint'-Spalte ('SOL' für natives SOL)")
+
+    def handle(self, *args, **options):
+        total = 0
+        for path in options["files"]:
+            started_at = time.monotonic()
+            points = self._read(path, options["mint"])
+            # Mehrere Preise im selben Bucket: der zeitlich letzte gewinnt.
+            buckets = {}
+            for mint, timestamp, price in sorted(points, key=lambda point: point[1]):
+                buckets[(mint, bucket_of(timestamp))] = price
+            rows = [TokenPrice(mint=mint, bucket_ts=bucket_ts, price_eur=price, source=os.path.basename(path)[:100])
+                    for (mint, bucket_ts), price in buckets.items()]
+            for start in range(0, len(rows), CHUNK_SIZE):
+                with db_transaction.atomic():
+                    TokenPrice.objects.bulk_create(
+                        rows[start:start + CHUNK_SIZE], update_conflicts=True,
+                        unique_fields=["mint", "bucket_ts"], update_fields=["price_eur", "source"],
+                    )
+            total += len(rows)
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(f"{path}: {len(points)} Preise in {len(rows)} Buckets à {PRICE_BUCKET_SECONDS} s "
+                              f"in {elapsed:.1f} s geladen.")
+        clear_price_cache()
+        self.stdout.write(self.style.SUCCESS(f"{total} Preis-Buckets gespeichert."))
+        self.stdout.write("Bereits berechnete Anschaffungskosten mit 'cost_basis_report --full' neu berechnen.")
+
+    def _read(self, path, default_mint):
+        try:
+            with open(path, encoding="utf-8", newline="") as handle:
+                if path.lower().endswith(".json"):
+                    data = json.load(handle)
+                    records = ([{"timestamp": ts, "price": price} for ts, price in data["prices"]]
+                               if isinstance(data, dict) else data)
+                else:
+                    records = list(csv.DictReader(handle))
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"{path} konnte nicht gelesen werden: {e}")
+
+        points = []
+        for number, record in enumerate(records, start=1):
+            mint = record.get("mint") or default_mint
+            if not mint:
+                raise CommandError(f"{path}, Eintrag {number}: kein Mint angegeben (Spalte 'mint' oder --mint).")
+            try:
+                price = Decimal(str(record.get("price_eur", record.get("price"))))
+                timestamp = parse_timestamp(record["timestamp"])
+            except (InvalidOperation, KeyError, TypeError, ValueError) as e:
+                raise CommandError(f"{path}, Eintrag {number}: ungültiger Eintrag ({e}).")
+            points.append((mint, timestamp, price))
+        return points
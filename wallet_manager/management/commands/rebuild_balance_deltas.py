@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from wallet_manager.ingest import DEFAULT_CHUNK_SIZE, balance_delta_rows
+from wallet_manager.models import BalanceDelta, Wallet, WalletTransaction
+from wallet_manager.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet die Saldoänderungen (BalanceDelta) aus den gespeicherten Rohdaten neu, "
+        "z.B. für Transaktionen, die vor Einführung der Tabelle importiert wurden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wallet", dest="address", help="Nur dieses Wallet neu berechnen (Standard: alle)")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Transaktionen pro Block (Standard: {DEFAULT_CHUNK_SIZE})")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        wallets = Wallet.objects.all()
+        if options["address"]:
+            wallets = wallets.filter(address=options["address"])
+            if not wallets.exists():
+                raise CommandError(f"Wallet {options['address']} ist nicht gespeichert.")
+
+        for wallet in wallets:
+            started_at = time.monotonic()
+            # Löschen und Neuberechnung in einer Datenbanktransaktion: Bei einem Abbruch bleiben die bisherigen
+            # Saldoänderungen erhalten, und Leser sehen nie ein Wallet ohne Saldoänderungen.
+            with db_transaction.atomic():
+                BalanceDelta.objects.filter(wallet=wallet).delete()
+                links = (WalletTransaction.objects.filter(wallet=wallet)
+                         .select_related("transaction__payload")
+                         .only("transaction_id", "block_time", "transaction__id", "transaction__payload"))
+                processed = 0
+                created = 0
+                deltas = []
+                for link in links.iterator(chunk_size=chunk_size):
+                    deltas.extend(balance_delta_rows(wallet, link.transaction_id, link.block_time, link.transaction.raw_data))
+                    processed += 1
+                    if processed % chunk_size == 0:
+                        created += self._store(deltas)
+                        deltas = []
+                created += self._store(deltas)
+                # Die Tagesflüsse der Übersicht beruhen auf den Saldoänderungen.
+                rebuild_daily_rollups(wallet)
+
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(f"{wallet.address}: {created} Saldoänderungen aus {processed} Transaktionen "
+                              f"in {elapsed:.1f} s berechnet.")
+        self.stdout.write(self.style.SUCCESS("Saldoänderungen neu berechnet."))
+
+    @staticmethod
+    def _store(deltas) -> int:
+        BalanceDelta.objects.bulk_create(deltas, ignore_conflicts=True)
+        return len(deltas)
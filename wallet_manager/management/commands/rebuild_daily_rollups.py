@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_manager.models import Wallet
+from wallet_manager.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet die Tageswerte der Übersicht (WalletDailySummary, WalletDailyFlow) aus den gespeicherten "
+        "Transaktionen und Saldoänderungen neu, z.B. für Transaktionen, die vor Einführung der Tabellen importiert wurden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wallet", dest="address", help="Nur dieses Wallet neu berechnen (Standard: alle)")
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.all()
+        if options["address"]:
+            wallets = wallets.filter(address=options["address"])
+            if not wallets.exists():
+                raise CommandError(f"Wallet {options['address']} ist nicht gespeichert.")
+
+        for wallet in wallets:
+            started_at = time.monotonic()
+            days = rebuild_daily_rollups(wallet)
+            self.stdout.write(f"{wallet.address}: {days} Tage in {time.monotonic() - started_at:.1f} s berechnet.")
+        self.stdout.write(self.style.SUCCESS("Tageswerte neu berechnet."))
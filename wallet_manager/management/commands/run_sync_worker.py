@@ -0,0 +1,89 @@
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Set
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from wallet_manager.jobs import claim_jobs, purge_finished_jobs, requeue_stale_jobs, run_job, worker_id
+from wallet_manager.models import SyncJob
+from wallet_manager.solana_utils import SolanaAPI
+
+# Abstand (Sekunden) zwischen zwei Wartungsläufen (hängende Aufträge neu einstellen, alte Aufträge löschen).
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Arbeitet die Sync-Aufträge der Weboberfläche ab (siehe jobs.py). Mehrere Worker-Prozesse können "
+        "parallel laufen; jeder führt bis zu --concurrency Abgleiche gleichzeitig aus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Anzahl gleichzeitig ausgeführter Aufträge (Standard: 4)")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Wartezeit in Sekunden, wenn keine Aufträge anstehen (Standard: 1)")
+        parser.add_argument("--batch-size", type=int, default=None, help="Transaktionen pro JSON-RPC-Batch (Standard: SOLANA_RPC_BATCH_SIZE)")
+        parser.add_argument("--once", action="store_true", help="Beenden, sobald keine fälligen Aufträge mehr anstehen")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        poll_interval = max(0.1, options["poll_interval"])
+        sol_api = SolanaAPI(batch_size=options["batch_size"])
+        worker = worker_id()
+
+        # SIGTERM (z.B. systemd) beendet den Worker, nachdem die laufenden Aufträge abgeschlossen sind.
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+
+        self.stdout.write(f"Sync-Worker {worker} gestartet ({concurrency} gleichzeitige Aufträge).")
+        running: Set[Future] = set()
+        completed = 0
+        last_maintenance = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sync-job") as executor:
+            while not stop.is_set():
+                if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f"{requeued} hängende Aufträge erneut eingestellt."))
+                    purge_finished_jobs()
+                    last_maintenance = time.monotonic()
+
+                jobs = claim_jobs(worker, concurrency - len(running))
+                for job in jobs:
+                    running.add(executor.submit(self._run, job, sol_api))
+                if options["once"] and not jobs and not running:
+                    break
+
+                if running:
+                    done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    running = set(running)
+                    completed += len(done)
+                elif not jobs:
+                    stop.wait(poll_interval)
+
+            if running:
+                self.stdout.write(f"Warte auf {len(running)} laufende Aufträge ...")
+                completed += len(wait(running).done)
+
+        self.stdout.write(self.style.SUCCESS(f"Sync-Worker {worker} beendet, {completed} Aufträge ausgeführt."))
+
+    def _run(self, job: SyncJob, sol_api: SolanaAPI) -> None:
+        started_at = time.monotonic()
+        try:
+            job = run_job(job, sol_api)
+            elapsed = time.monotonic() - started_at
+            if job.status == SyncJob.STATUS_DONE:
+                self.stdout.write(f"Auftrag {job.pk} ({job.get_kind_display()}) für {job.wallet.address}: "
+                                  f"{job.processed} Transaktionen in {elapsed:.1f} s.")
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"Auftrag {job.pk} für {job.wallet.address} fehlgeschlagen (Versuch {job.attempts}): {job.error}"))
+        except Exception as e:
+            # Z.B. Datenbankfehler beim Speichern des Ergebnisses; der Auftrag wird nach SYNC_JOB_TIMEOUT neu eingestellt.
+            self.stderr.write(f"Fehler bei Auftrag {job.pk}: {e}")
+        finally:
+            # Jeder Thread hat eine eigene Datenbankverbindung.
+            connections.close_all()
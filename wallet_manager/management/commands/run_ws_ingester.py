@@ -0,0 +1,41 @@
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+
+from wallet_manager.solana_utils import SolanaAPI
+from wallet_manager.subscriptions import WalletSubscriber, websocket_endpoint
+
+
+class Command(BaseCommand):
+    help = (
+        "Hält WebSocket-Subscriptions (logsSubscribe/accountSubscribe) für alle gespeicherten Wallets offen und "
+        "importiert neue Transaktionen nahezu in Echtzeit. Nach Verbindungsabbrüchen wird neu verbunden und die "
+        "Lücke ab der neuesten gespeicherten Signatur geschlossen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ws-endpoint", default=None, help="WebSocket-URL (Standard: SOLANA_WS_ENDPOINT bzw. aus dem RPC-Endpunkt abgeleitet)")
+        parser.add_argument("--concurrency", type=int, default=4, help="Anzahl gleichzeitig verarbeiteter Wallets (Standard: 4)")
+        parser.add_argument("--batch-size", type=int, default=None, help="Transaktionen pro JSON-RPC-Batch (Standard: SOLANA_RPC_BATCH_SIZE)")
+        parser.add_argument("--no-account-updates", action="store_true", help="Nur logsSubscribe verwenden, kein accountSubscribe")
+
+    def handle(self, *args, **options):
+        sol_api = SolanaAPI(batch_size=options["batch_size"])
+        ws_endpoint = options["ws_endpoint"] or websocket_endpoint(sol_api.rpc_endpoint)
+        self.stdout.write(f"Verbinde mit {ws_endpoint} ...")
+        asyncio.run(self._run(ws_endpoint, sol_api, options))
+
+    async def _run(self, ws_endpoint: str, sol_api: SolanaAPI, options) -> None:
+        subscriber = WalletSubscriber(ws_endpoint, sol_api, concurrency=options["concurrency"],
+                                      account_updates=not options["no_account_updates"])
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        await subscriber.run(stop)
+        stats = subscriber.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Beendet: {stats['notifications']} Meldungen, {stats['inserted']} Transaktionen gespeichert, "
+            f"{stats['gap_syncs']} Lückenabgleiche, {stats['reconnects']} Neuverbindungen."
+        ))
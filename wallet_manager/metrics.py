@@ -0,0 +1,361 @@
+"""
+Kennzahlen (Zähler und Histogramme) für RPC-Aufrufe, Seitenaufrufe und Sync-Aufträge.
+
+Jeder Prozess (Gunicorn-Worker, Sync-Worker, WebSocket-Ingester) zählt im Speicher und schreibt seinen
+Stand höchstens alle METRICS_FLUSH_INTERVAL Sekunden als JSON-Datei nach METRICS_DIR. `/metrics` liest alle
+Dateien des Verzeichnisses und liefert die Summe im Textformat von Prometheus, unabhängig davon, welcher
+Worker die Anfrage beantwortet.
+
+Zusätzlich sammelt `track_request` pro Seitenaufruf bzw. Sync-Auftrag die Zeit in RPC-Aufrufen, in
+Datenbankabfragen und beim Rendern der Templates (siehe middleware.py und jobs.py).
+
+Konfiguration über Umgebungsvariablen:
+
+*   METRICS_DIR: gemeinsames Verzeichnis aller Prozesse eines Hosts. Sollte beim Start des Dienstes geleert werden.
+*   METRICS_FLUSH_INTERVAL: Sekunden zwischen zwei Schreibvorgängen (Standard: 5).
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_METRICS_DIR = os.path.join(tempfile.gettempdir(), "solana_steuer_tool_metrics")
+DEFAULT_FLUSH_INTERVAL = 5.0
+# Obergrenzen der Histogramm-Buckets in Sekunden.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+
+# Name -> (Typ, Beschreibung). Nur hier definierte Kennzahlen werden erfasst.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "solana_rpc_requests_total": (COUNTER, "HTTP-Anfragen an RPC-Endpunkte nach Methode, Endpunkt und Ergebnis."),
+    "solana_rpc_calls_total": (COUNTER, "JSON-RPC-Aufrufe (Batch-Einträge einzeln gezählt) nach Methode und Endpunkt, wie sie Provider gegen ihr Kontingent zählen."),
+    "solana_rpc_request_duration_seconds": (HISTOGRAM, "Dauer einer HTTP-Anfrage an einen RPC-Endpunkt (ohne Wartezeiten für Wiederholungen)."),
+    "solana_rpc_retries_total": (COUNTER, "Wiederholte RPC-Anfragen nach Methode, Endpunkt und Grund."),
+    "solana_rpc_item_errors_total": (COUNTER, "Fehlerhafte Einträge in Batch-Antworten nach Methode und Art."),
+    "solana_rpc_cache_total": (COUNTER, "Zugriffe auf den RPC-Cache nach Methode und Ergebnis (hit/miss)."),
+    "solana_rpc_response_bytes_total": (COUNTER, "Empfangene Bytes aus RPC-Antworten nach Methode und Endpunkt."),
+    "http_requests_total": (COUNTER, "Seitenaufrufe nach View und Statuscode."),
+    "http_request_duration_seconds": (HISTOGRAM, "Antwortzeit der Seitenaufrufe nach View."),
+    "http_request_component_seconds": (HISTOGRAM, "Zeit pro Seitenaufruf in RPC-Aufrufen, Datenbankabfragen und Templates."),
+    "sync_jobs_total": (COUNTER, "Ausgeführte Sync-Aufträge nach Art und Ergebnis."),
+    "sync_job_duration_seconds": (HISTOGRAM, "Laufzeit der Sync-Aufträge nach Art."),
+    "sync_job_component_seconds": (HISTOGRAM, "Zeit pro Sync-Auftrag in RPC-Aufrufen und Datenbankabfragen."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Host (und Port) eines Endpunkts. Pfad und Query werden weggelassen, da Provider dort oft den API-Schlüssel führen.
+    """
+    return urlsplit(endpoint).netloc.rpartition("@")[2] or endpoint
+
+
+class MetricsRegistry:
+    """
+    Zähler und Histogramme eines Prozesses (threadsicher). Nach einem fork beginnt der Kindprozess bei null,
+    damit die vom Elternprozess geerbten Werte nicht doppelt gezählt werden.
+    """
+    def __init__(self, directory: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {} # Bucket-Zähler..., Summe, Anzahl
+        self._flushed_at = time.monotonic()
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._reset()
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_pid()
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_pid()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0.0] * (len(DEFAULT_BUCKETS) + 2)
+            for index, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += value
+            histogram[-1] += 1
+        self._maybe_flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._check_pid()
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, list(labels), list(values)] for (name, labels), values in self._histograms.items()],
+            }
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Schreibt den Stand dieses Prozesses (atomar über eine temporäre Datei).
+        """
+        # Ein gleichzeitiger Schreibvorgang eines anderen Threads genügt.
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._flushed_at = time.monotonic()
+            data = json.dumps(self.snapshot(), separators=(",", ":"))
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path()
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            # Kennzahlen dürfen die Anwendung nie stören; der nächste Versuch folgt beim nächsten Intervall.
+            pass
+        finally:
+            self._flush_lock.release()
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry(os.getenv("METRICS_DIR", DEFAULT_METRICS_DIR),
+                                        float(os.getenv("METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)))
+            atexit.register(_registry.flush)
+        return _registry
+
+
+@contextmanager
+def temporary_registry(directory: str) -> Iterator[MetricsRegistry]:
+    """
+    Erfasst Kennzahlen vorübergehend getrennt von METRICS_DIR, z.B. während eines Benchmarks.
+    """
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, MetricsRegistry(directory)
+    try:
+        yield _registry
+    finally:
+        with _registry_lock:
+            _registry = previous
+
+
+def inc(name: str, amount: float = 1.0, **labels: str) -> None:
+    get_registry().inc(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    get_registry().observe(name, value, **labels)
+
+
+def collect() -> Dict[str, Any]:
+    """
+    Summiert die Stände aller Prozesse in METRICS_DIR (nach dem Schreiben des eigenen Stands).
+    """
+    registry = get_registry()
+    registry.flush()
+    counters: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], List[float]] = {}
+    try:
+        names = os.listdir(registry.directory)
+    except OSError:
+        names = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(registry.directory, name), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for metric, labels, value in data.get("counters", []):
+            key = (metric, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0.0) + value
+        for metric, labels, values in data.get("histograms", []):
+            key = (metric, tuple(tuple(label) for label in labels))
+            if len(values) != len(DEFAULT_BUCKETS) + 2:
+                continue
+            current = histograms.setdefault(key, [0.0] * len(values))
+            for index, value in enumerate(values):
+                current[index] += value
+    return {"counters": counters, "histograms": histograms}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_prometheus(collected: Dict[str, Any]) -> str:
+    """
+    Textformat von Prometheus (Version 0.0.4).
+    """
+    lines: List[str] = []
+    for metric, (kind, description) in METRICS.items():
+        if kind == COUNTER:
+            series = sorted((labels, value) for (name, labels), value in collected["counters"].items() if name == metric)
+        else:
+            series = sorted((labels, values) for (name, labels), values in collected["histograms"].items() if name == metric)
+        if not series:
+            continue
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for labels, value in series:
+            if kind == COUNTER:
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip(DEFAULT_BUCKETS, value):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(labels, ('le', repr(bound)))} {_format_value(cumulative)}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {_format_value(value[-1])}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {_format_value(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """
+    Zeitaufteilung eines Seitenaufrufs oder Sync-Auftrags. RPC-Zeiten nebenläufiger Aufrufe werden addiert.
+    """
+    __slots__ = ("rpc_seconds", "rpc_calls", "db_seconds", "db_queries", "template_seconds")
+
+    def __init__(self):
+        self.rpc_seconds = 0.0
+        self.rpc_calls = 0
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.template_seconds = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """
+        Für `connection.execute_wrapper`: misst jede Datenbankabfrage.
+        """
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started_at
+            self.db_queries += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rpc_ms": round(self.rpc_seconds * 1000, 1),
+            "rpc_calls": self.rpc_calls,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "db_queries": self.db_queries,
+            "template_ms": round(self.template_seconds * 1000, 1),
+        }
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("wallet_manager_request_stats", default=None)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestStats]:
+    """
+    Sammelt RPC-, Datenbank- und Template-Zeiten des laufenden Seitenaufrufs bzw. Auftrags.
+    Die Datenbankzeit wird nur erfasst, wenn der Aufrufer `stats.db_wrapper` an der Verbindung registriert.
+    """
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def rpc_timer(calls: int = 1) -> Iterator[None]:
+    """
+    Rechnet die Dauer des Blocks (inkl. Wiederholungen und Endpunktwechsel) dem laufenden Seitenaufruf zu.
+    """
+    stats = _request_stats.get()
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.rpc_seconds += time.perf_counter() - started_at
+            stats.rpc_calls += calls
+
+
+@contextmanager
+def template_timer() -> Iterator[None]:
+    stats = _request_stats.get()
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.template_seconds += time.perf_counter() - started_at
+
+
+def record_rpc_request(method: str, endpoint: str, seconds: float, outcome: str, calls: int = 1) -> None:
+    """
+    Erfasst eine HTTP-Anfrage an einen RPC-Endpunkt. `outcome`: ok, rate_limited, http_error, transport_error, error.
+    """
+    endpoint = endpoint_label(endpoint)
+    inc("solana_rpc_requests_total", method=method, endpoint=endpoint, outcome=outcome)
+    inc("solana_rpc_calls_total", calls, method=method, endpoint=endpoint)
+    observe("solana_rpc_request_duration_seconds", seconds, method=method, endpoint=endpoint)
+
+
+def record_rpc_retry(method: str, endpoint: str, reason: str) -> None:
+    inc("solana_rpc_retries_total", method=method, endpoint=endpoint_label(endpoint), reason=reason)
+
+
+def record_rpc_bytes(method: str, endpoint: str, size: int) -> None:
+    inc("solana_rpc_response_bytes_total", size, method=method, endpoint=endpoint_label(endpoint))
+
+
+def record_cache(method: str, hits: int, misses: int) -> None:
+    if hits:
+        inc("solana_rpc_cache_total", hits, method=method, result="hit")
+    if misses:
+        inc("solana_rpc_cache_total", misses, method=method, result="miss")
+
+
+def record_item_error(method: str, kind: str, count: int = 1) -> None:
+    inc("solana_rpc_item_errors_total", count, method=method, kind=kind)
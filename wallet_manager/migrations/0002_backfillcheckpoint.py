@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BackfillCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "before_signature",
+                    models.CharField(
+                        blank=True,
+                        help_text="Älteste vollständig verarbeitete Signatur; der Backfill setzt vor dieser Signatur fort",
+                        max_length=88,
+                        null=True,
+                    ),
+                ),
+                (
+                    "processed_count",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Anzahl der bisher verarbeiteten Signaturen",
+                    ),
+                ),
+                (
+                    "completed",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Gibt an, ob die gesamte Historie importiert wurde",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Zeitpunkt der letzten Aktualisierung des Checkpoints",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.OneToOneField(
+                        help_text="Das Wallet, dessen Historie importiert wird",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="backfill_checkpoint",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Backfill-Checkpoint",
+                "verbose_name_plural": "Backfill-Checkpoints",
+            },
+        ),
+    ]
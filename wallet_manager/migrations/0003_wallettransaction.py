@@ -0,0 +1,160 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_existing_transactions(apps, schema_editor):
+    """
+    Verknüpft alle bereits gespeicherten Transaktionen mit dem Wallet, über das sie importiert wurden.
+    """
+    Transaction = apps.get_model("wallet_manager", "Transaction")
+    WalletTransaction = apps.get_model("wallet_manager", "WalletTransaction")
+    links = []
+    for tx in Transaction.objects.select_related("wallet").iterator(chunk_size=1000):
+        account_keys = (
+            (tx.raw_transaction_data or {})
+            .get("transaction", {})
+            .get("message", {})
+            .get("accountKeys", [])
+        )
+        role, account_index = "unknown", None
+        for index, key in enumerate(account_keys):
+            if (
+                key.get("pubkey") if isinstance(key, dict) else key
+            ) != tx.wallet.address:
+                continue
+            account_index = index
+            if index == 0:
+                role = "fee_payer"
+            elif isinstance(key, dict) and key.get("signer"):
+                role = "signer"
+            elif isinstance(key, dict) and key.get("writable"):
+                role = "writable"
+            else:
+                role = "readonly"
+            break
+        links.append(
+            WalletTransaction(
+                wallet_id=tx.wallet_id,
+                transaction_id=tx.id,
+                block_time=tx.block_time,
+                role=role,
+                account_index=account_index,
+            )
+        )
+        if len(links) >= 1000:
+            WalletTransaction.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    WalletTransaction.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0002_backfillcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="wallet",
+            field=models.ForeignKey(
+                help_text="Das Wallet, über das diese Transaktion zuerst importiert wurde",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to="wallet_manager.wallet",
+            ),
+        ),
+        migrations.CreateModel(
+            name="WalletTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "block_time",
+                    models.BigIntegerField(
+                        help_text="Unix-Timestamp der Transaktion (aus der Transaktion übernommen)"
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("fee_payer", "Gebührenzahler"),
+                            ("signer", "Unterzeichner"),
+                            ("writable", "Beschreibbares Konto"),
+                            ("readonly", "Nur-Lese-Konto"),
+                            ("token_owner", "Eigentümer eines Token-Kontos"),
+                            ("unknown", "Unbekannt"),
+                        ],
+                        default="unknown",
+                        help_text="Rolle des Wallets in der Transaktion",
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "account_index",
+                    models.SmallIntegerField(
+                        blank=True,
+                        help_text="Index des Wallets in accountKeys der Transaktion, falls direkt enthalten",
+                        null=True,
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        help_text="Die Transaktion",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wallet_links",
+                        to="wallet_manager.transaction",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        help_text="Das beteiligte Wallet",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transaction_links",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Wallet-Transaktion",
+                "verbose_name_plural": "Wallet-Transaktionen",
+                "ordering": ["-block_time"],
+            },
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="wallets",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Alle verfolgten Wallets, die an dieser Transaktion beteiligt sind",
+                related_name="linked_transactions",
+                through="wallet_manager.WalletTransaction",
+                to="wallet_manager.wallet",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wallettransaction",
+            index=models.Index(
+                fields=["wallet", "-block_time"], name="wallet_mana_wallet__7fd6ee_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="wallettransaction",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "transaction"), name="unique_wallet_transaction"
+            ),
+        ),
+        migrations.RunPython(link_existing_transactions, migrations.RunPython.noop),
+    ]
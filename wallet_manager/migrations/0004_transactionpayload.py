@@ -0,0 +1,128 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:31
+
+import json
+import zlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_payloads(apps, schema_editor):
+    """
+    Verschiebt die JSON-Rohdaten komprimiert (zlib) in die Nebentabelle und setzt `success` aus meta.err.
+    """
+    Transaction = apps.get_model("wallet_manager", "Transaction")
+    TransactionPayload = apps.get_model("wallet_manager", "TransactionPayload")
+    payloads = []
+    failed_ids = []
+    for tx in Transaction.objects.only(
+        "id", "meta_data", "raw_transaction_data"
+    ).iterator(chunk_size=500):
+        data = tx.raw_transaction_data or {"meta": tx.meta_data or {}}
+        if (tx.meta_data or {}).get("err"):
+            failed_ids.append(tx.id)
+        raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode(
+            "utf-8"
+        )
+        payloads.append(
+            TransactionPayload(
+                transaction_id=tx.id,
+                data=zlib.compress(raw, 6),
+                codec="zlib",
+                raw_size=len(raw),
+            )
+        )
+        if len(payloads) >= 500:
+            TransactionPayload.objects.bulk_create(payloads, ignore_conflicts=True)
+            payloads = []
+    TransactionPayload.objects.bulk_create(payloads, ignore_conflicts=True)
+    for start in range(0, len(failed_ids), 1000):
+        Transaction.objects.filter(id__in=failed_ids[start : start + 1000]).update(
+            success=False
+        )
+
+
+def restore_payloads(apps, schema_editor):
+    """
+    Schreibt die Rohdaten beim Zurücksetzen der Migration wieder in die JSON-Felder.
+    """
+    Transaction = apps.get_model("wallet_manager", "Transaction")
+    TransactionPayload = apps.get_model("wallet_manager", "TransactionPayload")
+    for payload in TransactionPayload.objects.iterator(chunk_size=500):
+        if payload.codec != "zlib":
+            import zstandard
+
+            raw = zstandard.ZstdDecompressor().decompress(bytes(payload.data))
+        else:
+            raw = zlib.decompress(bytes(payload.data))
+        data = json.loads(raw)
+        Transaction.objects.filter(id=payload.transaction_id).update(
+            raw_transaction_data=data, meta_data=data.get("meta") or {}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0003_wallettransaction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionPayload",
+            fields=[
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        help_text="Die zugehörige Transaktion",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="payload",
+                        serialize=False,
+                        to="wallet_manager.transaction",
+                    ),
+                ),
+                (
+                    "data",
+                    models.BinaryField(
+                        help_text="Komprimierte JSON-Antwort von get_transaction"
+                    ),
+                ),
+                (
+                    "codec",
+                    models.CharField(
+                        help_text="Kompressionsverfahren der Daten (zlib oder zstd)",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "raw_size",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Größe der unkomprimierten JSON-Daten in Bytes",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transaktions-Rohdaten",
+                "verbose_name_plural": "Transaktions-Rohdaten",
+            },
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="success",
+            field=models.BooleanField(
+                default=True,
+                help_text="Gibt an, ob die Transaktion erfolgreich war (meta.err ist leer)",
+            ),
+        ),
+        migrations.RunPython(move_payloads, restore_payloads),
+        migrations.RemoveField(
+            model_name="transaction",
+            name="meta_data",
+        ),
+        migrations.RemoveField(
+            model_name="transaction",
+            name="raw_transaction_data",
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0004_transactionpayload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceDelta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "mint",
+                    models.CharField(
+                        help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL",
+                        max_length=44,
+                    ),
+                ),
+                (
+                    "delta",
+                    models.DecimalField(
+                        decimal_places=0,
+                        help_text="Änderung als Rohbetrag (Lamports bzw. kleinste Token-Einheit), negativ bei Abgang",
+                        max_digits=40,
+                    ),
+                ),
+                (
+                    "decimals",
+                    models.PositiveSmallIntegerField(
+                        help_text="Dezimalstellen des Tokens (9 für SOL)"
+                    ),
+                ),
+                (
+                    "block_time",
+                    models.BigIntegerField(
+                        help_text="Unix-Timestamp der Transaktion (aus der Transaktion übernommen)"
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        help_text="Die verursachende Transaktion",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_deltas",
+                        to="wallet_manager.transaction",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        help_text="Das Wallet, dessen Saldo sich ändert",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_deltas",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Saldoänderung",
+                "verbose_name_plural": "Saldoänderungen",
+                "indexes": [
+                    models.Index(
+                        fields=["wallet", "mint", "block_time"],
+                        name="wallet_mana_wallet__80d26b_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="balancedelta",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "transaction", "mint"),
+                name="unique_wallet_transaction_mint",
+            ),
+        ),
+    ]
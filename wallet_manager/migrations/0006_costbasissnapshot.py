@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0005_balancedelta"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CostBasisSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope_key",
+                    models.CharField(
+                        help_text="Sortierte, kommagetrennte IDs der Wallets des Portfolios",
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "state",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Offene Lots pro Mint und Summen pro Kalenderjahr",
+                    ),
+                ),
+                (
+                    "last_block_time",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="block_time der zuletzt verarbeiteten Saldoänderung",
+                    ),
+                ),
+                (
+                    "last_transaction_id",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Transaktions-ID der zuletzt verarbeiteten Saldoänderung",
+                    ),
+                ),
+                (
+                    "event_count",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Anzahl der bis zur Position verarbeiteten Saldoänderungen",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Zeitpunkt der letzten Berechnung"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Anschaffungskosten-Snapshot",
+                "verbose_name_plural": "Anschaffungskosten-Snapshots",
+            },
+        ),
+    ]
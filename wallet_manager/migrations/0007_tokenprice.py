@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0006_costbasissnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TokenPrice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "mint",
+                    models.CharField(
+                        help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL",
+                        max_length=44,
+                    ),
+                ),
+                (
+                    "bucket_ts",
+                    models.BigIntegerField(
+                        help_text="Beginn des Zeit-Buckets als Unix-Timestamp"
+                    ),
+                ),
+                (
+                    "price_eur",
+                    models.DecimalField(
+                        decimal_places=12,
+                        help_text="Preis einer ganzen Einheit in EUR",
+                        max_digits=30,
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        blank=True,
+                        help_text="Herkunft des Preises, z.B. der Dateiname des Dumps",
+                        max_length=100,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Token-Preis",
+                "verbose_name_plural": "Token-Preise",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="tokenprice",
+            constraint=models.UniqueConstraint(
+                fields=("mint", "bucket_ts"), name="unique_mint_bucket"
+            ),
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0007_tokenprice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("new", "Neue Transaktionen"),
+                            ("older", "Ältere Transaktionen"),
+                        ],
+                        default="new",
+                        help_text="Art des Abgleichs",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "limit",
+                    models.PositiveIntegerField(
+                        default=10,
+                        help_text="Anzahl der Transaktionen beim ersten Abruf bzw. beim Nachladen älterer Transaktionen",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ausstehend"),
+                            ("running", "Läuft"),
+                            ("done", "Abgeschlossen"),
+                            ("failed", "Fehlgeschlagen"),
+                        ],
+                        default="pending",
+                        help_text="Bearbeitungsstand des Auftrags",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="Anzahl der bisherigen Ausführungsversuche"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Anzahl der neu gespeicherten oder verknüpften Transaktionen",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True, help_text="Fehlermeldung des letzten Versuchs"
+                    ),
+                ),
+                (
+                    "worker",
+                    models.CharField(
+                        blank=True,
+                        help_text="Kennung des Workers (Host:PID), der den Auftrag bearbeitet",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Zeitpunkt, zu dem der Auftrag eingestellt wurde",
+                    ),
+                ),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Frühester Zeitpunkt der (nächsten) Ausführung, z.B. nach einem Fehlschlag",
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, help_text="Beginn der letzten Ausführung", null=True
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, help_text="Ende der letzten Ausführung", null=True
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        help_text="Das abzugleichende Wallet",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_jobs",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sync-Auftrag",
+                "verbose_name_plural": "Sync-Aufträge",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="wallet_mana_status_2731d5_idx",
+                    ),
+                    models.Index(
+                        fields=["wallet", "status"],
+                        name="wallet_mana_wallet__da65a2_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
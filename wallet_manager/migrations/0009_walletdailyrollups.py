@@ -0,0 +1,132 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_manager", "0008_syncjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WalletDailyFlow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(help_text="Kalendertag (UTC)")),
+                (
+                    "mint",
+                    models.CharField(
+                        help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL",
+                        max_length=44,
+                    ),
+                ),
+                (
+                    "net_flow",
+                    models.DecimalField(
+                        decimal_places=0,
+                        help_text="Netto-Zu- bzw. -Abfluss als Rohbetrag (Lamports bzw. kleinste Token-Einheit)",
+                        max_digits=40,
+                    ),
+                ),
+                (
+                    "decimals",
+                    models.PositiveSmallIntegerField(
+                        help_text="Dezimalstellen des Tokens (9 für SOL)"
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        help_text="Das Wallet",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_flows",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tagesfluss",
+                "verbose_name_plural": "Tagesflüsse",
+            },
+        ),
+        migrations.CreateModel(
+            name="WalletDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(help_text="Kalendertag (UTC)")),
+                (
+                    "transaction_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Anzahl der Transaktionen, an denen das Wallet beteiligt ist",
+                    ),
+                ),
+                (
+                    "failed_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Davon fehlgeschlagene Transaktionen"
+                    ),
+                ),
+                (
+                    "fees_paid",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Gezahlte Gebühren in Lamports (nur Transaktionen, in denen das Wallet Gebührenzahler ist)",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        help_text="Das Wallet",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_summaries",
+                        to="wallet_manager.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tageswert",
+                "verbose_name_plural": "Tageswerte",
+                "indexes": [
+                    models.Index(fields=["day"], name="wallet_mana_day_c914af_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="walletdailysummary",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "day"), name="unique_wallet_day"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="walletdailyflow",
+            index=models.Index(
+                fields=["day", "mint"], name="wallet_mana_day_342782_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="walletdailyflow",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "day", "mint"), name="unique_wallet_day_mint"
+            ),
+        ),
+    ]
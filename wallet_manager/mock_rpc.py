@@ -0,0 +1,508 @@
+"""
+Lokaler Ersatz für einen Solana JSON-RPC-Endpunkt, z.B. für `manage.py benchmark`.
+
+Der Server beantwortet `getSignaturesForAddress` (mit before/until/limit), `getTransaction` und `getHealth`
+aus aufgezeichneten oder synthetischen Fixtures, einzeln und als JSON-RPC-Batch. Latenz, Fehler und
+Rate Limits (HTTP 429) lassen sich gezielt einstellen; der Zufallsgenerator ist reproduzierbar (seed).
+
+`MockWebSocketServer` ersetzt den WebSocket-Endpunkt für `run_ws_ingester`: Er bestätigt Subscriptions und
+meldet für das Wallet der Fixtures dessen Signaturen als `logsNotification`.
+
+Fixture-Format (JSON, optional gzip-komprimiert mit Endung .gz):
+
+    {"address": "<Wallet>", "signatures": [<getSignaturesForAddress-Einträge, neueste zuerst>],
+     "transactions": {"<Signatur>": <getTransaction-Ergebnis (jsonParsed)>}}
+"""
+import asyncio
+import gzip
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import httpx
+import websockets
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from .decoder import DEX_PROGRAMS, SYSTEM_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+# JSON-RPC-Fehlercodes der injizierten Fehler.
+ERROR_CODE_SERVER = -32000
+ERROR_CODE_METHOD_NOT_FOUND = -32601
+# Seitengröße beim Aufzeichnen (Maximum von getSignaturesForAddress).
+RECORD_PAGE_SIZE = 1000
+
+
+class RPCFixtures:
+    """
+    Signaturliste und Transaktionsdetails eines Wallets.
+    """
+    def __init__(self, address: str, signatures: List[Dict[str, Any]], transactions: Dict[str, Dict[str, Any]]):
+        self.address = address
+        self.signatures = signatures
+        self.transactions = transactions
+        self._positions = {sig_info["signature"]: index for index, sig_info in enumerate(signatures)}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def position(self, signature: Optional[str]) -> Optional[int]:
+        return self._positions.get(signature) if signature else None
+
+    def details(self) -> List[Dict[str, Any]]:
+        """
+        Die Transaktionsdetails in der Reihenfolge der Signaturliste (neueste zuerst).
+        """
+        return [self.transactions[sig_info["signature"]] for sig_info in self.signatures
+                if sig_info["signature"] in self.transactions]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"address": self.address, "signatures": self.signatures, "transactions": self.transactions}
+
+
+def load_fixtures(path: str) -> RPCFixtures:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return RPCFixtures(data["address"], data["signatures"], data["transactions"])
+
+
+def save_fixtures(fixtures: RPCFixtures, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(fixtures.to_dict(), f, separators=(",", ":"))
+
+
+def _random_pubkey(rng: random.Random) -> str:
+    return str(Pubkey(bytes(rng.getrandbits(8) for _ in range(32))))
+
+
+def _random_signature(rng: random.Random) -> str:
+    return str(Signature(bytes(rng.getrandbits(8) for _ in range(64))))
+
+
+def _token_balance(account_index: int, mint: str, owner: str, amount: int, decimals: int) -> Dict[str, Any]:
+    return {"accountIndex": account_index, "mint": mint, "owner": owner, "programId": TOKEN_PROGRAM_ID,
+            "uiTokenAmount": {"amount": str(amount), "decimals": decimals,
+                              "uiAmount": amount / 10 ** decimals, "uiAmountString": str(amount / 10 ** decimals)}}
+
+
+def _transfer(source: str, destination: str, lamports: int) -> Dict[str, Any]:
+    return {"program": "system", "programId": SYSTEM_PROGRAM_ID,
+            "parsed": {"type": "transfer", "info": {"source": source, "destination": destination, "lamports": lamports}}}
+
+
+def _token_transfer(source: str, destination: str, authority: str, mint: str, amount: int, decimals: int) -> Dict[str, Any]:
+    return {"program": "spl-token", "programId": TOKEN_PROGRAM_ID,
+            "parsed": {"type": "transferChecked", "info": {
+                "source": source, "destination": destination, "authority": authority, "mint": mint,
+                "tokenAmount": {"amount": str(amount), "decimals": decimals}}}}
+
+
+def synthetic_fixtures(count: int, seed: int = 0) -> RPCFixtures:
+    """
+    Erzeugt `count` Transaktionen eines Wallets in ähnlicher Mischung wie auf Mainnet: SOL-Überweisungen
+    (ein- und ausgehend), Token-Überweisungen, Swaps mit inneren Instruktionen und fehlgeschlagene Transaktionen.
+    """
+    rng = random.Random(seed)
+    address = _random_pubkey(rng)
+    token_account = _random_pubkey(rng)
+    mints = [_random_pubkey(rng) for _ in range(5)]
+    counterparties = [_random_pubkey(rng) for _ in range(50)]
+    dex_programs = sorted(DEX_PROGRAMS)
+    fee = 5000
+    balance = 1_000 * 10 ** 9
+    token_balance = 10 ** 12
+    slot = 250_000_000
+    block_time = 1_700_000_000
+
+    signatures: List[Dict[str, Any]] = []
+    transactions: Dict[str, Dict[str, Any]] = {}
+    for index in range(count):
+        slot += rng.randint(1, 5000)
+        block_time += rng.randint(1, 3600)
+        signature = _random_signature(rng)
+        counterparty = rng.choice(counterparties)
+        mint = rng.choice(mints)
+        kind = rng.choices(("sol_out", "sol_in", "token", "swap", "failed"), weights=(30, 25, 20, 15, 10))[0]
+
+        account_keys = [address, counterparty, SYSTEM_PROGRAM_ID]
+        instructions: List[Dict[str, Any]] = []
+        inner_instructions: List[Dict[str, Any]] = []
+        pre_token_balances: List[Dict[str, Any]] = []
+        post_token_balances: List[Dict[str, Any]] = []
+        err = None
+        fee_payer_is_wallet = kind != "sol_in"
+        pre_balances = [balance, rng.randint(10 ** 6, 10 ** 12), 1]
+        post_balances = list(pre_balances)
+
+        if kind == "sol_out":
+            lamports = rng.randint(10 ** 5, 10 ** 9)
+            instructions.append(_transfer(address, counterparty, lamports))
+            post_balances[0] -= lamports
+            post_balances[1] += lamports
+        elif kind == "sol_in":
+            lamports = rng.randint(10 ** 5, 10 ** 10)
+            account_keys = [counterparty, address, SYSTEM_PROGRAM_ID]
+            pre_balances = [pre_balances[1], balance, 1]
+            post_balances = [pre_balances[0] - lamports - fee, balance + lamports, 1]
+            instructions.append(_transfer(counterparty, address, lamports))
+        elif kind in ("token", "swap"):
+            counterparty_token_account = _random_pubkey(rng)
+            account_keys = [address, token_account, counterparty_token_account, TOKEN_PROGRAM_ID]
+            pre_balances = [balance, 2_039_280, 2_039_280, 1]
+            post_balances = list(pre_balances)
+            amount = rng.randint(1, 10 ** 9)
+            outgoing = rng.random() < 0.5 and token_balance > amount
+            source, destination = ((token_account, counterparty_token_account) if outgoing
+                                   else (counterparty_token_account, token_account))
+            transfer = _token_transfer(source, destination, address if outgoing else counterparty, mint, amount, 6)
+            new_token_balance = token_balance - amount if outgoing else token_balance + amount
+            pre_token_balances.append(_token_balance(1, mint, address, token_balance, 6))
+            post_token_balances.append(_token_balance(1, mint, address, new_token_balance, 6))
+            token_balance = new_token_balance
+            if kind == "token":
+                instructions.append(transfer)
+            else:
+                program_id = rng.choice(dex_programs)
+                account_keys.append(program_id)
+                pre_balances.append(1)
+                post_balances.append(1)
+                lamports = rng.randint(10 ** 6, 10 ** 9)
+                instructions.append({"programId": program_id, "accounts": account_keys[:3], "data": "3Bxs4h24hBtQy9rw"})
+                inner_instructions.append({"index": 0, "instructions": [transfer, _transfer(address, counterparty, lamports)]})
+                post_balances[0] -= lamports
+        else:
+            instructions.append(_transfer(address, counterparty, rng.randint(10 ** 5, 10 ** 9)))
+            err = {"InstructionError": [0, {"Custom": 1}]}
+
+        if fee_payer_is_wallet:
+            post_balances[0] -= fee
+        balance = post_balances[account_keys.index(address)]
+
+        signatures.append({"signature": signature, "slot": slot, "blockTime": block_time, "err": err,
+                           "memo": None, "confirmationStatus": "finalized"})
+        transactions[signature] = {
+            "slot": slot,
+            "blockTime": block_time,
+            "meta": {
+                "err": err, "fee": fee, "status": {"Err": err} if err else {"Ok": None},
+                "preBalances": pre_balances, "postBalances": post_balances,
+                "preTokenBalances": pre_token_balances, "postTokenBalances": post_token_balances,
+                "innerInstructions": inner_instructions, "logMessages": [], "rewards": [],
+                "computeUnitsConsumed": rng.randint(300, 200_000),
+            },
+            "transaction": {
+                "signatures": [signature],
+                "message": {
+                    "accountKeys": [{"pubkey": key, "signer": position == 0, "writable": position < 3,
+                                     "source": "transaction"} for position, key in enumerate(account_keys)],
+                    "instructions": instructions,
+                    "recentBlockhash": _random_pubkey(rng),
+                },
+            },
+            "version": 0,
+        }
+
+    # getSignaturesForAddress liefert die neuesten Transaktionen zuerst.
+    signatures.reverse()
+    return RPCFixtures(address, signatures, transactions)
+
+
+def _rpc_call(client: httpx.Client, endpoint: str, payload: Any) -> Any:
+    response = client.post(endpoint, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+def record_fixtures(endpoint: str, address: str, limit: int, batch_size: int = 50, timeout: float = 30.0) -> RPCFixtures:
+    """
+    Zeichnet die neuesten `limit` Signaturen eines Wallets samt Transaktionsdetails von einem echten Endpunkt auf.
+    """
+    signatures: List[Dict[str, Any]] = []
+    transactions: Dict[str, Dict[str, Any]] = {}
+    with httpx.Client(timeout=timeout) as client:
+        before = None
+        while len(signatures) < limit:
+            options = {"limit": min(RECORD_PAGE_SIZE, limit - len(signatures))}
+            if before:
+                options["before"] = before
+            data = _rpc_call(client, endpoint, {"jsonrpc": "2.0", "id": 1, "method": "getSignaturesForAddress",
+                                                "params": [address, options]})
+            if data.get("error"):
+                raise RuntimeError(f"getSignaturesForAddress fehlgeschlagen: {data['error']}")
+            page = data.get("result") or []
+            signatures.extend(page)
+            if len(page) < options["limit"]:
+                break
+            before = page[-1]["signature"]
+
+        for start in range(0, len(signatures), batch_size):
+            chunk = [sig_info["signature"] for sig_info in signatures[start:start + batch_size]]
+            payload = [{"jsonrpc": "2.0", "id": request_id, "method": "getTransaction",
+                        "params": [signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0,
+                                               "commitment": "finalized"}]}
+                       for request_id, signature in enumerate(chunk)]
+            for item in _rpc_call(client, endpoint, payload):
+                if item.get("result"):
+                    transactions[chunk[item["id"]]] = item["result"]
+
+    # Nur Signaturen mit Details, damit der Server nichts liefert, was er später nicht auflösen kann.
+    signatures = [sig_info for sig_info in signatures if sig_info["signature"] in transactions]
+    return RPCFixtures(address, signatures, transactions)
+
+
+class MockRPCServer:
+    """
+    HTTP-Server mit JSON-RPC-Schnittstelle auf einem freien lokalen Port.
+
+    :param fixtures: Die ausgelieferten Signaturen und Transaktionen.
+    :param latency: Verzögerung (Sekunden) pro HTTP-Anfrage; ein Batch zählt als eine Anfrage.
+    :param jitter: Zusätzliche zufällige Verzögerung (0 bis `jitter` Sekunden).
+    :param error_rate: Anteil der Aufrufe, die mit einem JSON-RPC-Fehler beantwortet werden (pro Batch-Eintrag).
+    :param server_error_rate: Anteil der HTTP-Anfragen, die mit HTTP 503 abgelehnt werden.
+    :param rate_limit_rate: Anteil der HTTP-Anfragen, die mit HTTP 429 abgelehnt werden.
+    :param retry_after: Retry-After-Header (Sekunden) der 429-Antworten; None = ohne Header.
+    :param shuffle_batches: Antworten eines Batches in zufälliger Reihenfolge (wie bei manchen Providern).
+    """
+    def __init__(self, fixtures: RPCFixtures, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 server_error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: Optional[float] = None,
+                 shuffle_batches: bool = False, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.server_error_rate = server_error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.shuffle_batches = shuffle_batches
+        self.stats: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockRPCServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-rpc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockRPCServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+
+    def _signatures(self, params: List[Any]) -> List[Dict[str, Any]]:
+        address = params[0] if params else None
+        if address != self.fixtures.address:
+            return []
+        options = params[1] if len(params) > 1 and isinstance(params[1], dict) else {}
+        limit = max(1, min(int(options.get("limit") or RECORD_PAGE_SIZE), RECORD_PAGE_SIZE))
+        start = 0
+        if options.get("before"):
+            position = self.fixtures.position(options["before"])
+            start = len(self.fixtures) if position is None else position + 1
+        end = len(self.fixtures)
+        if options.get("until"):
+            position = self.fixtures.position(options["until"])
+            end = end if position is None else position
+        return self.fixtures.signatures[start:min(end, start + limit)]
+
+    def handle_call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Beantwortet einen einzelnen JSON-RPC-Aufruf.
+        """
+        method = request.get("method")
+        request_id = request.get("id")
+        params = request.get("params") or []
+        self._count(f"calls.{method}")
+        if method != "getHealth" and self._chance(self.error_rate):
+            self._count("injected_errors")
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": ERROR_CODE_SERVER, "message": "Injected error"}}
+        if method == "getHealth":
+            result: Any = "ok"
+        elif method == "getSignaturesForAddress":
+            result = self._signatures(params)
+        elif method == "getTransaction":
+            result = self.fixtures.transactions.get(params[0]) if params else None
+        else:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": ERROR_CODE_METHOD_NOT_FOUND, "message": f"Method not found: {method}"}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                # Eine Verbindung pro Aufruf von setup(); mit Keep-Alive deutlich weniger als http_requests.
+                super().setup()
+                server._count("connections")
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                server._count("http_requests")
+                time.sleep(server._delay())
+                if server._chance(server.rate_limit_rate):
+                    server._count("rate_limited")
+                    headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else None
+                    self._send(429, b'{"jsonrpc":"2.0","id":null,"error":{"code":429,"message":"Too many requests"}}', headers)
+                    return
+                if server._chance(server.server_error_rate):
+                    server._count("server_errors")
+                    self._send(503, b"Service unavailable")
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self._send(400, b'{"jsonrpc":"2.0","id":null,"error":{"code":-32700,"message":"Parse error"}}')
+                    return
+                if isinstance(payload, list):
+                    server._count("batches")
+                    result: Any = [server.handle_call(item) for item in payload]
+                    if server.shuffle_batches:
+                        with server._lock:
+                            server._rng.shuffle(result)
+                else:
+                    result = server.handle_call(payload)
+                self._send(200, json.dumps(result, separators=(",", ":")).encode("utf-8"))
+
+        return Handler
+
+
+class MockWebSocketServer:
+    """
+    WebSocket-Server mit Solana-Subscriptions auf einem freien lokalen Port (eigener Thread und Event-Loop).
+
+    Jede `*Subscribe`-Anfrage wird mit einer neuen Subscription-ID bestätigt. Nennt eine `logsSubscribe`-Anfrage
+    das Wallet der Fixtures (mentions), folgt nach `notify_delay` Sekunden für die `notify` neuesten Signaturen
+    (None: alle) je eine `logsNotification`, älteste zuerst.
+    """
+    def __init__(self, fixtures: RPCFixtures, notify: Optional[int] = None, notify_delay: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.fixtures = fixtures
+        self.notify = notify
+        self.notify_delay = notify_delay
+        self.host = host
+        self.port = port
+        self.stats: Counter = Counter()
+        self._subscription_ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> "MockWebSocketServer":
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="mock-ws", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockWebSocketServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handle, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def _notifications(self, subscription: int) -> List[Dict[str, Any]]:
+        sig_infos = self.fixtures.signatures if self.notify is None else self.fixtures.signatures[:self.notify]
+        return [
+            {"jsonrpc": "2.0", "method": "logsNotification", "params": {
+                "subscription": subscription,
+                "result": {"context": {"slot": sig_info.get("slot") or 0},
+                           "value": {"signature": sig_info["signature"], "err": sig_info.get("err"), "logs": []}},
+            }}
+            for sig_info in reversed(sig_infos)
+        ]
+
+    async def _handle(self, websocket) -> None:
+        self.stats["connections"] += 1
+        async for raw in websocket:
+            payload = json.loads(raw)
+            for request in payload if isinstance(payload, list) else [payload]:
+                method = request.get("method")
+                self.stats[f"calls.{method}"] += 1
+                subscription = next(self._subscription_ids)
+                await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request.get("id"), "result": subscription}))
+                params = request.get("params") or []
+                config = params[-1] if params and isinstance(params[-1], dict) else {}
+                if config.get("commitment"):
+                    self.stats[f"commitment.{config['commitment']}"] += 1
+                mentions = params[0].get("mentions", []) if params and isinstance(params[0], dict) else []
+                if method == "logsSubscribe" and self.fixtures.address in mentions:
+                    await asyncio.sleep(self.notify_delay)
+                    for notification in self._notifications(subscription):
+                        self.stats["notifications"] += 1
+                        await websocket.send(json.dumps(notification))
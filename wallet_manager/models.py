@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils import timezone
 
+from .compression import compress_json, decompress_json
+
 class Wallet(models.Model):
     """
     Repräsentiert eine Solana-Wallet-Adresse, die vom Benutzer verfolgt wird.
@@ -23,7 +25,9 @@ class Transaction(models.Model):
     Repräsentiert eine einzelne Transaktion auf der Solana-Blockchain,
     die einem verfolgten Wallet zugeordnet ist.
     """
-    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="transactions", help_text="Das Wallet, zu dem diese Transaktion gehört")
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="transactions", help_text="Das Wallet, über das diese Transaktion zuerst importiert wurde")
+    # Alle beteiligten (verfolgten) Wallets. Eine Transaktion zwischen zwei eigenen Wallets wird nur einmal gespeichert.
+    wallets = models.ManyToManyField(Wallet, through="WalletTransaction", related_name="linked_transactions", blank=True, help_text="Alle verfolgten Wallets, die an dieser Transaktion beteiligt sind")
     signature = models.CharField(max_length=88, unique=True, help_text="Eindeutige Transaktionssignatur (Base58-kodiert)") # Signaturen können bis zu 88 Zeichen lang sein (z.B. für Ed25519)
     block_time = models.BigIntegerField(help_text="Unix-Timestamp der Transaktion (Zeitpunkt, zu dem sie in einen Block aufgenommen wurde)") # Als BigInt für Unix Timestamp
     slot = models.BigIntegerField(help_text="Der Slot, in dem die Transaktion bestätigt wurde")
@@ -35,13 +39,33 @@ class Transaction(models.Model):
 
     # Meta-Informationen zur Verarbeitung in unserem System
     imported_at = models.DateTimeField(default=timezone.now, help_text="Zeitpunkt, zu dem die Transaktion in die Datenbank importiert wurde")
-    meta_data = models.JSONField(default=dict, null=True, blank=True, help_text="Zusätzliche Metadaten aus der RPC-Antwort (z.B. meta.preBalances, postBalances, etc.)")
-    raw_transaction_data = models.JSONField(default=dict, null=True, blank=True, help_text="Die vollständige rohe Transaktion von get_transaction")
+    success = models.BooleanField(default=True, help_text="Gibt an, ob die Transaktion erfolgreich war (meta.err ist leer)")
+    # Die vollständige RPC-Antwort liegt komprimiert in `TransactionPayload` und wird über `raw_data` bei Bedarf geladen.
 
 
     def __str__(self):
         return f"Transaktion {self.signature[:10]}... für Wallet {self.wallet.address[:10]}..."
 
+    @property
+    def raw_data(self):
+        """
+        Die vollständige rohe Transaktion von get_transaction (jsonParsed).
+        Wird erst beim Zugriff aus `TransactionPayload` geladen und dekomprimiert.
+        """
+        if not hasattr(self, "_raw_data"):
+            try:
+                self._raw_data = self.payload.decode()
+            except TransactionPayload.DoesNotExist:
+                self._raw_data = {}
+        return self._raw_data
+
+    @property
+    def meta(self):
+        """
+        Die Metadaten aus der RPC-Antwort (z.B. meta.preBalances, postBalances, etc.).
+        """
+        return self.raw_data.get("meta") or {}
+
     class Meta:
         verbose_name = "Transaktion"
         verbose_name_plural = "Transaktionen"
@@ -50,3 +74,267 @@ class Transaction(models.Model):
             models.Index(fields=['wallet', '-block_time']),
             models.Index(fields=['signature']),
         ]
+
+
+class TransactionPayload(models.Model):
+    """
+    Komprimierte, vollständige RPC-Antwort einer Transaktion.
+
+    Liegt in einer eigenen Tabelle, damit Abfragen auf `Transaction` (Listen, Aggregate) nicht die
+    mehrere KB großen JSON-Daten mitlesen müssen.
+    """
+    transaction = models.OneToOneField(Transaction, on_delete=models.CASCADE, primary_key=True, related_name="payload", help_text="Die zugehörige Transaktion")
+    data = models.BinaryField(help_text="Komprimierte JSON-Antwort von get_transaction")
+    codec = models.CharField(max_length=8, help_text="Kompressionsverfahren der Daten (zlib oder zstd)")
+    raw_size = models.PositiveIntegerField(default=0, help_text="Größe der unkomprimierten JSON-Daten in Bytes")
+
+    def __str__(self):
+        return f"Rohdaten für Transaktion {self.transaction_id}"
+
+    @classmethod
+    def from_details(cls, transaction_id: int, tx_detail) -> "TransactionPayload":
+        """
+        Erzeugt eine (noch nicht gespeicherte) Instanz mit den komprimierten Rohdaten.
+        """
+        blob, codec, raw_size = compress_json(tx_detail)
+        return cls(transaction_id=transaction_id, data=blob, codec=codec, raw_size=raw_size)
+
+    def decode(self):
+        """
+        Dekomprimiert die gespeicherte RPC-Antwort.
+        """
+        return decompress_json(self.data, self.codec)
+
+    class Meta:
+        verbose_name = "Transaktions-Rohdaten"
+        verbose_name_plural = "Transaktions-Rohdaten"
+
+
+class WalletTransaction(models.Model):
+    """
+    Verknüpft ein Wallet mit einer Transaktion, an der es beteiligt ist, inkl. seiner Rolle.
+    `block_time` ist aus der Transaktion übernommen, damit die Transaktionsliste eines Wallets
+    direkt über den Index (wallet, -block_time) dieser Tabelle sortiert werden kann.
+    """
+    ROLE_FEE_PAYER = "fee_payer"
+    ROLE_SIGNER = "signer"
+    ROLE_WRITABLE = "writable"
+    ROLE_READONLY = "readonly"
+    ROLE_TOKEN_OWNER = "token_owner"
+    ROLE_UNKNOWN = "unknown"
+    ROLE_CHOICES = [
+        (ROLE_FEE_PAYER, "Gebührenzahler"),
+        (ROLE_SIGNER, "Unterzeichner"),
+        (ROLE_WRITABLE, "Beschreibbares Konto"),
+        (ROLE_READONLY, "Nur-Lese-Konto"),
+        (ROLE_TOKEN_OWNER, "Eigentümer eines Token-Kontos"),
+        (ROLE_UNKNOWN, "Unbekannt"),
+    ]
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="transaction_links", help_text="Das beteiligte Wallet")
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name="wallet_links", help_text="Die Transaktion")
+    block_time = models.BigIntegerField(help_text="Unix-Timestamp der Transaktion (aus der Transaktion übernommen)")
+    role = models.CharField(max_length=16, choices=ROLE_CHOICES, default=ROLE_UNKNOWN, help_text="Rolle des Wallets in der Transaktion")
+    account_index = models.SmallIntegerField(blank=True, null=True, help_text="Index des Wallets in accountKeys der Transaktion, falls direkt enthalten")
+
+    def __str__(self):
+        return f"{self.wallet.address[:10]}... in Transaktion {self.transaction.signature[:10]}... ({self.role})"
+
+    class Meta:
+        verbose_name = "Wallet-Transaktion"
+        verbose_name_plural = "Wallet-Transaktionen"
+        ordering = ['-block_time']
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'transaction'], name='unique_wallet_transaction'),
+        ]
+        indexes = [
+            models.Index(fields=['wallet', '-block_time']),
+        ]
+
+
+class BalanceDelta(models.Model):
+    """
+    Saldoänderung eines Wallets für einen Mint in einer Transaktion, berechnet beim Import.
+
+    Ermöglicht Salden- und Portfolio-Abfragen als SQL-Aggregat über den Index (wallet, mint, block_time),
+    ohne die Rohdaten der Transaktionen erneut zu parsen. `mint` ist "SOL" für natives SOL.
+    """
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="balance_deltas", help_text="Das Wallet, dessen Saldo sich ändert")
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name="balance_deltas", help_text="Die verursachende Transaktion")
+    mint = models.CharField(max_length=44, help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL")
+    # Rohbeträge (u64) können den Wertebereich von BigIntegerField überschreiten.
+    delta = models.DecimalField(max_digits=40, decimal_places=0, help_text="Änderung als Rohbetrag (Lamports bzw. kleinste Token-Einheit), negativ bei Abgang")
+    decimals = models.PositiveSmallIntegerField(help_text="Dezimalstellen des Tokens (9 für SOL)")
+    block_time = models.BigIntegerField(help_text="Unix-Timestamp der Transaktion (aus der Transaktion übernommen)")
+
+    def __str__(self):
+        return f"{self.delta} {self.mint[:10]} für Wallet {self.wallet.address[:10]}..."
+
+    class Meta:
+        verbose_name = "Saldoänderung"
+        verbose_name_plural = "Saldoänderungen"
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'transaction', 'mint'], name='unique_wallet_transaction_mint'),
+        ]
+        indexes = [
+            models.Index(fields=['wallet', 'mint', 'block_time']),
+        ]
+
+
+class WalletDailySummary(models.Model):
+    """
+    Tageswerte eines Wallets (Kalendertag in UTC), beim Import fortgeschrieben (siehe rollups.py).
+    Die Übersicht aller Wallets liest nur diese Tabelle statt der Transaktionen.
+    """
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="daily_summaries", help_text="Das Wallet")
+    day = models.DateField(help_text="Kalendertag (UTC)")
+    transaction_count = models.PositiveIntegerField(default=0, help_text="Anzahl der Transaktionen, an denen das Wallet beteiligt ist")
+    failed_count = models.PositiveIntegerField(default=0, help_text="Davon fehlgeschlagene Transaktionen")
+    fees_paid = models.BigIntegerField(default=0, help_text="Gezahlte Gebühren in Lamports (nur Transaktionen, in denen das Wallet Gebührenzahler ist)")
+
+    def __str__(self):
+        return f"{self.day}: {self.transaction_count} Transaktionen für Wallet {self.wallet.address[:10]}..."
+
+    class Meta:
+        verbose_name = "Tageswert"
+        verbose_name_plural = "Tageswerte"
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'day'], name='unique_wallet_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+
+class WalletDailyFlow(models.Model):
+    """
+    Summe der Saldoänderungen (`BalanceDelta`) eines Wallets pro Mint und Kalendertag (UTC), siehe rollups.py.
+    """
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="daily_flows", help_text="Das Wallet")
+    day = models.DateField(help_text="Kalendertag (UTC)")
+    mint = models.CharField(max_length=44, help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL")
+    net_flow = models.DecimalField(max_digits=40, decimal_places=0, help_text="Netto-Zu- bzw. -Abfluss als Rohbetrag (Lamports bzw. kleinste Token-Einheit)")
+    decimals = models.PositiveSmallIntegerField(help_text="Dezimalstellen des Tokens (9 für SOL)")
+
+    def __str__(self):
+        return f"{self.day}: {self.net_flow} {self.mint[:10]} für Wallet {self.wallet.address[:10]}..."
+
+    class Meta:
+        verbose_name = "Tagesfluss"
+        verbose_name_plural = "Tagesflüsse"
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'day', 'mint'], name='unique_wallet_day_mint'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'mint']),
+        ]
+
+
+class BackfillCheckpoint(models.Model):
+    """
+    Fortschritt des vollständigen Historien-Imports (Backfill) eines Wallets.
+    Ermöglicht es, einen abgebrochenen Backfill an der letzten Position fortzusetzen.
+    """
+    wallet = models.OneToOneField(Wallet, on_delete=models.CASCADE, related_name="backfill_checkpoint", help_text="Das Wallet, dessen Historie importiert wird")
+    before_signature = models.CharField(max_length=88, blank=True, null=True, help_text="Älteste vollständig verarbeitete Signatur; der Backfill setzt vor dieser Signatur fort")
+    processed_count = models.BigIntegerField(default=0, help_text="Anzahl der bisher verarbeiteten Signaturen")
+    completed = models.BooleanField(default=False, help_text="Gibt an, ob die gesamte Historie importiert wurde")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Zeitpunkt der letzten Aktualisierung des Checkpoints")
+
+    def __str__(self):
+        return f"Backfill-Checkpoint für Wallet {self.wallet.address[:10]}..."
+
+    class Meta:
+        verbose_name = "Backfill-Checkpoint"
+        verbose_name_plural = "Backfill-Checkpoints"
+
+
+class CostBasisSnapshot(models.Model):
+    """
+    Zwischenstand der FIFO-Berechnung (siehe cost_basis.py) für ein Portfolio aus einem oder mehreren Wallets.
+    Enthält die offenen Lots pro Mint, die Jahressummen und die zuletzt verarbeitete Position.
+    """
+    scope_key = models.CharField(max_length=255, unique=True, help_text="Sortierte, kommagetrennte IDs der Wallets des Portfolios")
+    state = models.JSONField(default=dict, help_text="Offene Lots pro Mint und Summen pro Kalenderjahr")
+    last_block_time = models.BigIntegerField(default=0, help_text="block_time der zuletzt verarbeiteten Saldoänderung")
+    last_transaction_id = models.BigIntegerField(default=0, help_text="Transaktions-ID der zuletzt verarbeiteten Saldoänderung")
+    event_count = models.BigIntegerField(default=0, help_text="Anzahl der bis zur Position verarbeiteten Saldoänderungen")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Zeitpunkt der letzten Berechnung")
+
+    def __str__(self):
+        return f"Anschaffungskosten-Snapshot für Wallets {self.scope_key}"
+
+    class Meta:
+        verbose_name = "Anschaffungskosten-Snapshot"
+        verbose_name_plural = "Anschaffungskosten-Snapshots"
+
+
+class TokenPrice(models.Model):
+    """
+    Historischer EUR-Preis eines Mints, zusammengefasst auf Zeit-Buckets (siehe prices.py).
+    Wird per `load_prices` aus lokalen CSV/JSON-Dumps befüllt; `mint` ist "SOL" für natives SOL.
+    """
+    mint = models.CharField(max_length=44, help_text="Mint-Adresse des Tokens oder 'SOL' für natives SOL")
+    bucket_ts = models.BigIntegerField(help_text="Beginn des Zeit-Buckets als Unix-Timestamp")
+    price_eur = models.DecimalField(max_digits=30, decimal_places=12, help_text="Preis einer ganzen Einheit in EUR")
+    source = models.CharField(max_length=100, blank=True, help_text="Herkunft des Preises, z.B. der Dateiname des Dumps")
+
+    def __str__(self):
+        return f"{self.mint[:10]} @ {self.bucket_ts}: {self.price_eur} EUR"
+
+    class Meta:
+        verbose_name = "Token-Preis"
+        verbose_name_plural = "Token-Preise"
+        constraints = [
+            # Der eindeutige Index (mint, bucket_ts) dient zugleich den Bereichsabfragen der Preissuche.
+            models.UniqueConstraint(fields=['mint', 'bucket_ts'], name='unique_mint_bucket'),
+        ]
+
+
+class SyncJob(models.Model):
+    """
+    Auftrag zum Abgleich eines Wallets mit dem RPC-Endpunkt, abgearbeitet von `run_sync_worker` (siehe jobs.py).
+    Die Weboberfläche stellt Aufträge nur ein und zeigt sofort die gespeicherten Transaktionen an.
+    """
+    KIND_NEW = "new"
+    KIND_OLDER = "older"
+    KIND_CHOICES = [
+        (KIND_NEW, "Neue Transaktionen"),
+        (KIND_OLDER, "Ältere Transaktionen"),
+    ]
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Ausstehend"),
+        (STATUS_RUNNING, "Läuft"),
+        (STATUS_DONE, "Abgeschlossen"),
+        (STATUS_FAILED, "Fehlgeschlagen"),
+    ]
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="sync_jobs", help_text="Das abzugleichende Wallet")
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES, default=KIND_NEW, help_text="Art des Abgleichs")
+    limit = models.PositiveIntegerField(default=10, help_text="Anzahl der Transaktionen beim ersten Abruf bzw. beim Nachladen älterer Transaktionen")
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=STATUS_PENDING, help_text="Bearbeitungsstand des Auftrags")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Anzahl der bisherigen Ausführungsversuche")
+    processed = models.PositiveIntegerField(default=0, help_text="Anzahl der neu gespeicherten oder verknüpften Transaktionen")
+    error = models.TextField(blank=True, help_text="Fehlermeldung des letzten Versuchs")
+    worker = models.CharField(max_length=100, blank=True, help_text="Kennung des Workers (Host:PID), der den Auftrag bearbeitet")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Zeitpunkt, zu dem der Auftrag eingestellt wurde")
+    run_after = models.DateTimeField(default=timezone.now, help_text="Frühester Zeitpunkt der (nächsten) Ausführung, z.B. nach einem Fehlschlag")
+    started_at = models.DateTimeField(blank=True, null=True, help_text="Beginn der letzten Ausführung")
+    finished_at = models.DateTimeField(blank=True, null=True, help_text="Ende der letzten Ausführung")
+
+    def __str__(self):
+        return f"Sync-Auftrag {self.pk} ({self.kind}, {self.status}) für Wallet {self.wallet.address[:10]}..."
+
+    class Meta:
+        verbose_name = "Sync-Auftrag"
+        verbose_name_plural = "Sync-Aufträge"
+        indexes = [
+            # Abholen der fälligen ausstehenden Aufträge durch die Worker.
+            models.Index(fields=['status', 'run_after']),
+            # Laufender bzw. letzter Auftrag eines Wallets für die Fortschrittsanzeige.
+            models.Index(fields=['wallet', 'status']),
+        ]
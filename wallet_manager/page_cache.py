@@ -0,0 +1,81 @@
+"""
+Bedingte GET-Anfragen und Cache für die gerenderte Transaktionsübersicht eines Wallets.
+
+Pro Wallet wird im Django-Cache eine Version (Zeitpunkt der letzten Änderung) gehalten, die der
+Import bei jeder neu verknüpften Transaktion erhöht. ETag und Cache-Schlüssel der Seiten enthalten
+diese Version, die neueste gespeicherte Signatur und die Seitenparameter; alte Einträge werden
+dadurch unerreichbar und laufen über ihr Timeout aus.
+"""
+import hashlib
+import os
+import time
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+# Lebensdauer einer gerenderten Seite im Cache (Sekunden).
+PAGE_CACHE_TIMEOUT = int(os.getenv("WALLET_PAGE_CACHE_TIMEOUT", "300"))
+# Mindestabstand zwischen zwei Abgleichen eines Wallets mit dem RPC-Endpunkt (Sekunden).
+SYNC_INTERVAL = int(os.getenv("WALLET_SYNC_INTERVAL", "30"))
+
+
+def _version_key(wallet_id: int) -> str:
+    return f"wallet-version:{wallet_id}"
+
+
+def wallet_version(wallet_id: int) -> float:
+    """
+    Zeitpunkt der letzten bekannten Änderung des Wallets. Fehlt der Eintrag (z.B. nach Leeren
+    des Caches), gilt das Wallet als jetzt geändert.
+    """
+    version = cache.get(_version_key(wallet_id))
+    if version is None:
+        version = time.time()
+        cache.add(_version_key(wallet_id), version, timeout=None)
+        version = cache.get(_version_key(wallet_id), version)
+    return version
+
+
+def invalidate_wallet_pages(wallet_id: int) -> None:
+    """
+    Markiert alle gecachten Seiten eines Wallets als veraltet, sobald die laufende Datenbanktransaktion bestätigt ist.
+    """
+    db_transaction.on_commit(lambda: cache.set(_version_key(wallet_id), time.time(), timeout=None))
+
+
+def sync_due(wallet_id: int) -> bool:
+    """
+    Gibt an, ob das Wallet wieder mit dem RPC-Endpunkt abgeglichen werden soll. Innerhalb von
+    SYNC_INTERVAL nach einem erfolgreichen Abgleich liefert es False, auch für andere Worker mit demselben Cache.
+    """
+    return cache.get(f"wallet-synced:{wallet_id}") is None
+
+
+def mark_synced(wallet_id: int) -> None:
+    cache.set(f"wallet-synced:{wallet_id}", True, timeout=SYNC_INTERVAL)
+
+
+def mark_synced_many(wallet_ids: Iterable[int]) -> None:
+    """
+    Wie `mark_synced` für mehrere Wallets, z.B. solange sie per WebSocket-Subscription aktuell gehalten werden.
+    """
+    cache.set_many({f"wallet-synced:{wallet_id}": True for wallet_id in wallet_ids}, timeout=SYNC_INTERVAL)
+
+
+def page_etag(wallet_id: int, version: float, newest_signature: Optional[str], *page_params) -> str:
+    """
+    ETag (in Anführungszeichen) einer Seite. `version` (siehe `wallet_version`) muss vor dem Lesen der Seite
+    bestimmt werden und für Header und Cache-Schlüssel dieselbe sein: Ändert ein Import das Wallet während
+    des Renderns, liegt die Seite dann höchstens unter der älteren Version, nie veraltet unter der neueren.
+    """
+    raw = "|".join(str(part) for part in (wallet_id, newest_signature, repr(version), *page_params))
+    return f'"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+
+
+def get_cached_page(etag: str) -> Optional[bytes]:
+    return cache.get(f"wallet-page:{etag}")
+
+
+def set_cached_page(etag: str, content: bytes) -> None:
+    cache.set(f"wallet-page:{etag}", content, timeout=PAGE_CACHE_TIMEOUT)
@@ -0,0 +1,150 @@
+"""
+Lokaler Speicher für historische EUR-Preise mit Bulk-Abfrage.
+
+Preise werden auf Zeit-Buckets (Standard: 1 Stunde) zusammengefasst. `lookup_prices` löst eine
+ganze Liste von (Mint, Timestamp)-Paaren mit einer einzigen Bereichsabfrage über den Index
+(mint, bucket_ts) auf und nimmt den nächstgelegenen Bucket, falls für den exakten Bucket kein
+Preis vorliegt. Aufgelöste Preise werden in einem prozessweiten LRU-Cache gehalten.
+
+Die Einträge des LRU-Caches gehören zu einer Preisversion, die im Django-Cache liegt (wie die
+Wallet-Version in page_cache.py). `load_prices` erhöht sie über `clear_price_cache`, sodass alle
+Prozesse (Gunicorn-Worker, Sync-Worker) ab ihrer nächsten Abfrage die neuen Preise lesen.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import TokenPrice
+
+# Größe der Zeit-Buckets in Sekunden.
+PRICE_BUCKET_SECONDS = int(os.getenv("PRICE_BUCKET_SECONDS", "3600"))
+# Maximaler Abstand zum nächstgelegenen Bucket, bevor ein Preis als unbekannt gilt.
+PRICE_MAX_DISTANCE = int(os.getenv("PRICE_MAX_DISTANCE_SECONDS", "86400"))
+# Anzahl der (Mint, Bucket)-Einträge im prozessweiten Cache.
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "100000"))
+
+_VERSION_KEY = "price-version"
+
+
+def bucket_of(timestamp: int) -> int:
+    """
+    Liefert den Beginn des Buckets, in den `timestamp` fällt.
+    """
+    return timestamp - timestamp % PRICE_BUCKET_SECONDS
+
+
+class LRUCache:
+    """
+    Einfacher threadsicherer LRU-Cache mit fester Größe.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Decimal]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Decimal]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Decimal) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache = LRUCache(PRICE_CACHE_SIZE)
+
+
+def price_version() -> float:
+    """
+    Zeitpunkt der letzten Preisänderung. Fehlt der Eintrag (z.B. nach Leeren des Caches), gilt jetzt als Version.
+    """
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        version = time.time()
+        cache.add(_VERSION_KEY, version, timeout=None)
+        version = cache.get(_VERSION_KEY, version)
+    return version
+
+
+def clear_price_cache() -> None:
+    """
+    Verwirft die Preis-Caches aller Prozesse, z.B. nach dem Laden neuer Preise: Die neue Version macht
+    deren Einträge unerreichbar, der eigene Cache wird zusätzlich geleert.
+    """
+    cache.set(_VERSION_KEY, time.time(), timeout=None)
+    _cache.clear()
+
+
+def _nearest(buckets: List[int], prices: List[Decimal], bucket: int) -> Optional[Decimal]:
+    index = bisect_left(buckets, bucket)
+    best = None
+    best_distance = PRICE_MAX_DISTANCE + 1
+    # Bei gleichem Abstand wird der frühere Bucket bevorzugt.
+    for candidate in (index - 1, index):
+        if 0 <= candidate < len(buckets):
+            distance = abs(buckets[candidate] - bucket)
+            if distance < best_distance:
+                best, best_distance = prices[candidate], distance
+    return best
+
+
+def lookup_prices(pairs: Sequence[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[Decimal]]:
+    """
+    Löst EUR-Preise für eine Liste von (Mint, Unix-Timestamp)-Paaren auf.
+
+    Nicht im Cache vorhandene Paare werden mit einer Abfrage pro Aufruf geladen: pro Mint der
+    Bucket-Bereich der angefragten Zeitpunkte, erweitert um den maximalen Abstand.
+
+    :return: (Mint, Timestamp) -> Preis einer ganzen Einheit in EUR, oder None, wenn kein Preis
+             innerhalb von PRICE_MAX_DISTANCE_SECONDS vorliegt.
+    """
+    result: Dict[Tuple[str, int], Optional[Decimal]] = {}
+    missing: Dict[str, List[Tuple[int, int]]] = {}
+    version = price_version()
+    for mint, timestamp in pairs:
+        bucket = bucket_of(timestamp)
+        price = _cache.get((version, mint, bucket))
+        if price is not None:
+            result[(mint, timestamp)] = price
+        else:
+            missing.setdefault(mint, []).append((timestamp, bucket))
+    if not missing:
+        return result
+
+    query = Q()
+    for mint, stamps in missing.items():
+        buckets = [bucket for _, bucket in stamps]
+        query |= Q(mint=mint, bucket_ts__gte=min(buckets) - PRICE_MAX_DISTANCE,
+                   bucket_ts__lte=max(buckets) + PRICE_MAX_DISTANCE)
+    series: Dict[str, Tuple[List[int], List[Decimal]]] = {}
+    for mint, bucket_ts, price_eur in (TokenPrice.objects.filter(query).order_by("mint", "bucket_ts")
+                                       .values_list("mint", "bucket_ts", "price_eur")):
+        buckets, prices = series.setdefault(mint, ([], []))
+        buckets.append(bucket_ts)
+        prices.append(price_eur)
+
+    for mint, stamps in missing.items():
+        buckets, prices = series.get(mint, ([], []))
+        for timestamp, bucket in stamps:
+            price = _nearest(buckets, prices, bucket)
+            if price is not None:
+                _cache.put((version, mint, bucket), price)
+            result[(mint, timestamp)] = price
+    return result
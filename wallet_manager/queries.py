@@ -0,0 +1,39 @@
+from typing import Any, Iterator, Sequence, Tuple
+
+from django.db.models import Q, QuerySet
+
+
+def after_key(key_fields: Sequence[str], key: Sequence[Any], descending: bool = False) -> Q:
+    """
+    Bedingung "Zeile liegt in der Sortierung (key_fields) nach `key`", z.B. für (block_time, id):
+    block_time > b ODER (block_time = b UND id > i). Mit `descending` für absteigende Sortierung (<).
+    """
+    lookup = "lt" if descending else "gt"
+    condition = Q()
+    for position in range(len(key_fields)):
+        equal = {field: value for field, value in zip(key_fields[:position], key[:position])}
+        condition |= Q(**equal, **{f"{key_fields[position]}__{lookup}": key[position]})
+    return condition
+
+
+def iter_keyset(queryset: QuerySet, key_fields: Sequence[str], chunk_size: int) -> Iterator[Tuple]:
+    """
+    Liefert alle Zeilen eines `values_list`-QuerySets seitenweise nach `key_fields` sortiert.
+
+    Die ersten Spalten des QuerySets müssen `key_fields` entsprechen. Jede Seite ist eine eigene
+    Abfrage mit `chunk_size` Zeilen, die über den Index ab dem letzten Schlüssel fortsetzt. Anders
+    als ein einzelnes `.iterator()` bleibt der Speicherbedarf so auch unter MySQL begrenzt, dessen
+    Treiber ohne serverseitigen Cursor das gesamte Ergebnis auf einmal lädt.
+    """
+    queryset = queryset.order_by(*key_fields)
+    last_key = None
+    while True:
+        page = queryset if last_key is None else queryset.filter(after_key(key_fields, last_key))
+        count = 0
+        row = None
+        for row in page[:chunk_size].iterator(chunk_size=chunk_size):
+            count += 1
+            yield row
+        if count < chunk_size:
+            return
+        last_key = row[:len(key_fields)]
@@ -0,0 +1,308 @@
+"""
+Rate Limiting und Wiederholungsversuche für RPC-Aufrufe.
+
+Der Token-Bucket pro (Endpunkt, Methode) liegt in einer kleinen Zustandsdatei, die per Dateisperre
+(fcntl) von allen Gunicorn-Workern eines Hosts gemeinsam genutzt wird. Antwortet der Provider mit
+HTTP 429, wird der Endpunkt für die Dauer von Retry-After für alle Worker pausiert und der Aufruf
+mit exponentiellem Backoff und Jitter wiederholt. Timeouts, Verbindungsfehler und sonstige 5xx werden
+nicht am selben Endpunkt wiederholt, sondern an den Pool zurückgegeben (Failover, siehe rpc_pool.py).
+
+Konfiguration über Umgebungsvariablen:
+
+*   SOLANA_RPC_RATE_LIMITS: z.B. "getTransaction=40,getSignaturesForAddress=10:20,*=50"
+    (Aufrufe pro Sekunde, optional ":Burst"; "*" gilt für alle übrigen Methoden). Leer = kein Limit.
+*   SOLANA_RPC_MAX_RETRIES, SOLANA_RPC_RETRY_BASE_DELAY, SOLANA_RPC_RETRY_MAX_DELAY.
+"""
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from asgiref.sync import sync_to_async
+
+try:
+    import fcntl
+except ImportError: # z.B. Windows: Limits gelten dann nur pro Prozess
+    fcntl = None
+
+from .metrics import record_rpc_request, record_rpc_retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), "solana_rpc_rate_limit.json")
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30.0
+
+# JSON-RPC-Fehlercodes, mit denen Provider ein Rate Limit auch ohne HTTP 429 melden.
+RATE_LIMIT_ERROR_CODES = {429, -32005, -32429}
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Zerlegt "methode=rate[:burst],..." in Methode -> (Aufrufe pro Sekunde, Burst).
+    """
+    limits: Dict[str, Tuple[float, float]] = {}
+    for part in value.split(","):
+        method, _, spec = part.strip().partition("=")
+        if not method or not spec:
+            continue
+        rate, _, burst = spec.partition(":")
+        limits[method] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimiter:
+    """
+    Token-Bucket-Limiter, dessen Zustand über eine Datei von mehreren Prozessen geteilt wird.
+    """
+    def __init__(self, limits: Dict[str, Tuple[float, float]], path: str = DEFAULT_STATE_PATH):
+        self.limits = limits
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._memory: Dict[str, Any] = {}
+
+    def _limit(self, method: str) -> Optional[Tuple[float, float]]:
+        return self.limits.get(method) or self.limits.get("*")
+
+    def _update(self, change: Callable[[Dict[str, Any], float], Any]) -> Any:
+        """
+        Liest den Zustand unter exklusiver Sperre, wendet `change(state, now)` an und schreibt ihn zurück.
+        """
+        with self._lock:
+            if fcntl is None:
+                return change(self._memory, time.time())
+            if self._fd is None or self._pid != os.getpid():
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                self._pid = os.getpid()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, 1 << 20, 0)
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                result = change(state, time.time())
+                data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+                if data != raw:
+                    os.ftruncate(self._fd, 0)
+                    os.pwrite(self._fd, data, 0)
+                return result
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def acquire(self, endpoint: str, method: str, cost: int = 1) -> None:
+        """
+        Blockiert, bis `cost` Aufrufe von `method` erlaubt sind. Ein Batch, der größer als der Burst
+        ist, wird zugelassen, sobald der Bucket voll ist; der Bucket geht dann ins Minus.
+        """
+        limit = self._limit(method)
+
+        def take(state: Dict[str, Any], now: float) -> float:
+            paused_until = state.get(f"pause|{endpoint}", 0)
+            if paused_until > now:
+                return paused_until - now
+            if limit is None:
+                return 0.0
+            rate, burst = limit
+            key = f"{endpoint}|{method}"
+            tokens, updated_at = state.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            needed = min(cost, burst)
+            if tokens >= needed:
+                state[key] = (tokens - cost, now)
+                return 0.0
+            state[key] = (tokens, now)
+            return (needed - tokens) / rate
+
+        while True:
+            wait = self._update(take)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, endpoint: str, seconds: float) -> None:
+        """
+        Pausiert alle Aufrufe an `endpoint` (prozessübergreifend), z.B. nach HTTP 429 mit Retry-After.
+        """
+        def set_pause(state: Dict[str, Any], now: float) -> None:
+            key = f"pause|{endpoint}"
+            state[key] = max(state.get(key, 0), now + seconds)
+            # Abgelaufene Pausen nicht ewig mitschleppen.
+            for expired in [k for k, v in state.items() if k.startswith("pause|") and v <= now]:
+                del state[expired]
+
+        self._update(set_pause)
+
+
+class RateLimited(Exception):
+    """
+    Der Provider hat den Aufruf wegen eines Rate Limits abgelehnt (HTTP 429 oder JSON-RPC-Fehlercode).
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Wertet einen Retry-After-Header aus (Sekunden oder HTTP-Datum).
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def is_rate_limit_error(error: Any) -> bool:
+    return isinstance(error, dict) and error.get("code") in RATE_LIMIT_ERROR_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponentieller Backoff mit vollem Jitter: zufällig zwischen 0 und base * 2^attempt (begrenzt).
+    """
+    base = float(os.getenv("SOLANA_RPC_RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY))
+    cap = float(os.getenv("SOLANA_RPC_RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY))
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def max_retries() -> int:
+    return int(os.getenv("SOLANA_RPC_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+
+def _retry_after(exc: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Am selben Endpunkt wiederholt wird nur ein Rate Limit (429, JSON-RPC-Fehlercode oder 503 mit Retry-After).
+    Ein hängender oder defekter Endpunkt würde sonst jeden Aufruf um alle Wiederholungen verzögern, bevor
+    Circuit Breaker und Failover greifen.
+
+    :return: Tupel (wiederholbar, Retry-After in Sekunden oder None).
+    """
+    if isinstance(exc, RateLimited):
+        return True, exc.retry_after
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+        if status == 429:
+            return True, retry_after
+        return status == 503 and retry_after is not None, retry_after
+    return False, None
+
+
+def _outcome(exc: Exception) -> str:
+    """
+    Ergebnis-Label einer fehlgeschlagenen Anfrage für die Kennzahlen.
+    """
+    if isinstance(exc, RateLimited) or (isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429):
+        return "rate_limited"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return "http_error"
+    if isinstance(exc, (httpx.TransportError, OSError)):
+        return "transport_error"
+    return "error"
+
+
+def _retry_delay(endpoint: str, method: str, exc: Exception, attempt: int, retries: int, elapsed: float,
+                 cost: int) -> Optional[Tuple[float, Optional[float]]]:
+    """
+    Erfasst einen fehlgeschlagenen Versuch in den Kennzahlen.
+
+    :return: None, wenn nicht wiederholt wird, sonst Tupel (Backoff in Sekunden, Retry-After oder None).
+    """
+    outcome = _outcome(exc)
+    record_rpc_request(method, endpoint, elapsed, outcome, cost)
+    retryable, retry_after = _retry_after(exc)
+    if not retryable or attempt >= retries:
+        return None
+    delay = backoff_delay(attempt)
+    record_rpc_retry(method, endpoint, outcome)
+    logger.warning("%s an %s fehlgeschlagen (%s); Wiederholung %d/%d in %.1f s.", method, endpoint, exc,
+                   attempt + 1, retries, max(delay, retry_after or 0), extra={"method": method, "endpoint": endpoint})
+    return delay, retry_after
+
+
+def call_with_retry(limiter: RateLimiter, endpoint: str, method: str, func: Callable[[], Any], cost: int = 1) -> Any:
+    """
+    Führt `func` unter dem Rate Limit aus und wiederholt sie bei 429 bzw. Retry-After (siehe `_retry_after`).
+    Alle anderen Fehler werden sofort weitergereicht, damit der Aufrufer auf einen anderen Endpunkt ausweichen kann.
+
+    Gibt `func` eine JSON-RPC-Antwort mit einem Rate-Limit-Fehlercode zurück, wird ebenfalls wiederholt.
+    Nach SOLANA_RPC_MAX_RETRIES Wiederholungen wird der letzte Fehler weitergereicht bzw. die
+    letzte Antwort zurückgegeben. Jeder Versuch wird in den Kennzahlen erfasst (siehe metrics.py).
+    """
+    retries = max_retries()
+    for attempt in range(retries + 1):
+        limiter.acquire(endpoint, method, cost)
+        started_at = time.perf_counter()
+        try:
+            result = func()
+            if isinstance(result, dict) and is_rate_limit_error(result.get("error")) and attempt < retries:
+                raise RateLimited(str(result["error"].get("message")))
+            record_rpc_request(method, endpoint, time.perf_counter() - started_at, "ok", cost)
+            return result
+        except Exception as e:
+            retry = _retry_delay(endpoint, method, e, attempt, retries, time.perf_counter() - started_at, cost)
+            if retry is None:
+                raise
+            delay, retry_after = retry
+            if retry_after is not None:
+                limiter.pause(endpoint, retry_after)
+            # Bei Retry-After wartet acquire() auf das Ende der Pause, danach folgt der Jitter.
+            time.sleep(delay)
+
+
+async def async_call_with_retry(limiter: RateLimiter, endpoint: str, method: str, func: Callable[[], Awaitable[Any]],
+                                cost: int = 1) -> Any:
+    """
+    Wie `call_with_retry` für Coroutinen (`AsyncSolanaAPI`). Der Limiter arbeitet mit Dateisperren und blockiert
+    beim Warten, er läuft daher in einem Thread; der Backoff wartet, ohne die Event-Loop anzuhalten.
+    """
+    retries = max_retries()
+    for attempt in range(retries + 1):
+        await sync_to_async(limiter.acquire, thread_sensitive=False)(endpoint, method, cost)
+        started_at = time.perf_counter()
+        try:
+            result = await func()
+            if isinstance(result, dict) and is_rate_limit_error(result.get("error")) and attempt < retries:
+                raise RateLimited(str(result["error"].get("message")))
+            record_rpc_request(method, endpoint, time.perf_counter() - started_at, "ok", cost)
+            return result
+        except Exception as e:
+            retry = _retry_delay(endpoint, method, e, attempt, retries, time.perf_counter() - started_at, cost)
+            if retry is None:
+                raise
+            delay, retry_after = retry
+            if retry_after is not None:
+                await sync_to_async(limiter.pause, thread_sensitive=False)(endpoint, retry_after)
+            await asyncio.sleep(delay)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Liefert den prozessweiten Limiter (Konfiguration siehe Moduldokumentation).
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(parse_limits(os.getenv("SOLANA_RPC_RATE_LIMITS", "")),
+                                        os.getenv("SOLANA_RPC_RATE_LIMIT_PATH", DEFAULT_STATE_PATH))
+        return _rate_limiter
@@ -0,0 +1,111 @@
+"""
+Tageswerte pro Wallet (`WalletDailySummary`, `WalletDailyFlow`) für die Übersicht aller Wallets.
+
+Der Import (ingest.py) ruft nach dem letzten gespeicherten Block `refresh_daily_rollups` mit den block_time-Werten
+aller Blöcke auf. Die betroffenen Tage werden per SQL-Aggregat über `WalletTransaction` und `BalanceDelta`
+neu berechnet und ersetzt. Das Ergebnis ist damit unabhängig davon, wie oft eine Transaktion importiert
+oder verknüpft wird (ignore_conflicts), und stimmt nach einem Abbruch spätestens beim nächsten Import
+des Tages wieder. `rebuild_daily_rollups` berechnet alle Tage eines Wallets neu.
+
+Tage sind Kalendertage in UTC.
+"""
+import datetime
+from typing import Iterable, Optional, Set
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Floor
+
+from .models import BalanceDelta, Wallet, WalletDailyFlow, WalletDailySummary, WalletTransaction
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def day_of(block_time: int) -> datetime.date:
+    """
+    Kalendertag (UTC) eines Unix-Timestamps.
+    """
+    return EPOCH + datetime.timedelta(days=block_time // SECONDS_PER_DAY)
+
+
+def day_start(day: datetime.date) -> int:
+    """
+    Unix-Timestamp des Tagesbeginns (00:00 UTC).
+    """
+    return (day - EPOCH).days * SECONDS_PER_DAY
+
+
+def _day_index():
+    return Floor(F("block_time") / SECONDS_PER_DAY)
+
+
+def _recompute(wallet: Wallet, start: int, end: int, days: Optional[Set[datetime.date]] = None) -> int:
+    """
+    Schreibt die Tageswerte im Zeitraum [start, end), auf die Tage `days` beschränkt (None: alle).
+    Bestehende Tageswerte dieser Tage müssen vorher gelöscht sein.
+    """
+    links = WalletTransaction.objects.filter(wallet=wallet, block_time__gte=start, block_time__lt=end)
+    # order_by() entfernt die Standardsortierung nach block_time, die sonst in das GROUP BY eingehen würde.
+    summaries = [
+        WalletDailySummary(wallet=wallet, day=EPOCH + datetime.timedelta(days=int(row["day_index"])),
+                           transaction_count=row["transaction_count"], failed_count=row["failed_count"],
+                           fees_paid=row["fees_paid"] or 0)
+        for row in links.annotate(day_index=_day_index()).values("day_index").order_by().annotate(
+            transaction_count=Count("id"),
+            failed_count=Count("id", filter=Q(transaction__success=False)),
+            fees_paid=Sum("transaction__fee", filter=Q(role=WalletTransaction.ROLE_FEE_PAYER)),
+        )
+    ]
+    deltas = BalanceDelta.objects.filter(wallet=wallet, block_time__gte=start, block_time__lt=end)
+    flows = [
+        WalletDailyFlow(wallet=wallet, day=EPOCH + datetime.timedelta(days=int(row["day_index"])), mint=row["mint"],
+                        net_flow=row["net_flow"], decimals=row["decimals"])
+        for row in deltas.annotate(day_index=_day_index()).values("day_index", "mint").order_by().annotate(
+            net_flow=Sum("delta"), decimals=Max("decimals"),
+        )
+    ]
+    if days is not None:
+        summaries = [summary for summary in summaries if summary.day in days]
+        flows = [flow for flow in flows if flow.day in days]
+    WalletDailySummary.objects.bulk_create(summaries)
+    WalletDailyFlow.objects.bulk_create(flows)
+    return len(summaries)
+
+
+def refresh_daily_rollups(wallet: Wallet, block_times: Iterable[int]) -> int:
+    """
+    Berechnet die Tageswerte der Tage neu, in denen die übergebenen block_time-Werte liegen.
+
+    Muss nach dem Commit der zugehörigen Zeilen aufgerufen werden. Die Sperre auf der Wallet-Zeile
+    reiht gleichzeitige Aufrufe für dasselbe Wallet (Sync-Worker und WebSocket-Ingester) hintereinander,
+    sodass der zuletzt laufende alle bis dahin gespeicherten Transaktionen sieht. Die Aggregate lesen nur den
+    Zeitraum vom ersten bis zum letzten betroffenen Tag; ein Import deckt in der Regel einen
+    zusammenhängenden Zeitraum ab.
+
+    :return: Anzahl der geschriebenen Tageswerte.
+    """
+    days = {day_of(block_time) for block_time in block_times if block_time is not None}
+    if not days:
+        return 0
+    with db_transaction.atomic():
+        Wallet.objects.select_for_update().only("id").get(pk=wallet.pk)
+        WalletDailySummary.objects.filter(wallet=wallet, day__in=days).delete()
+        WalletDailyFlow.objects.filter(wallet=wallet, day__in=days).delete()
+        return _recompute(wallet, day_start(min(days)), day_start(max(days)) + SECONDS_PER_DAY, days)
+
+
+def rebuild_daily_rollups(wallet: Wallet) -> int:
+    """
+    Berechnet alle Tageswerte eines Wallets neu, z.B. für vor Einführung der Tabellen importierte Transaktionen.
+
+    :return: Anzahl der geschriebenen Tageswerte.
+    """
+    with db_transaction.atomic():
+        Wallet.objects.select_for_update().only("id").get(pk=wallet.pk)
+        WalletDailySummary.objects.filter(wallet=wallet).delete()
+        WalletDailyFlow.objects.filter(wallet=wallet).delete()
+        bounds = WalletTransaction.objects.filter(wallet=wallet).order_by().aggregate(first=Min("block_time"), last=Max("block_time"))
+        if bounds["first"] is None:
+            return 0
+        return _recompute(wallet, day_start(day_of(bounds["first"])), day_start(day_of(bounds["last"])) + SECONDS_PER_DAY)
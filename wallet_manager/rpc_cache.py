@@ -0,0 +1,177 @@
+"""
+Cache für RPC-Antworten, der von `SolanaAPI` verwendet wird.
+
+Finalisierte Transaktionen ändern sich nie und werden ohne Ablaufzeit unter ihrer Signatur
+gespeichert; Signaturlisten (getSignaturesForAddress) nur kurz. Das Backend ist austauschbar:
+
+*   `sqlite` (Standard): lokale SQLite-Datei, geteilt von allen Workern eines Hosts und über Neustarts hinweg.
+*   `django`: ein Cache aus `CACHES` (z.B. Redis). Der dateibasierte Django-Cache eignet sich wegen
+    seiner Eintragsbegrenzung (MAX_ENTRIES) nicht für Transaktionen.
+*   `none`: kein Cache.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .compression import compress_json, decompress_json
+
+logger = logging.getLogger(__name__)
+
+# Auswahl und Konfiguration des Backends.
+DEFAULT_CACHE_BACKEND = "sqlite"
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "solana_rpc_cache.sqlite3")
+# Lebensdauer (Sekunden) gecachter Signaturlisten.
+DEFAULT_SIGNATURES_TTL = 10.0
+# Ab diesem Alter (Sekunden seit blockTime) gilt eine mit "confirmed" abgerufene Transaktion als finalisiert.
+# Die Finalisierung dauert in der Regel unter 15 Sekunden (32 Slots).
+DEFAULT_FINALITY_AGE = 60.0
+
+
+def transaction_key(signature: str) -> str:
+    """
+    Schlüssel einer finalisierten Transaktion. Er gilt für jede Commitment-Stufe, da eine
+    finalisierte Transaktion auch "confirmed" und "processed" erfüllt.
+    """
+    return f"tx:finalized:{signature}"
+
+
+def signatures_key(commitment: str, address: str, limit: int, before: Optional[str], until: Optional[str]) -> str:
+    return f"sigs:{commitment}:{address}:{limit}:{before or ''}:{until or ''}"
+
+
+def is_finalized(tx_detail: Dict[str, Any], commitment: str) -> bool:
+    """
+    Gibt an, ob eine Transaktion unveränderlich ist und dauerhaft gespeichert werden darf.
+    """
+    if commitment == "finalized":
+        return True
+    block_time = tx_detail.get("blockTime")
+    finality_age = float(os.getenv("SOLANA_RPC_FINALITY_AGE", DEFAULT_FINALITY_AGE))
+    return bool(block_time) and time.time() - block_time > finality_age
+
+
+class RPCCache:
+    """
+    Schnittstelle der Cache-Backends. Fehler des Backends dürfen den RPC-Abruf nie verhindern;
+    sie werden gemeldet und wie ein Cache-Miss behandelt.
+    """
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {}
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        pass
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl)
+
+
+class SQLiteRPCCache(RPCCache):
+    """
+    Cache in einer lokalen SQLite-Datei. Werte werden wie die Rohdaten der Transaktionen komprimiert.
+    Jeder Prozess und Thread verwendet eine eigene Verbindung (fork-sicher unter Gunicorn).
+    """
+    # SQLite begrenzt die Anzahl der Parameter pro Abfrage.
+    MAX_PARAMS = 500
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS rpc_cache "
+                               "(key TEXT PRIMARY KEY, codec TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS rpc_cache_expires_at ON rpc_cache (expires_at)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found: Dict[str, Any] = {}
+        now = time.time()
+        try:
+            connection = self._connection()
+            for start in range(0, len(keys), self.MAX_PARAMS):
+                chunk = keys[start:start + self.MAX_PARAMS]
+                rows = connection.execute(
+                    f"SELECT key, codec, value FROM rpc_cache WHERE key IN ({','.join('?' * len(chunk))}) "
+                    f"AND (expires_at IS NULL OR expires_at > ?)", (*chunk, now))
+                for key, codec, value in rows:
+                    found[key] = decompress_json(value, codec)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("Fehler beim Lesen aus dem RPC-Cache %s: %s", self.path, e)
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        rows = []
+        for key, value in items.items():
+            blob, codec, _ = compress_json(value)
+            rows.append((key, codec, blob, expires_at))
+        try:
+            connection = self._connection()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO rpc_cache (key, codec, value, expires_at) VALUES (?, ?, ?, ?)", rows)
+                if ttl is not None:
+                    connection.execute("DELETE FROM rpc_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning("Fehler beim Schreiben in den RPC-Cache %s: %s", self.path, e)
+
+
+class DjangoRPCCache(RPCCache):
+    """
+    Cache über das Django-Cache-Framework (Alias aus `CACHES`).
+    """
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        from django.core.cache import caches
+        try:
+            return caches[self.alias].get_many(list(keys))
+        except Exception as e:
+            logger.warning("Fehler beim Lesen aus dem Django-Cache '%s': %s", self.alias, e)
+            return {}
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        from django.core.cache import caches
+        try:
+            caches[self.alias].set_many(items, timeout=ttl)
+        except Exception as e:
+            logger.warning("Fehler beim Schreiben in den Django-Cache '%s': %s", self.alias, e)
+
+
+_rpc_cache: Optional[RPCCache] = None
+_rpc_cache_lock = threading.Lock()
+
+
+def get_rpc_cache() -> RPCCache:
+    """
+    Liefert den prozessweiten RPC-Cache, konfiguriert über SOLANA_RPC_CACHE (sqlite, django, none),
+    SOLANA_RPC_CACHE_PATH bzw. SOLANA_RPC_CACHE_ALIAS.
+    """
+    global _rpc_cache
+    with _rpc_cache_lock:
+        if _rpc_cache is None:
+            backend = os.getenv("SOLANA_RPC_CACHE", DEFAULT_CACHE_BACKEND).lower()
+            if backend == "sqlite":
+                _rpc_cache = SQLiteRPCCache(os.getenv("SOLANA_RPC_CACHE_PATH", DEFAULT_CACHE_PATH))
+            elif backend == "django":
+                _rpc_cache = DjangoRPCCache(os.getenv("SOLANA_RPC_CACHE_ALIAS", "default"))
+            else:
+                _rpc_cache = RPCCache()
+        return _rpc_cache
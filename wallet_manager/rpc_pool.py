@@ -0,0 +1,233 @@
+"""
+Pool mehrerer RPC-Endpunkte mit latenzbasierter Auswahl und optionalen Hedged Requests.
+
+Pro Endpunkt werden Latenz und Fehler der letzten Aufrufe (rollierendes Zeitfenster) erfasst.
+Jeder Aufruf geht an den Endpunkt mit der besten Bewertung (Median-Latenz, gewichtet mit Fehlerrate
+und laufenden Aufrufen); parallele Aufrufe, z.B. beim Backfill, verteilen sich so auf alle Endpunkte.
+Endpunkte mit offenem Circuit Breaker (siehe `RPCHealthState`) werden übersprungen.
+
+Mit Hedging wird ein Aufruf, der länger als das p95 der Latenz des Endpunkts dauert, zusätzlich an
+den nächstbesten Endpunkt gesendet; die erste erfolgreiche Antwort gewinnt.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+# Zeitfenster (Sekunden) der Latenz- und Fehlerstatistik. Ältere Messungen verfallen, sodass ein
+# zwischenzeitlich langsamer Endpunkt später wieder ausprobiert wird.
+DEFAULT_STATS_WINDOW = 60.0
+# Maximale Anzahl der Messungen pro Endpunkt.
+MAX_SAMPLES = 200
+# Mindestanzahl an Messungen, ab der das p95 als Hedging-Schwelle verwendet wird.
+MIN_SAMPLES_FOR_P95 = 20
+DEFAULT_HEDGE_DELAY = 1.0
+DEFAULT_HEDGE_WORKERS = 16
+
+
+class EndpointStats:
+    """
+    Rollierende Latenz- und Fehlerstatistik eines Endpunkts (threadsicher).
+    """
+    def __init__(self, window: float = DEFAULT_STATS_WINDOW):
+        self.window = window
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=MAX_SAMPLES) # (Zeitpunkt, Latenz, Erfolg)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.window
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return list(self.samples)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        :return: Anzahl der Messungen, p50/p95 der erfolgreichen Aufrufe (Sekunden), Fehlerrate und laufende Aufrufe.
+        """
+        with self._lock:
+            recent = self._recent()
+            in_flight = self.in_flight
+        latencies = sorted(latency for _, latency, ok in recent if ok)
+        errors = sum(1 for _, _, ok in recent if not ok)
+
+        def percentile(fraction: float) -> Optional[float]:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] if latencies else None
+
+        return {
+            "samples": len(recent),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "error_rate": errors / len(recent) if recent else 0.0,
+            "in_flight": in_flight,
+        }
+
+    def score(self) -> float:
+        """
+        Kleiner ist besser. Endpunkte ohne aktuelle Messungen erhalten 0 und werden zuerst ausprobiert.
+        """
+        stats = self.snapshot()
+        if not stats["samples"]:
+            return stats["in_flight"] * 0.001
+        latency = stats["p50"] if stats["p50"] is not None else 10.0
+        return latency * (1 + 5 * stats["error_rate"]) * (1 + stats["in_flight"])
+
+
+class RPCPool:
+    """
+    Wählt Endpunkte für RPC-Aufrufe aus und führt sie mit Failover und optionalem Hedging aus.
+
+    :param endpoints: Die RPC-Endpunkte.
+    :param is_available: Liefert für einen Endpunkt, ob er Aufrufe annimmt (z.B. Circuit Breaker geschlossen).
+    :param hedge: Hedged Requests aktivieren (Standard: SOLANA_RPC_HEDGE).
+    """
+    def __init__(self, endpoints: List[str], is_available: Callable[[str], bool], hedge: Optional[bool] = None):
+        self.endpoints = endpoints
+        self.is_available = is_available
+        self.stats = {endpoint: get_endpoint_stats(endpoint) for endpoint in endpoints}
+        if hedge is None:
+            hedge = os.getenv("SOLANA_RPC_HEDGE", "false").lower() == "true"
+        self.hedge = hedge and len(endpoints) > 1
+        self.hedge_delay = float(os.getenv("SOLANA_RPC_HEDGE_DELAY", DEFAULT_HEDGE_DELAY))
+
+    def ranked(self) -> List[str]:
+        """
+        Verfügbare Endpunkte, bester zuerst.
+        """
+        available = [endpoint for endpoint in self.endpoints if self.is_available(endpoint)]
+        return sorted(available, key=lambda endpoint: self.stats[endpoint].score())
+
+    def _timed(self, endpoint: str, call: Callable[[str], Any]) -> Any:
+        stats = self.stats[endpoint]
+        stats.start()
+        started_at = time.monotonic()
+        ok = False
+        try:
+            result = call(endpoint)
+            ok = True
+            return result
+        finally:
+            stats.finish(time.monotonic() - started_at, ok)
+
+    def _hedge_delay(self, endpoint: str) -> float:
+        stats = self.stats[endpoint].snapshot()
+        if stats["p95"] is not None and stats["samples"] >= MIN_SAMPLES_FOR_P95:
+            return stats["p95"]
+        return self.hedge_delay
+
+    def execute(self, call: Callable[[str], Any]) -> Any:
+        """
+        Führt `call(endpoint)` auf dem besten Endpunkt aus. Wirft der Aufruf eine Ausnahme, wird der
+        nächste Endpunkt versucht; die letzte Ausnahme wird weitergereicht, wenn alle fehlschlagen.
+        """
+        endpoints = self.ranked()
+        if not endpoints:
+            raise ConnectionError("Kein RPC-Endpunkt verfügbar (alle Circuit Breaker offen).")
+        if self.hedge and len(endpoints) > 1:
+            return self._execute_hedged(call, endpoints)
+
+        last_error: Optional[Exception] = None
+        for endpoint in endpoints:
+            try:
+                return self._timed(endpoint, call)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def execute_async(self, call: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        Wie `execute` für Coroutinen (`AsyncSolanaAPI`), mit Failover, aber ohne Hedging.
+        """
+        endpoints = self.ranked()
+        if not endpoints:
+            raise ConnectionError("Kein RPC-Endpunkt verfügbar (alle Circuit Breaker offen).")
+
+        last_error: Optional[Exception] = None
+        for endpoint in endpoints:
+            stats = self.stats[endpoint]
+            stats.start()
+            started_at = time.monotonic()
+            ok = False
+            try:
+                result = await call(endpoint)
+                ok = True
+                return result
+            except Exception as e:
+                last_error = e
+            finally:
+                stats.finish(time.monotonic() - started_at, ok)
+        raise last_error
+
+    def _execute_hedged(self, call: Callable[[str], Any], endpoints: List[str]) -> Any:
+        executor = _hedge_executor()
+        pending: Dict[Future, str] = {executor.submit(self._timed, endpoints[0], call): endpoints[0]}
+        remaining = endpoints[1:]
+        timeout: Optional[float] = self._hedge_delay(endpoints[0])
+        last_error: Optional[Exception] = None
+        while pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primärer Aufruf zu langsam: zusätzlich an den nächstbesten Endpunkt senden.
+                if remaining:
+                    endpoint = remaining.pop(0)
+                    pending[executor.submit(self._timed, endpoint, call)] = endpoint
+                timeout = None
+                continue
+            for future in done:
+                del pending[future]
+                try:
+                    # Der langsamere Aufruf läuft im Hintergrund zu Ende und fließt nur in die Statistik ein.
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+            if not pending and remaining:
+                endpoint = remaining.pop(0)
+                pending[executor.submit(self._timed, endpoint, call)] = endpoint
+        raise last_error
+
+
+_endpoint_stats: Dict[str, EndpointStats] = {}
+_endpoint_stats_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+
+
+def get_endpoint_stats(endpoint: str) -> EndpointStats:
+    """
+    Liefert die prozessweite Statistik eines Endpunkts, damit sie über einzelne `SolanaAPI`-Instanzen hinweg gilt.
+    """
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.get(endpoint)
+        if stats is None:
+            stats = _endpoint_stats[endpoint] = EndpointStats(float(os.getenv("SOLANA_RPC_STATS_WINDOW", DEFAULT_STATS_WINDOW)))
+        return stats
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _endpoint_stats_lock:
+        # Nach einem Fork (Gunicorn) gehören die Threads dem Elternprozess.
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv("SOLANA_RPC_HEDGE_WORKERS", DEFAULT_HEDGE_WORKERS)),
+                                           thread_name_prefix="rpc-hedge")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def configured_endpoints(default: str) -> List[str]:
+    """
+    Endpunkte aus SOLANA_RPC_ENDPOINTS (kommagetrennt), sonst SOLANA_RPC_ENDPOINT bzw. `default`.
+    """
+    endpoints = [endpoint.strip() for endpoint in os.getenv("SOLANA_RPC_ENDPOINTS", "").split(",") if endpoint.strip()]
+    return endpoints or [os.getenv("SOLANA_RPC_ENDPOINT", default)]
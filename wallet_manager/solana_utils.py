@@ -1,8 +1,22 @@
+import asyncio
+import logging
 import os
-from solana.rpc.api import Client
+import threading
+import time
+from importlib.util import find_spec
+import httpx
+from asgiref.sync import sync_to_async
 from solana.publickey import PublicKey
 from solana.rpc.core import RPCException
-from typing import List, Dict, Any, Optional
+from solders.pubkey import Pubkey
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple
+from .metrics import record_cache, record_item_error, record_rpc_bytes, record_rpc_request, rpc_timer
+from .rate_limit import async_call_with_retry, backoff_delay, call_with_retry, get_rate_limiter, is_rate_limit_error, max_retries
+from .rpc_cache import (DEFAULT_SIGNATURES_TTL, RPCCache, get_rpc_cache, is_finalized, signatures_key,
+                        transaction_key)
+from .rpc_pool import RPCPool, configured_endpoints
+
+logger = logging.getLogger(__name__)
 
 # Konfiguration des RPC-Endpunkts.
 # Du kannst einen öffentlichen Endpunkt verwenden oder einen eigenen/privaten.
@@ -13,79 +27,451 @@ DEFAULT_RPC_ENDPOINT = "https://api.mainnet-beta.solana.com"
 # DEFAULT_RPC_ENDPOINT = "https://api.devnet.solana.com"
 # DEFAULT_RPC_ENDPOINT = "https://api.testnet.solana.com"
 
+# Anzahl der `getTransaction`-Aufrufe, die in einer JSON-RPC-Batch-Anfrage gebündelt werden.
+# Viele Provider begrenzen die Batch-Größe (oft 50-100), daher konservativ gewählt.
+# Ein Wert von 1 deaktiviert den Batch-Modus (ein HTTP-Aufruf pro Signatur wie bisher).
+DEFAULT_BATCH_SIZE = 50
+
+# Commitment-Stufe für getTransaction. 'confirmed' ist ein guter Kompromiss.
+TRANSACTION_COMMITMENT = "confirmed"
+
+# Einstellungen für den Gesundheitszustand / Circuit Breaker pro RPC-Endpunkt.
+# HEALTH_TTL: So lange (Sekunden) gilt ein erfolgreicher Health-Check bzw. RPC-Aufruf als aktuell.
+# FAILURE_THRESHOLD: Nach so vielen aufeinanderfolgenden Fehlern wird der Breaker geöffnet.
+# RESET_TIMEOUT: Nach so vielen Sekunden im offenen Zustand wird im Hintergrund erneut geprüft.
+DEFAULT_HEALTH_TTL = 30.0
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Maximale Anzahl gleichzeitiger Batch-Anfragen in `AsyncSolanaAPI.get_transaction_details_batch`.
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Einstellungen des prozessweiten HTTP-Clients (siehe `get_http_client`).
+# TIMEOUT: Sekunden für Lesen/Schreiben einer Antwort; CONNECT_TIMEOUT: für den Verbindungsaufbau (TCP+TLS).
+# POOL_SIZE: maximale Anzahl offener Verbindungen pro Prozess, über alle Endpunkte.
+# KEEPALIVE_EXPIRY: So lange (Sekunden) bleibt eine ungenutzte Verbindung für den nächsten Aufruf offen.
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+class RPCHealthState:
+    """
+    Gesundheitszustand eines RPC-Endpunkts mit Circuit Breaker.
+
+    Zustände:
+    - "closed": Endpunkt gilt als erreichbar, Aufrufe werden durchgelassen.
+    - "open": Nach `failure_threshold` aufeinanderfolgenden Fehlern. Aufrufe schlagen sofort fehl,
+      statt jeweils in den Client-Timeout zu laufen. Nach `reset_timeout` wird ein Health-Check
+      im Hintergrund gestartet.
+    - "half_open": Ein Hintergrund-Check läuft gerade; Aufrufe schlagen weiterhin sofort fehl.
+
+    Der Zustand wird pro Endpunkt und Prozess geteilt (siehe `get_health_state`), damit nicht
+    jede neue `SolanaAPI`-Instanz (z.B. pro Request) erneut prüfen muss.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, ttl: float = DEFAULT_HEALTH_TTL, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.ttl = ttl
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.last_success_at: Optional[float] = None
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        """
+        Gibt True zurück, wenn der Endpunkt innerhalb der TTL erfolgreich geantwortet hat.
+        """
+        with self._lock:
+            return (self.state == self.CLOSED and self.last_success_at is not None
+                    and time.monotonic() - self.last_success_at < self.ttl)
+
+    def allow_request(self, probe: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Prüft, ob ein Datenaufruf durchgeführt werden darf (ohne eigenen Health-Check).
+
+        :param probe: Funktion für den Hintergrund-Health-Check, falls der Breaker offen ist und
+                      `reset_timeout` abgelaufen ist.
+        :return: False, solange der Breaker offen ist (Fail-fast), sonst True.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            start_probe = (self.state == self.OPEN and probe is not None
+                           and time.monotonic() - self.opened_at >= self.reset_timeout)
+            if start_probe:
+                self.state = self.HALF_OPEN
+        if start_probe:
+            threading.Thread(target=self._run_probe, args=(probe,), daemon=True).start()
+        return False
+
+    def _run_probe(self, probe: Callable[[], bool]) -> None:
+        try:
+            healthy = probe()
+        except Exception:
+            healthy = False
+        if healthy:
+            self.record_success()
+        else:
+            with self._lock:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.last_success_at = time.monotonic()
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit Breaker geöffnet nach %d aufeinanderfolgenden Fehlern.", self.consecutive_failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+def _is_transport_error(exc: Exception) -> bool:
+    """
+    Gibt True zurück, wenn der Fehler auf ein Problem mit dem Endpunkt selbst hindeutet
+    (Timeout, Verbindungsabbruch, HTTP 5xx) und daher für den Circuit Breaker zählt.
+
+    Rate Limits (HTTP 429, 503 mit Retry-After, `RateLimited`) zählen nicht: Der Endpunkt ist erreichbar
+    und wird über den Rate Limiter pausiert (siehe rate_limit.py), statt für alle Aufrufe gesperrt zu werden.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        if status == 429 or (status == 503 and exc.response.headers.get("Retry-After")):
+            return False
+        return status >= 500
+    return isinstance(exc, (httpx.TransportError, OSError))
+
+
+def is_valid_address(address: str) -> bool:
+    """
+    Gibt True zurück, wenn `address` ein Base58-kodierter öffentlicher Schlüssel (32 Bytes) ist.
+    """
+    try:
+        Pubkey.from_string(address)
+    except ValueError:
+        return False
+    return True
+
+
+def rpc_timeout() -> float:
+    return float(os.getenv("SOLANA_RPC_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+def _http2_enabled() -> bool:
+    """
+    HTTP/2 (mehrere Aufrufe gleichzeitig über eine Verbindung) ist aktiv, sofern SOLANA_RPC_HTTP2 nicht
+    ausgeschaltet ist und das Paket `h2` installiert ist. Provider ohne HTTP/2 antworten weiter über HTTP/1.1.
+    """
+    if os.getenv("SOLANA_RPC_HTTP2", "true").lower() in ("0", "false", "no"):
+        return False
+    if find_spec("h2") is None:
+        logger.info("HTTP/2 für RPC-Aufrufe nicht verfügbar (Paket h2 fehlt, `pip install httpx[http2]`); verwende HTTP/1.1.")
+        return False
+    return True
+
+
+_http_client: Optional[httpx.Client] = None
+_http_client_pid: Optional[int] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Liefert den prozessweit geteilten HTTP-Client für alle synchronen RPC-Aufrufe.
+
+    Verbindungen bleiben zwischen Seitenaufrufen offen (Keep-Alive, bei HTTP/2 gebündelt), sodass nur der erste
+    Aufruf eines Workers den TCP- und TLS-Aufbau bezahlt. Der Client wird erst beim ersten Aufruf angelegt, also
+    nach dem fork der Gunicorn-Worker; ein vom Elternprozess geerbter Client wird verworfen, da sich die Prozesse
+    sonst dieselben Sockets teilen würden. Konfiguration über SOLANA_RPC_TIMEOUT, SOLANA_RPC_CONNECT_TIMEOUT,
+    SOLANA_RPC_POOL_SIZE, SOLANA_RPC_KEEPALIVE_EXPIRY und SOLANA_RPC_HTTP2.
+    """
+    global _http_client, _http_client_pid
+    with _http_client_lock:
+        if _http_client is None or _http_client_pid != os.getpid():
+            pool_size = max(1, int(os.getenv("SOLANA_RPC_POOL_SIZE", DEFAULT_POOL_SIZE)))
+            _http_client = httpx.Client(
+                timeout=httpx.Timeout(rpc_timeout(), connect=float(os.getenv("SOLANA_RPC_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                                    keepalive_expiry=float(os.getenv("SOLANA_RPC_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY))),
+                http2=_http2_enabled(),
+            )
+            _http_client_pid = os.getpid()
+        return _http_client
+
+
+def _post_json_rpc(endpoint: str, method: str, payload: Any) -> Any:
+    """
+    Sendet einen JSON-RPC-Aufruf (oder Batch) über den geteilten HTTP-Client und liefert die dekodierte Antwort.
+    HTTP-Fehler (z.B. 429) werden als `httpx.HTTPStatusError` weitergereicht, damit sie wiederholt werden können.
+    """
+    response = get_http_client().post(endpoint, json=payload)
+    record_rpc_bytes(method, endpoint, len(response.content))
+    response.raise_for_status()
+    return response.json()
+
+
+def _probe_health_http(rpc_endpoint: str) -> bool:
+    """
+    Synchroner `getHealth`-Aufruf direkt über HTTP, für `SolanaAPI` und für Hintergrund-Checks aus `AsyncSolanaAPI`.
+    """
+    started_at = time.perf_counter()
+    try:
+        response = _post_json_rpc(rpc_endpoint, "getHealth", {"jsonrpc": "2.0", "id": 1, "method": "getHealth"})
+        record_rpc_request("getHealth", rpc_endpoint, time.perf_counter() - started_at, "ok")
+        return isinstance(response, dict) and response.get("result") == "ok"
+    except (httpx.HTTPError, ValueError) as e:
+        record_rpc_request("getHealth", rpc_endpoint, time.perf_counter() - started_at, "error")
+        logger.warning("Verbindungsfehler zum RPC-Endpunkt %s: %s", rpc_endpoint, e, extra={"endpoint": rpc_endpoint})
+        return False
+
+
+_health_states: Dict[str, RPCHealthState] = {}
+_health_states_lock = threading.Lock()
+
+
+def get_health_state(rpc_endpoint: str) -> RPCHealthState:
+    """
+    Liefert den prozessweit geteilten Gesundheitszustand für einen RPC-Endpunkt.
+    Die Parameter werden über SOLANA_RPC_HEALTH_TTL, SOLANA_RPC_FAILURE_THRESHOLD und
+    SOLANA_RPC_RESET_TIMEOUT konfiguriert.
+    """
+    with _health_states_lock:
+        state = _health_states.get(rpc_endpoint)
+        if state is None:
+            state = RPCHealthState(
+                ttl=float(os.getenv("SOLANA_RPC_HEALTH_TTL", DEFAULT_HEALTH_TTL)),
+                failure_threshold=int(os.getenv("SOLANA_RPC_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD)),
+                reset_timeout=float(os.getenv("SOLANA_RPC_RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT)),
+            )
+            _health_states[rpc_endpoint] = state
+        return state
+
+
+def _transaction_batch_payload(signatures: List[str]) -> List[Dict[str, Any]]:
+    """
+    JSON-RPC-Batch mit einem `getTransaction` pro Signatur; die `id` ist der Index der Signatur.
+    """
+    return [
+        {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "getTransaction",
+            "params": [
+                signature,
+                {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0, "commitment": TRANSACTION_COMMITMENT},
+            ],
+        }
+        for request_id, signature in enumerate(signatures)
+    ]
+
+
+def _match_batch_responses(chunk: List[str], responses: List[Any]) -> Tuple[Dict[str, Optional[Dict[str, Any]]],
+                                                                             Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Ordnet die Antworten eines Batches aus `_transaction_batch_payload(chunk)` über die `id` ihren Signaturen zu.
+
+    :return: Tupel (Signatur -> Details oder None, zu cachende finalisierte Transaktionen,
+             wegen Rate Limit abgelehnte Signaturen).
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {signature: None for signature in chunk}
+    finalized: Dict[str, Dict[str, Any]] = {}
+    rate_limited: List[str] = []
+    for item in responses:
+        request_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(request_id, int) or not 0 <= request_id < len(chunk):
+            logger.warning("Batch-Antwort ohne zuordenbare ID: %s", item)
+            record_item_error("getTransaction", "unmatched")
+            continue
+        signature = chunk[request_id]
+        if is_rate_limit_error(item.get("error")):
+            rate_limited.append(signature)
+            record_item_error("getTransaction", "rate_limited")
+        elif item.get("error"):
+            logger.warning("Fehler beim Abrufen der Transaktionsdetails für Signatur %s: %s", signature, item['error'].get('message'),
+                           extra={"signature": signature})
+            record_item_error("getTransaction", "error")
+        elif item.get("result") is None:
+            logger.info("Transaktionsdetails für Signatur %s sind None, aber kein Fehler wurde gemeldet. Möglicherweise noch nicht finalisiert oder nicht auf diesem Knoten verfügbar.",
+                        signature, extra={"signature": signature})
+            record_item_error("getTransaction", "missing")
+        else:
+            results[signature] = item["result"]
+            if is_finalized(item["result"], TRANSACTION_COMMITMENT):
+                finalized[transaction_key(signature)] = item["result"]
+    return results, finalized, rate_limited
+
+
 class SolanaAPI:
     """
     Eine Klasse zur Interaktion mit der Solana Blockchain.
+
+    Die Aufrufe gehen als JSON-RPC über den prozessweiten HTTP-Client (`get_http_client`); eine Instanz
+    pro Seitenaufruf kostet daher keinen neuen Verbindungsaufbau.
     """
-    def __init__(self, rpc_endpoint: Optional[str] = None):
+    def __init__(self, rpc_endpoint: Optional[str] = None, batch_size: Optional[int] = None,
+                 cache: Optional[RPCCache] = None):
         """
         Initialisiert den Solana Client.
 
         :param rpc_endpoint: Der RPC-Endpunkt, zu dem eine Verbindung hergestellt werden soll.
-                             Verwendet DEFAULT_RPC_ENDPOINT, wenn keiner angegeben ist.
+                             Ohne Angabe werden die Endpunkte aus SOLANA_RPC_ENDPOINTS als Pool verwendet
+                             (siehe rpc_pool.py), sonst SOLANA_RPC_ENDPOINT bzw. DEFAULT_RPC_ENDPOINT.
+        :param batch_size: Anzahl der Transaktionen pro JSON-RPC-Batch-Anfrage.
+                           Verwendet SOLANA_RPC_BATCH_SIZE bzw. DEFAULT_BATCH_SIZE, wenn nicht angegeben.
+        :param cache: Cache für RPC-Antworten (siehe rpc_cache.py). Verwendet den prozessweiten Cache, wenn nicht angegeben.
         """
-        self.rpc_endpoint = rpc_endpoint or os.getenv("SOLANA_RPC_ENDPOINT", DEFAULT_RPC_ENDPOINT)
-        try:
-            self.client = Client(self.rpc_endpoint, timeout=30) # Timeout auf 30 Sekunden erhöht
-        except Exception as e:
-            print(f"Fehler beim Initialisieren des Solana Clients: {e}")
-            self.client = None
+        self.endpoints = [rpc_endpoint] if rpc_endpoint else configured_endpoints(DEFAULT_RPC_ENDPOINT)
+        # Der erste Endpunkt dient zur Anzeige und für Meldungen.
+        self.rpc_endpoint = self.endpoints[0]
+        self.batch_size = max(1, batch_size or int(os.getenv("SOLANA_RPC_BATCH_SIZE", DEFAULT_BATCH_SIZE)))
+        self.cache = cache if cache is not None else get_rpc_cache()
+        self.signatures_ttl = float(os.getenv("SOLANA_RPC_SIGNATURES_TTL", DEFAULT_SIGNATURES_TTL))
+        self.rate_limiter = get_rate_limiter()
+        self.pool = RPCPool(self.endpoints, self._endpoint_allows)
+
+    def _probe_health(self, endpoint: Optional[str] = None) -> bool:
+        """
+        Führt einen echten `getHealth`-Aufruf gegen den RPC-Endpunkt durch (Standard: den ersten).
+        """
+        return _probe_health_http(endpoint or self.rpc_endpoint)
+
+    def _request(self, endpoint: str, method: str, params: List[Any]) -> Any:
+        """
+        Einzelner JSON-RPC-Aufruf gegen `endpoint`; liefert die Antwort mit `result` bzw. `error`.
+        """
+        return _post_json_rpc(endpoint, method, {"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+
+    def _endpoint_allows(self, endpoint: str) -> bool:
+        return get_health_state(endpoint).allow_request(lambda: self._probe_health(endpoint))
 
     def is_connected(self) -> bool:
         """
-        Überprüft, ob die Verbindung zum RPC-Endpunkt erfolgreich ist.
+        Überprüft, ob mindestens ein RPC-Endpunkt erreichbar ist.
+
+        Verwendet den zwischengespeicherten Gesundheitszustand: Innerhalb der TTL wird kein
+        `getHealth`-Aufruf gemacht, Endpunkte mit offenem Circuit Breaker werden übersprungen.
         """
-        if not self.client:
-            return False
-        try:
-            self.client.get_health()
+        if any(get_health_state(endpoint).is_fresh() for endpoint in self.endpoints):
             return True
-        except RPCException as e:
-            print(f"Verbindungsfehler zum RPC-Endpunkt {self.rpc_endpoint}: {e}")
-            return False
-        except Exception as e: # Allgemeinere Fehlerbehandlung
-            print(f"Ein unerwarteter Fehler ist bei der Gesundheitsprüfung aufgetreten: {e}")
+        for endpoint in self.pool.ranked():
+            health = get_health_state(endpoint)
+            if self._probe_health(endpoint):
+                health.record_success()
+                return True
+            health.record_failure()
+        return False
+
+    def _call(self, method: str, func: Callable[[str], Any], cost: int = 1) -> Any:
+        """
+        Führt `func(endpoint)` auf dem besten Endpunkt des Pools aus (siehe rpc_pool.py), unter dem
+        Rate Limit dieses Endpunkts und mit Wiederholungen bei 429 (siehe rate_limit.py). Timeouts,
+        Verbindungsfehler und 5xx werden nicht wiederholt: Jeder solche Fehlversuch zählt sofort für den
+        Circuit Breaker des Endpunkts und der nächste Endpunkt wird versucht.
+        Die Gesamtdauer wird dem laufenden Seitenaufruf bzw. Sync-Auftrag zugerechnet (siehe metrics.py).
+        """
+        def attempt(endpoint: str) -> Any:
+            health = get_health_state(endpoint)
+            try:
+                result = call_with_retry(self.rate_limiter, endpoint, method, lambda: func(endpoint), cost)
+            except Exception as e:
+                if _is_transport_error(e):
+                    health.record_failure()
+                raise
+            health.record_success()
+            return result
+
+        with rpc_timer(cost):
+            return self.pool.execute(attempt)
+
+    def _is_available(self) -> bool:
+        """
+        Schnelle Prüfung vor Datenaufrufen, ohne eigenen Health-Check-Roundtrip.
+        """
+        if not any(self._endpoint_allows(endpoint) for endpoint in self.endpoints):
+            logger.warning("Alle RPC-Endpunkte (%s) sind als nicht erreichbar markiert (Circuit Breaker offen).", ", ".join(self.endpoints))
             return False
+        return True
 
-    def get_transaction_signatures(self, address_str: str, limit: int = 10, before_signature: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_transaction_signatures(self, address_str: str, limit: int = 10, before_signature: Optional[str] = None,
+                                   until_signature: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Ruft die Signaturen der Transaktionen für eine bestimmte Adresse ab.
 
         :param address_str: Die Solana-Adresse als String.
         :param limit: Die maximale Anzahl der abzurufenden Signaturen.
         :param before_signature: Ruft Transaktionen vor dieser Signatur ab (für Paginierung).
+        :param until_signature: Ruft nur Transaktionen ab, die neuer als diese Signatur sind (für inkrementelle Synchronisation).
         :return: Eine Liste von Transaktionssignaturen-Objekten oder eine leere Liste bei Fehlern.
         """
-        if not self.client or not self.is_connected():
-            print("Client nicht verbunden.")
-            return []
+        page = self.get_signatures_page(address_str, limit, before_signature, until_signature)
+        return page if page is not None else []
+
+    def get_signatures_page(self, address_str: str, limit: int = 10, before_signature: Optional[str] = None,
+                            until_signature: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wie `get_transaction_signatures`, unterscheidet aber Fehler von einer leeren Seite. Beim Blättern und
+        Abgleichen darf nur eine echte leere Antwort (`"result": []`) als Ende der Historie gelten.
+
+        :return: Die Signaturen (leer, wenn es keine weiteren gibt) oder None bei Fehlern.
+        """
+        # Signaturlisten ändern sich mit jeder neuen Transaktion und werden daher nur kurz gecacht.
+        # getSignaturesForAddress verwendet das Standard-Commitment des Clients ('finalized').
+        cache_key = signatures_key("finalized", address_str, limit, before_signature, until_signature)
+        cached = self.cache.get(cache_key)
+        record_cache("getSignaturesForAddress", hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached
+
+        if not self._is_available():
+            return None
 
         try:
             address_pubkey = PublicKey(address_str)
             params = {"limit": limit}
             if before_signature:
                 params["before"] = before_signature
+            if until_signature:
+                params["until"] = until_signature
 
             # Hinweis: Die Solana API gibt die neuesten Transaktionen zuerst zurück.
-            response = self.client.get_signatures_for_address(address_pubkey, **params)
+            response = self._call("getSignaturesForAddress",
+                                  lambda endpoint: self._request(endpoint, "getSignaturesForAddress", [str(address_pubkey), params]))
 
-            if response and response.get("result"):
+            if isinstance(response, dict) and isinstance(response.get("result"), list):
+                self.cache.set(cache_key, response["result"], ttl=self.signatures_ttl)
                 return response["result"]
-            elif response and response.get("error"):
-                print(f"Fehler beim Abrufen der Signaturen für Adresse {address_str}: {response['error']['message']}")
-                return []
+            elif isinstance(response, dict) and response.get("error"):
+                logger.warning("Fehler beim Abrufen der Signaturen für Adresse %s: %s", address_str, response['error'].get('message'),
+                               extra={"wallet": address_str})
+                return None
             else:
-                print(f"Unerwartete Antwort beim Abrufen der Signaturen für {address_str}: {response}")
-                return []
+                logger.warning("Unerwartete Antwort beim Abrufen der Signaturen für %s: %s", address_str, response,
+                               extra={"wallet": address_str})
+                return None
         except ValueError as e:
-            print(f"Ungültige Adresse {address_str}: {e}")
-            return []
+            logger.warning("Ungültige Adresse %s: %s", address_str, e, extra={"wallet": address_str})
+            return None
         except RPCException as e:
-            print(f"RPC Fehler beim Abrufen der Signaturen für Adresse {address_str}: {e}")
-            return []
+            logger.warning("RPC Fehler beim Abrufen der Signaturen für Adresse %s: %s", address_str, e, extra={"wallet": address_str})
+            return None
         except Exception as e:
-            print(f"Allgemeiner Fehler beim Abrufen der Signaturen für {address_str}: {e}")
-            return []
+            logger.warning("Allgemeiner Fehler beim Abrufen der Signaturen für %s: %s", address_str, e, extra={"wallet": address_str})
+            return None
 
     def get_transaction_details(self, signature: str) -> Optional[Dict[str, Any]]:
         """
@@ -94,62 +480,437 @@ class SolanaAPI:
         :param signature: Die Transaktionssignatur.
         :return: Ein Dictionary mit den Transaktionsdetails oder None bei Fehlern.
         """
-        if not self.client or not self.is_connected():
-            print("Client nicht verbunden.")
+        # Finalisierte Transaktionen sind unveränderlich und werden auch bei nicht erreichbarem Endpunkt aus dem Cache geliefert.
+        cached = self.cache.get(transaction_key(signature))
+        record_cache("getTransaction", hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached
+
+        if not self._is_available():
             return None
 
         try:
             # `max_supported_transaction_version` wird benötigt, um sicherzustellen, dass wir auch Versioned Transactions parsen können.
             # `commitment` kann 'processed', 'confirmed', oder 'finalized' sein. 'confirmed' ist ein guter Kompromiss.
-            response = self.client.get_transaction(signature, encoding="jsonParsed", max_supported_transaction_version=0, commitment="confirmed")
+            response = self._call("getTransaction", lambda endpoint: self._request(endpoint, "getTransaction", [
+                signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0, "commitment": TRANSACTION_COMMITMENT}]))
 
             if response and response.get("result"):
+                if is_finalized(response["result"], TRANSACTION_COMMITMENT):
+                    self.cache.set(transaction_key(signature), response["result"])
                 return response["result"]
             elif response and response.get("error"):
-                print(f"Fehler beim Abrufen der Transaktionsdetails für Signatur {signature}: {response['error']['message']}")
+                logger.warning("Fehler beim Abrufen der Transaktionsdetails für Signatur %s: %s", signature, response['error']['message'],
+                               extra={"signature": signature})
                 return None
             else:
                 # Manchmal ist das Ergebnis None, auch wenn kein expliziter Fehler vorliegt, z.B. wenn die Tx noch nicht finalisiert ist
                 # oder der RPC-Knoten sie nicht hat.
                 if response and response.get("result") is None and not response.get("error"):
-                    print(f"Transaktionsdetails für Signatur {signature} sind None, aber kein Fehler wurde gemeldet. Möglicherweise noch nicht finalisiert oder nicht auf diesem Knoten verfügbar.")
+                    logger.info("Transaktionsdetails für Signatur %s sind None, aber kein Fehler wurde gemeldet. Möglicherweise noch nicht finalisiert oder nicht auf diesem Knoten verfügbar.",
+                                signature, extra={"signature": signature})
                 else:
-                    print(f"Unerwartete Antwort beim Abrufen der Transaktionsdetails für {signature}: {response}")
+                    logger.warning("Unerwartete Antwort beim Abrufen der Transaktionsdetails für %s: %s", signature, response,
+                                   extra={"signature": signature})
                 return None
         except RPCException as e:
-            print(f"RPC Fehler beim Abrufen der Transaktionsdetails für Signatur {signature}: {e}")
+            logger.warning("RPC Fehler beim Abrufen der Transaktionsdetails für Signatur %s: %s", signature, e, extra={"signature": signature})
             return None
         except Exception as e:
-            print(f"Allgemeiner Fehler beim Abrufen der Transaktionsdetails für {signature}: {e}")
+            logger.warning("Allgemeiner Fehler beim Abrufen der Transaktionsdetails für %s: %s", signature, e, extra={"signature": signature})
+            return None
+
+    def _post_batch(self, payload: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Sendet eine JSON-RPC-Batch-Anfrage (eine Liste von Aufrufen in einem HTTP-POST).
+
+        :param payload: Die Liste der JSON-RPC-Request-Objekte.
+        :return: Die Liste der JSON-RPC-Antworten oder None, wenn der gesamte Batch fehlgeschlagen ist.
+        """
+        method = payload[0]["method"] if payload else "batch"
+
+        try:
+            # Provider zählen jeden Aufruf im Batch einzeln gegen ihr Limit.
+            data = self._call(method, lambda endpoint: _post_json_rpc(endpoint, method, payload), cost=len(payload))
+        except (httpx.HTTPError, OSError) as e:
+            logger.warning("Fehler bei der Batch-Anfrage: %s", e)
+            return None
+        except ValueError as e:
+            logger.warning("Ungültige JSON-Antwort auf Batch-Anfrage: %s", e)
+            return None
+
+        # Manche Provider unterstützen keine Batches und antworten mit einem einzelnen Fehlerobjekt.
+        if not isinstance(data, list):
+            logger.warning("Unerwartete Antwort auf Batch-Anfrage (Batches evtl. nicht unterstützt): %s", data)
             return None
+        return data
+
+    def get_transaction_details_batch(self, signatures: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Ruft die Details mehrerer Transaktionen über JSON-RPC-Batch-Anfragen ab.
+
+        Pro `batch_size` Signaturen wird nur ein HTTP-Aufruf gemacht. Die Antworten werden über die
+        JSON-RPC-`id` ihrer Signatur zugeordnet, da die Reihenfolge im Batch nicht garantiert ist.
+        Fehler einzelner Einträge betreffen nur diese Signatur; schlägt ein ganzer Batch fehl,
+        werden dessen Signaturen einzeln über `get_transaction_details` abgerufen.
+        Bereits gecachte finalisierte Transaktionen werden nicht erneut abgerufen.
+
+        :param signatures: Die Liste der Transaktionssignaturen.
+        :return: Ein Dictionary Signatur -> Transaktionsdetails (oder None bei Fehlern).
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        if not signatures:
+            return results
+        cached = self.cache.get_many([transaction_key(signature) for signature in signatures])
+        for signature in signatures:
+            if transaction_key(signature) in cached:
+                results[signature] = cached[transaction_key(signature)]
+        record_cache("getTransaction", hits=len(results), misses=len(signatures) - len(results))
+        signatures = [signature for signature in signatures if signature not in results]
+        if not signatures:
+            return results
+        if not self._is_available():
+            results.update({signature: None for signature in signatures})
+            return results
+
+        # Vom Provider wegen Rate Limit abgelehnte Einträge werden mit Backoff erneut angefragt.
+        pending = signatures
+        attempt = 0
+        while pending:
+            rate_limited: List[str] = []
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                responses = self._post_batch(_transaction_batch_payload(chunk))
+                if responses is None and not self._is_available():
+                    # Breaker hat sich während des Abrufs geöffnet: keine Einzelabrufe mehr versuchen.
+                    for signature in chunk:
+                        results[signature] = None
+                    continue
+                if responses is None:
+                    for signature in chunk:
+                        results[signature] = self.get_transaction_details(signature)
+                    continue
+
+                matched, finalized, limited = _match_batch_responses(chunk, responses)
+                results.update(matched)
+                rate_limited.extend(limited)
+                self.cache.set_many(finalized)
+
+            if not rate_limited:
+                break
+            if attempt >= max_retries():
+                logger.warning("%d Signatur(en) nach %d Wiederholungen weiterhin durch Rate Limit abgelehnt.", len(rate_limited), attempt)
+                break
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            pending = rate_limited
+
+        return results
 
     def get_transactions_for_address(self, address_str: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Ruft eine Liste von Transaktionsdetails für eine gegebene Adresse ab.
 
+        Bei `batch_size > 1` werden die Details über JSON-RPC-Batches abgerufen, sonst einzeln.
+
         :param address_str: Die Solana-Adresse als String.
         :param limit: Die maximale Anzahl der abzurufenden Transaktionen.
-        :return: Eine Liste von Transaktionsdetail-Objekten.
+        :return: Eine Liste von Transaktionsdetail-Objekten (neueste zuerst).
         """
         signatures_result = self.get_transaction_signatures(address_str, limit=limit)
         transactions = []
         if not signatures_result:
             return transactions
 
+        signatures = []
         for sig_info in signatures_result:
             signature = sig_info.get("signature")
             if signature:
-                print(f"Rufe Details für Signatur ab: {signature}")
-                details = self.get_transaction_details(signature)
-                if details:
-                    transactions.append(details)
-                else:
-                    print(f"Konnte Details für Signatur {signature} nicht abrufen.")
+                signatures.append(signature)
+            else:
+                logger.warning("Keine Signatur im Signatur-Info-Objekt gefunden: %s", sig_info)
+
+        if self.batch_size > 1:
+            details_by_signature = self.get_transaction_details_batch(signatures)
+        else:
+            details_by_signature = {}
+            for signature in signatures:
+                logger.debug("Rufe Details für Signatur ab: %s", signature)
+                details_by_signature[signature] = self.get_transaction_details(signature)
+
+        # Reihenfolge der Signaturliste beibehalten (neueste zuerst).
+        for signature in signatures:
+            details = details_by_signature.get(signature)
+            if details:
+                transactions.append(details)
             else:
-                print(f"Keine Signatur im Signatur-Info-Objekt gefunden: {sig_info}")
+                logger.warning("Konnte Details für Signatur %s nicht abrufen.", signature, extra={"signature": signature})
 
         return transactions
 
+class AsyncSolanaAPI:
+    """
+    Asynchrone Variante von `SolanaAPI` für `wallet_transactions_async_view` und `wallet_transaction_details_view`.
+
+    Die Aufrufe gehen wie bei `SolanaAPI` als JSON-RPC über `httpx`, hier über einen `httpx.AsyncClient` pro
+    Instanz (asynchrone Verbindungen sind an eine Event-Loop gebunden), und laufen über denselben Pool mit
+    Failover (siehe rpc_pool.py), dieselben Rate Limits und Wiederholungen (siehe rate_limit.py) sowie
+    denselben Gesundheitszustand (Circuit Breaker) und RPC-Cache. Die Batches von
+    `get_transaction_details_batch` laufen nebenläufig; ein Semaphor begrenzt die Anzahl gleichzeitiger Anfragen.
+    """
+    def __init__(self, rpc_endpoint: Optional[str] = None, cache: Optional[RPCCache] = None,
+                 batch_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+        """
+        Initialisiert den asynchronen Solana Client.
+
+        :param rpc_endpoint: Der RPC-Endpunkt, zu dem eine Verbindung hergestellt werden soll.
+                             Ohne Angabe die Endpunkte aus SOLANA_RPC_ENDPOINTS als Pool (siehe `SolanaAPI`).
+        :param cache: Cache für RPC-Antworten. Verwendet den prozessweiten Cache, wenn nicht angegeben.
+        :param batch_size: Anzahl der Transaktionen pro JSON-RPC-Batch-Anfrage (siehe `SolanaAPI`).
+        :param max_concurrency: Maximale Anzahl gleichzeitiger Batch-Anfragen.
+                                Verwendet SOLANA_RPC_MAX_CONCURRENCY bzw. DEFAULT_MAX_CONCURRENCY, wenn nicht angegeben.
+        """
+        self.endpoints = [rpc_endpoint] if rpc_endpoint else configured_endpoints(DEFAULT_RPC_ENDPOINT)
+        self.rpc_endpoint = self.endpoints[0]
+        self.batch_size = max(1, batch_size or int(os.getenv("SOLANA_RPC_BATCH_SIZE", DEFAULT_BATCH_SIZE)))
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("SOLANA_RPC_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.cache = cache if cache is not None else get_rpc_cache()
+        self.signatures_ttl = float(os.getenv("SOLANA_RPC_SIGNATURES_TTL", DEFAULT_SIGNATURES_TTL))
+        self.rate_limiter = get_rate_limiter()
+        self.pool = RPCPool(self.endpoints, self._endpoint_allows)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(rpc_timeout(), connect=float(os.getenv("SOLANA_RPC_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))))
+
+    async def __aenter__(self) -> "AsyncSolanaAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Schließt die HTTP-Verbindungen des Clients.
+        """
+        await self.client.aclose()
+
+    def _endpoint_allows(self, endpoint: str) -> bool:
+        return get_health_state(endpoint).allow_request(lambda: _probe_health_http(endpoint))
+
+    async def _post(self, endpoint: str, method: str, payload: Any) -> Any:
+        """
+        Wie `_post_json_rpc`, über den asynchronen Client dieser Instanz.
+        """
+        response = await self.client.post(endpoint, json=payload)
+        record_rpc_bytes(method, endpoint, len(response.content))
+        response.raise_for_status()
+        return response.json()
+
+    async def _request(self, endpoint: str, method: str, params: Optional[List[Any]] = None) -> Any:
+        """
+        Einzelner JSON-RPC-Aufruf gegen `endpoint`; liefert die Antwort mit `result` bzw. `error`.
+        """
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method}
+        if params is not None:
+            payload["params"] = params
+        return await self._post(endpoint, method, payload)
+
+    async def _call(self, method: str, func: Callable[[str], Awaitable[Any]], cost: int = 1) -> Any:
+        """
+        Wie `SolanaAPI._call`: bester Endpunkt des Pools, Rate Limit und Wiederholungen bei 429, Circuit Breaker
+        und Failover bei Timeouts, Verbindungsfehlern und 5xx.
+        """
+        async def attempt(endpoint: str) -> Any:
+            health = get_health_state(endpoint)
+            try:
+                result = await async_call_with_retry(self.rate_limiter, endpoint, method, lambda: func(endpoint), cost)
+            except Exception as e:
+                if _is_transport_error(e):
+                    health.record_failure()
+                raise
+            health.record_success()
+            return result
+
+        with rpc_timer(cost):
+            return await self.pool.execute_async(attempt)
+
+    async def is_connected(self) -> bool:
+        """
+        Überprüft, ob mindestens ein RPC-Endpunkt erreichbar ist (mit zwischengespeichertem Zustand, siehe `SolanaAPI`).
+        """
+        if any(get_health_state(endpoint).is_fresh() for endpoint in self.endpoints):
+            return True
+        for endpoint in self.pool.ranked():
+            health = get_health_state(endpoint)
+            started_at = time.perf_counter()
+            try:
+                response = await self._request(endpoint, "getHealth")
+                healthy = isinstance(response, dict) and response.get("result") == "ok"
+                if not healthy:
+                    logger.warning("RPC-Endpunkt %s meldet sich nicht gesund: %s", endpoint, response, extra={"endpoint": endpoint})
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Verbindungsfehler zum RPC-Endpunkt %s: %s", endpoint, e, extra={"endpoint": endpoint})
+                healthy = False
+            record_rpc_request("getHealth", endpoint, time.perf_counter() - started_at, "ok" if healthy else "error")
+            if healthy:
+                health.record_success()
+                return True
+            health.record_failure()
+        return False
+
+    def _is_available(self) -> bool:
+        if not any(self._endpoint_allows(endpoint) for endpoint in self.endpoints):
+            logger.warning("Alle RPC-Endpunkte (%s) sind als nicht erreichbar markiert (Circuit Breaker offen).", ", ".join(self.endpoints))
+            return False
+        return True
+
+    async def get_transaction_signatures(self, address_str: str, limit: int = 10, before_signature: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ruft die Signaturen der Transaktionen für eine bestimmte Adresse ab.
+
+        Die Liste wird unter demselben Schlüssel wie bei `SolanaAPI.get_transaction_signatures` gecacht, sodass
+        beide Varianten und der Sync-Auftrag einander Aufrufe ersparen. Der Cache wird in einem Thread gelesen,
+        da seine Backends synchron arbeiten.
+
+        :param address_str: Die Solana-Adresse als String.
+        :param limit: Die maximale Anzahl der abzurufenden Signaturen.
+        :param before_signature: Ruft Transaktionen vor dieser Signatur ab (für Paginierung).
+        :return: Eine Liste von Transaktionssignaturen-Objekten oder eine leere Liste bei Fehlern.
+        """
+        cache_key = signatures_key("finalized", address_str, limit, before_signature, None)
+        cached = await sync_to_async(self.cache.get, thread_sensitive=False)(cache_key)
+        record_cache("getSignaturesForAddress", hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached
+
+        if not self._is_available():
+            return []
+
+        try:
+            address_pubkey = PublicKey(address_str)
+            params = {"limit": limit}
+            if before_signature:
+                params["before"] = before_signature
+
+            response = await self._call("getSignaturesForAddress",
+                                        lambda endpoint: self._request(endpoint, "getSignaturesForAddress", [str(address_pubkey), params]))
+
+            if isinstance(response, dict) and isinstance(response.get("result"), list):
+                await sync_to_async(self.cache.set, thread_sensitive=False)(cache_key, response["result"], ttl=self.signatures_ttl)
+                return response["result"]
+            elif isinstance(response, dict) and response.get("error"):
+                logger.warning("Fehler beim Abrufen der Signaturen für Adresse %s: %s", address_str, response['error'].get('message'),
+                               extra={"wallet": address_str})
+                return []
+            else:
+                logger.warning("Unerwartete Antwort beim Abrufen der Signaturen für %s: %s", address_str, response,
+                               extra={"wallet": address_str})
+                return []
+        except ValueError as e:
+            logger.warning("Ungültige Adresse %s: %s", address_str, e, extra={"wallet": address_str})
+            return []
+        except Exception as e:
+            logger.warning("Allgemeiner Fehler beim Abrufen der Signaturen für %s: %s", address_str, e, extra={"wallet": address_str})
+            return []
+
+    async def _fetch_transaction(self, signature: str) -> Optional[Dict[str, Any]]:
+        """
+        Einzelner `getTransaction`-Aufruf (ohne Cache-Abfrage) für Signaturen, deren Batch fehlgeschlagen ist.
+        """
+        try:
+            async with self._semaphore:
+                response = await self._call("getTransaction", lambda endpoint: self._request(endpoint, "getTransaction", [
+                    signature, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0, "commitment": TRANSACTION_COMMITMENT}]))
+        except Exception as e:
+            logger.warning("Allgemeiner Fehler beim Abrufen der Transaktionsdetails für %s: %s", signature, e, extra={"signature": signature})
+            return None
+        if isinstance(response, dict) and response.get("result"):
+            if is_finalized(response["result"], TRANSACTION_COMMITMENT):
+                await sync_to_async(self.cache.set, thread_sensitive=False)(transaction_key(signature), response["result"])
+            return response["result"]
+        logger.warning("Konnte Details für Signatur %s nicht abrufen: %s", signature, response, extra={"signature": signature})
+        return None
+
+    async def _post_batch(self, payload: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wie `SolanaAPI._post_batch`. Höchstens `max_concurrency` Batches sind gleichzeitig unterwegs.
+        """
+        method = payload[0]["method"] if payload else "batch"
+
+        try:
+            async with self._semaphore:
+                data = await self._call(method, lambda endpoint: self._post(endpoint, method, payload), cost=len(payload))
+        except (httpx.HTTPError, OSError) as e:
+            logger.warning("Fehler bei der Batch-Anfrage: %s", e)
+            return None
+        except ValueError as e:
+            logger.warning("Ungültige JSON-Antwort auf Batch-Anfrage: %s", e)
+            return None
+
+        if not isinstance(data, list):
+            logger.warning("Unerwartete Antwort auf Batch-Anfrage (Batches evtl. nicht unterstützt): %s", data)
+            return None
+        return data
+
+    async def get_transaction_details_batch(self, signatures: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Wie `SolanaAPI.get_transaction_details_batch`, die Batches laufen aber nebenläufig (`asyncio.gather`),
+        begrenzt über SOLANA_RPC_MAX_CONCURRENCY. Schlägt ein Batch fehl, werden dessen Signaturen ebenfalls
+        nebenläufig einzeln abgerufen.
+
+        :param signatures: Die Liste der Transaktionssignaturen.
+        :return: Ein Dictionary Signatur -> Transaktionsdetails (oder None bei Fehlern).
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        if not signatures:
+            return results
+        cached = await sync_to_async(self.cache.get_many, thread_sensitive=False)([transaction_key(signature) for signature in signatures])
+        for signature in signatures:
+            if transaction_key(signature) in cached:
+                results[signature] = cached[transaction_key(signature)]
+        record_cache("getTransaction", hits=len(results), misses=len(signatures) - len(results))
+        signatures = [signature for signature in signatures if signature not in results]
+        if not signatures:
+            return results
+        if not self._is_available():
+            results.update({signature: None for signature in signatures})
+            return results
+
+        pending = signatures
+        attempt = 0
+        while pending:
+            chunks = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+            batches = await asyncio.gather(*(self._post_batch(_transaction_batch_payload(chunk)) for chunk in chunks))
+            rate_limited: List[str] = []
+            failed: List[str] = []
+            finalized: Dict[str, Dict[str, Any]] = {}
+            for chunk, responses in zip(chunks, batches):
+                if responses is None:
+                    failed.extend(chunk)
+                    continue
+                matched, chunk_finalized, limited = _match_batch_responses(chunk, responses)
+                results.update(matched)
+                finalized.update(chunk_finalized)
+                rate_limited.extend(limited)
+            if finalized:
+                await sync_to_async(self.cache.set_many, thread_sensitive=False)(finalized)
+            if failed and self._is_available():
+                results.update(zip(failed, await asyncio.gather(*(self._fetch_transaction(signature) for signature in failed))))
+            elif failed:
+                # Breaker hat sich während des Abrufs geöffnet: keine Einzelabrufe mehr versuchen.
+                results.update({signature: None for signature in failed})
+
+            if not rate_limited:
+                break
+            if attempt >= max_retries():
+                logger.warning("%d Signatur(en) nach %d Wiederholungen weiterhin durch Rate Limit abgelehnt.", len(rate_limited), attempt)
+                break
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+            pending = rate_limited
+
+        return results
+
 # Beispielhafte Verwendung (kann für Tests auskommentiert werden):
 # if __name__ == "__main__":
 #     # Ersetze dies mit einer echten Solana-Adresse, für die du Transaktionen sehen möchtest
@@ -219,4 +980,38 @@ class SolanaAPI:
 #    'finalized' ist am sichersten, aber langsamer.
 # 9. Timeout: Ein Timeout von 30 Sekunden wurde für den Client hinzugefügt, da manche RPC-Aufrufe länger dauern können.
 #    Dies sollte ggf. weiter angepasst werden.
-print("solana_utils.py wurde erstellt und grundlegende Funktionen implementiert.")
+# 10. Batch-Anfragen: `get_transactions_for_address` bündelt die `getTransaction`-Aufrufe in JSON-RPC-Batches
+#    (Größe über `SOLANA_RPC_BATCH_SIZE` konfigurierbar). Unterstützt ein Provider keine Batches,
+#    wird automatisch auf Einzelabrufe zurückgefallen; `SOLANA_RPC_BATCH_SIZE=1` deaktiviert den Batch-Modus.
+# 11. Gesundheitszustand: Datenaufrufe machen keinen eigenen `getHealth`-Aufruf mehr. Der Zustand pro Endpunkt
+#    (`RPCHealthState`) wird aus den Ergebnissen der Datenaufrufe abgeleitet; nach wiederholten Fehlern öffnet
+#    der Circuit Breaker und Aufrufe schlagen sofort fehl, bis ein Hintergrund-Check wieder Erfolg meldet.
+# 12. Asynchrone Variante: `AsyncSolanaAPI` ruft die Signaturliste für `wallet_transactions_async_view` ab, die unter
+#    ASGI (`solana_steuer_tool/asgi.py`) läuft; die Details lädt der Browser danach gesammelt nach (siehe Punkt 20),
+#    deren Batches nebenläufig abgerufen werden (begrenzt über `SOLANA_RPC_MAX_CONCURRENCY`).
+# 13. Cache: `SolanaAPI` speichert finalisierte Transaktionen dauerhaft und Signaturlisten kurz (`SOLANA_RPC_SIGNATURES_TTL`)
+#    in einem austauschbaren Cache (`SOLANA_RPC_CACHE`: sqlite, django, none; siehe rpc_cache.py).
+# 14. Rate Limiting und Retries (Punkte 1 und 2): Alle Datenaufrufe laufen über einen prozessübergreifenden
+#    Token-Bucket pro Methode (`SOLANA_RPC_RATE_LIMITS`) und werden bei HTTP 429, 5xx und Verbindungsfehlern
+#    mit exponentiellem Backoff wiederholt; Retry-After pausiert den Endpunkt für alle Worker (siehe rate_limit.py).
+# 15. Mehrere Endpunkte (Punkt 6): Mit `SOLANA_RPC_ENDPOINTS` (kommagetrennt) verteilt `SolanaAPI` die Aufrufe nach
+#    gemessener Latenz und Fehlerrate auf alle Endpunkte, überspringt Endpunkte mit offenem Circuit Breaker und
+#    versucht bei Fehlern den nächsten. `SOLANA_RPC_HEDGE=true` sendet langsame Aufrufe zusätzlich an einen
+#    zweiten Endpunkt (siehe rpc_pool.py). `AsyncSolanaAPI` wählt pro Instanz den besten verfügbaren Endpunkt.
+# 16. Hintergrundverarbeitung (Punkt 5): `wallet_transactions_view` ruft keine RPC-Daten mehr selbst ab, sondern stellt
+#    einen `SyncJob` ein, den `manage.py run_sync_worker` abarbeitet (siehe jobs.py; ohne Celery/Redis).
+# 17. Messung: `manage.py benchmark` misst Abruf (gegen einen lokalen Mock-RPC-Server, siehe mock_rpc.py), Import,
+#    Dekodierer und Übersichtsseite und vergleicht das Ergebnis mit früheren Läufen (siehe benchmark.py).
+# 18. Diagnose: Meldungen gehen über `logging` (Logger `wallet_manager.*`, Format über LOG_FORMAT), nicht mehr über print().
+#    Aufrufe, Fehler, Wiederholungen, Cache-Treffer, Bytes und Latenzen pro Methode und Endpunkt werden gezählt und unter
+#    `/metrics` für alle Worker zusammen im Prometheus-Format ausgegeben (siehe metrics.py).
+# 19. Verbindungen (Punkt 9): `SolanaAPI` sendet seine Aufrufe als JSON-RPC über einen prozessweiten `httpx.Client`
+#    (`get_http_client`) mit Keep-Alive und, sofern verfügbar, HTTP/2, statt pro Instanz einen solana-py `Client`
+#    anzulegen. Timeouts und Poolgröße sind über SOLANA_RPC_TIMEOUT, SOLANA_RPC_CONNECT_TIMEOUT, SOLANA_RPC_POOL_SIZE
+#    und SOLANA_RPC_KEEPALIVE_EXPIRY konfigurierbar. `AsyncSolanaAPI` verwendet einen `httpx.AsyncClient` pro Instanz, da
+#    asynchrone Verbindungen an eine Event-Loop gebunden sind.
+# 20. Schnellansicht: Die Übersicht (beim ersten Besuch) und `wallet_transactions_async_view` rendern nur aus
+#    `get_transaction_signatures` (Slot, Blockzeit, Status, Memo); Gebühr und Beschreibung kommen über
+#    `wallet_transaction_details_view` gesammelt per `get_transaction_details_batch`. Erste Anzeige nach einem statt N+1 Aufrufen.
+# 21. Übersicht aller Wallets: `dashboard_view` liest Tageswerte (Anzahl, Gebühren, Netto-Flüsse pro Mint), die der Import
+#    für die betroffenen Tage per SQL-Aggregat fortschreibt (siehe rollups.py), statt Transaktionen und Rohdaten zu durchsuchen.
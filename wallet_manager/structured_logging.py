@@ -0,0 +1,28 @@
+"""
+JSON-Formatierung der Log-Ausgaben (eine Zeile pro Eintrag), z.B. für journald, Loki oder Elasticsearch.
+
+Felder, die per `extra={...}` übergeben werden (z.B. `wallet`, `method`, `endpoint`, `rpc_ms`), erscheinen
+als eigene Schlüssel und lassen sich so filtern und auswerten. Aktiviert über LOG_FORMAT=json (siehe settings.py).
+"""
+import datetime
+import json
+import logging
+
+# Attribute, die jeder LogRecord besitzt und die nicht als Zusatzfelder ausgegeben werden.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
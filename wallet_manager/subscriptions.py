@@ -0,0 +1,260 @@
+"""
+Echtzeit-Import über WebSocket-Subscriptions (logsSubscribe/accountSubscribe) statt Polling.
+
+Für jedes gespeicherte Wallet wird eine `logsSubscribe`-Subscription (mentions) geöffnet, optional zusätzlich
+`accountSubscribe`. Gemeldete Signaturen werden direkt über `sync_notified_signatures` importiert. Nach jedem
+(Wieder-)Verbinden und wenn eine Meldung nicht verarbeitet werden konnte, wird die Lücke ab der neuesten
+gespeicherten Signatur über `sync_new_transactions` geschlossen.
+
+Solange die Subscriptions stehen, gelten die Wallets als abgeglichen (`mark_synced_many`), sodass die
+Weboberfläche keine zusätzlichen Sync-Aufträge einstellt.
+
+Die Verbindung läuft direkt über `websockets`; Anfragen und Meldungen sind die Typen aus `solders`. Die
+Request-IDs vergibt der Subscriber selbst und ordnet die Bestätigungen darüber den Wallets zu.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import websockets
+from django.db import close_old_connections
+from solders.account_decoder import UiAccountEncoding
+from solders.commitment_config import CommitmentLevel
+from solders.errors import SerdeJSONError
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcAccountInfoConfig, RpcTransactionLogsConfig, RpcTransactionLogsFilterMentions
+from solders.rpc.requests import AccountSubscribe, LogsSubscribe
+from solders.rpc.responses import (AccountNotification, LogsNotification, SubscriptionError, SubscriptionResult,
+                                   parse_websocket_message)
+
+from .models import Wallet
+from .page_cache import SYNC_INTERVAL, mark_synced_many
+from .rate_limit import backoff_delay
+from .solana_utils import SolanaAPI
+from .sync import sync_new_transactions, sync_notified_signatures
+
+logger = logging.getLogger(__name__)
+
+# Commitment der Subscriptions. Gemeldete Signaturen werden gespeichert und dienen danach als `until` für
+# getSignaturesForAddress, das mit 'finalized' abfragt; eine erst bestätigte Signatur kennt der Knoten dort
+# noch nicht und würde statt der neuen Transaktionen eine volle Seite älterer Historie liefern.
+SUBSCRIPTION_COMMITMENT = CommitmentLevel.Finalized
+# Abstand (Sekunden), in dem neu hinzugefügte Wallets abonniert werden.
+DEFAULT_RELOAD_INTERVAL = 60.0
+# Wartezeit (Sekunden) nach einer Kontoänderung, bevor ohne passende Log-Meldung ein Abgleich erfolgt.
+DEFAULT_ACCOUNT_GRACE = 5.0
+
+
+def websocket_endpoint(rpc_endpoint: str) -> str:
+    """
+    WebSocket-URL aus SOLANA_WS_ENDPOINT, sonst aus dem RPC-Endpunkt abgeleitet (https -> wss, http -> ws).
+    """
+    configured = os.getenv("SOLANA_WS_ENDPOINT")
+    if configured:
+        return configured
+    if rpc_endpoint.startswith("https://"):
+        return "wss://" + rpc_endpoint[len("https://"):]
+    if rpc_endpoint.startswith("http://"):
+        return "ws://" + rpc_endpoint[len("http://"):]
+    return rpc_endpoint
+
+
+class WalletSubscriber:
+    """
+    Hält die Subscriptions aller Wallets offen und importiert gemeldete Transaktionen.
+
+    :param ws_endpoint: Die WebSocket-URL des RPC-Providers.
+    :param sol_api: Für Detailabrufe und Lückenfüllung.
+    :param concurrency: Anzahl gleichzeitig verarbeiteter Wallets.
+    :param account_updates: Zusätzlich `accountSubscribe` für jedes Wallet öffnen.
+    """
+    def __init__(self, ws_endpoint: str, sol_api: SolanaAPI, concurrency: int = 4, account_updates: bool = True,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL, account_grace: float = DEFAULT_ACCOUNT_GRACE):
+        self.ws_endpoint = ws_endpoint
+        self.sol_api = sol_api
+        self.concurrency = max(1, concurrency)
+        self.account_updates = account_updates
+        self.reload_interval = reload_interval
+        self.account_grace = account_grace
+
+        # Zustand der aktuellen Verbindung.
+        self.requests: Dict[int, Tuple[int, str]] = {} # Request-ID -> (Wallet-ID, "logs"/"account")
+        self.subscriptions: Dict[int, Tuple[int, str]] = {} # Subscription-ID -> (Wallet-ID, "logs"/"account")
+        self.subscribed: Dict[int, str] = {} # Wallet-ID -> Adresse
+        self.live: Set[int] = set() # Wallets mit bestätigter logsSubscribe-Subscription
+        self.request_ids = itertools.count(1)
+
+        # Arbeitsstand pro Wallet, verbindungsübergreifend.
+        self.pending: Dict[int, Set[str]] = {}
+        self.gaps: Set[int] = set()
+        self.scheduled: Set[int] = set()
+        self.log_slots: Dict[int, int] = {}
+        self.locks: Dict[int, asyncio.Lock] = {}
+        self.queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self.stats = {"notifications": 0, "inserted": 0, "gap_syncs": 0, "reconnects": 0}
+
+    def _schedule(self, wallet_id: int) -> None:
+        if wallet_id not in self.scheduled:
+            self.scheduled.add(wallet_id)
+            self.queue.put_nowait(wallet_id)
+
+    def _process(self, wallet_id: int, signatures: Set[str], gap: bool) -> Tuple[int, bool]:
+        """
+        Importiert die gemeldeten Signaturen bzw. schließt die Lücke (synchron, in einem Thread).
+
+        :return: Tupel (Anzahl neu gespeicherter Transaktionen, ob die Lücke abgeglichen wurde). Die Zähler in
+                 `stats` schreibt nur die Event-Loop fort.
+        """
+        close_old_connections()
+        wallet = Wallet.objects.filter(pk=wallet_id).first()
+        if wallet is None:
+            return 0, False
+        if not gap:
+            inserted = sync_notified_signatures(wallet, self.sol_api, sorted(signatures))
+            if inserted is not None:
+                return inserted, False
+            logger.info("Details gemeldeter Transaktionen für %s fehlen; gleiche ab der neuesten gespeicherten Signatur ab.",
+                        wallet.address, extra={"wallet": wallet.address})
+        return sync_new_transactions(wallet, self.sol_api), True
+
+    async def _worker(self) -> None:
+        while True:
+            wallet_id = await self.queue.get()
+            self.scheduled.discard(wallet_id)
+            signatures = self.pending.pop(wallet_id, set())
+            gap = wallet_id in self.gaps
+            self.gaps.discard(wallet_id)
+            if not signatures and not gap:
+                continue
+            async with self.locks.setdefault(wallet_id, asyncio.Lock()):
+                try:
+                    inserted, gap_synced = await asyncio.to_thread(self._process, wallet_id, signatures, gap)
+                    self.stats["inserted"] += inserted
+                    self.stats["gap_syncs"] += int(gap_synced)
+                except Exception as e:
+                    logger.exception("Fehler beim Import für Wallet %s: %s", wallet_id, e)
+                    self.gaps.add(wallet_id)
+                    asyncio.get_running_loop().call_later(backoff_delay(1), self._schedule, wallet_id)
+
+    def _load_wallets(self) -> Dict[int, str]:
+        close_old_connections()
+        return dict(Wallet.objects.values_list("id", "address"))
+
+    async def _subscribe(self, ws, wallets: Dict[int, str]) -> None:
+        for wallet_id, address in wallets.items():
+            if wallet_id in self.subscribed:
+                continue
+            try:
+                pubkey = Pubkey.from_string(address)
+            except ValueError as e:
+                logger.warning("Ungültige Adresse %s, wird nicht abonniert: %s", address, e, extra={"wallet": address})
+                continue
+            request_id = next(self.request_ids)
+            self.requests[request_id] = (wallet_id, "logs")
+            await ws.send(LogsSubscribe(RpcTransactionLogsFilterMentions(pubkey),
+                                        RpcTransactionLogsConfig(SUBSCRIPTION_COMMITMENT), request_id).to_json())
+            if self.account_updates:
+                request_id = next(self.request_ids)
+                self.requests[request_id] = (wallet_id, "account")
+                config = RpcAccountInfoConfig(encoding=UiAccountEncoding.Base64, commitment=SUBSCRIPTION_COMMITMENT)
+                await ws.send(AccountSubscribe(pubkey, config, request_id).to_json())
+            self.subscribed[wallet_id] = address
+
+    def _check_account_change(self, wallet_id: int, slot: int) -> None:
+        # Kontoänderung ohne Log-Meldung aus demselben oder einem späteren Slot: Meldung verpasst.
+        if self.log_slots.get(wallet_id, 0) < slot:
+            self.gaps.add(wallet_id)
+            self._schedule(wallet_id)
+
+    def _handle(self, message) -> None:
+        if isinstance(message, SubscriptionResult):
+            wallet_id, kind = self.requests.pop(message.id, (None, None))
+            if wallet_id is None:
+                return
+            self.subscriptions[message.result] = (wallet_id, kind)
+            if kind == "logs":
+                # Erst ab der Bestätigung wird nichts mehr verpasst; alles davor holt der Abgleich.
+                self.live.add(wallet_id)
+                self.gaps.add(wallet_id)
+                self._schedule(wallet_id)
+        elif isinstance(message, SubscriptionError):
+            wallet_id, kind = self.requests.pop(message.id, (None, None))
+            logger.warning("Subscription (%s) für Wallet %s abgelehnt: %s", kind, wallet_id, message.error)
+        elif isinstance(message, LogsNotification):
+            wallet_id, _ = self.subscriptions.get(message.subscription, (None, None))
+            if wallet_id is None:
+                return
+            self.stats["notifications"] += 1
+            self.log_slots[wallet_id] = max(self.log_slots.get(wallet_id, 0), message.result.context.slot)
+            self.pending.setdefault(wallet_id, set()).add(str(message.result.value.signature))
+            self._schedule(wallet_id)
+        elif isinstance(message, AccountNotification):
+            wallet_id, _ = self.subscriptions.get(message.subscription, (None, None))
+            if wallet_id is not None:
+                asyncio.get_running_loop().call_later(self.account_grace, self._check_account_change,
+                                                      wallet_id, message.result.context.slot)
+
+    async def _session(self, ws, stop: asyncio.Event) -> None:
+        self.requests.clear()
+        self.subscriptions.clear()
+        self.subscribed.clear()
+        self.live.clear()
+        await self._subscribe(ws, await asyncio.to_thread(self._load_wallets))
+        logger.info("%d Wallets über %s abonniert.", len(self.subscribed), self.ws_endpoint)
+
+        reload_at = time.monotonic() + self.reload_interval
+        heartbeat_at = 0.0
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                raw = None
+            try:
+                messages = parse_websocket_message(raw) if raw is not None else []
+            except SerdeJSONError as e:
+                logger.warning("Unbekannte WebSocket-Nachricht verworfen: %s", e)
+                messages = []
+            for message in messages:
+                self._handle(message)
+
+            now = time.monotonic()
+            if now >= reload_at:
+                await self._subscribe(ws, await asyncio.to_thread(self._load_wallets))
+                reload_at = now + self.reload_interval
+            if self.live and now >= heartbeat_at:
+                await asyncio.to_thread(mark_synced_many, list(self.live))
+                heartbeat_at = now + SYNC_INTERVAL / 2
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Läuft bis `stop` gesetzt wird. Verbindungsabbrüche werden mit Backoff wiederholt; danach werden
+        alle Wallets erneut abonniert und Lücken geschlossen.
+        """
+        stop = stop or asyncio.Event()
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        attempt = 0
+        try:
+            while not stop.is_set():
+                try:
+                    async with websockets.connect(self.ws_endpoint, ping_interval=20, ping_timeout=20,
+                                                  max_size=None) as ws:
+                        attempt = 0
+                        await self._session(ws, stop)
+                except (websockets.WebSocketException, OSError, asyncio.TimeoutError) as e:
+                    logger.warning("WebSocket-Verbindung zu %s unterbrochen: %s", self.ws_endpoint, e)
+                if stop.is_set():
+                    break
+                self.stats["reconnects"] += 1
+                delay = backoff_delay(attempt)
+                attempt += 1
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
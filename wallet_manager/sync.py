@@ -0,0 +1,165 @@
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .ingest import ingest_transactions, link_existing_transactions, stored_signatures
+from .models import Wallet, WalletTransaction
+from .solana_utils import SolanaAPI
+
+logger = logging.getLogger(__name__)
+
+# Maximale Seitengröße von getSignaturesForAddress (vom RPC-Protokoll vorgegeben).
+SIGNATURE_PAGE_SIZE = 1000
+
+
+class SignaturesUnavailable(ConnectionError):
+    """
+    Eine Seite von getSignaturesForAddress konnte nicht abgerufen werden. Der Abgleich wird dann ohne Import
+    abgebrochen (und als Sync-Auftrag später wiederholt), da eine unvollständige Liste eine Lücke hinterließe.
+    """
+
+
+def _signatures_page(sol_api: SolanaAPI, address: str, limit: int, before_signature: Optional[str] = None,
+                     until_signature: Optional[str] = None) -> List[Dict[str, Any]]:
+    page = sol_api.get_signatures_page(address, limit, before_signature, until_signature)
+    if page is None:
+        raise SignaturesUnavailable(f"Signaturen von {address} konnten nicht vollständig abgerufen werden.")
+    return page
+
+
+def fetch_new_signatures(sol_api: SolanaAPI, address: str, until_signature: str) -> List[Dict[str, Any]]:
+    """
+    Ruft alle Signaturen ab, die neuer als `until_signature` sind (neueste zuerst).
+    Bei mehr als SIGNATURE_PAGE_SIZE neuen Signaturen wird über `before_signature` weitergeblättert.
+
+    :raises SignaturesUnavailable: wenn eine Seite nicht abgerufen werden konnte.
+    """
+    sig_infos: List[Dict[str, Any]] = []
+    before_signature = None
+    while True:
+        page = _signatures_page(sol_api, address, SIGNATURE_PAGE_SIZE, before_signature, until_signature)
+        sig_infos.extend(page)
+        if len(page) < SIGNATURE_PAGE_SIZE or page[-1].get("signature") == before_signature:
+            return sig_infos
+        before_signature = page[-1].get("signature")
+
+
+def _fetch_details(sol_api: SolanaAPI,
+                   sig_infos: List[Dict[str, Any]]) -> Tuple[Set[str], Dict[str, Optional[Dict[str, Any]]], List[int]]:
+    """
+    Ruft die Details der noch nicht gespeicherten Transaktionen gesammelt ab. Es wird noch nichts geschrieben.
+
+    :return: Tupel (bereits gespeicherte Signaturen, Signatur -> Details, Indizes in `sig_infos` ohne Details).
+    """
+    signatures = [sig_info["signature"] for sig_info in sig_infos]
+    # Bereits (z.B. über ein anderes Wallet) gespeicherte Transaktionen werden nur verknüpft, nicht erneut abgerufen.
+    known_signatures = stored_signatures(signatures)
+    details_by_signature = sol_api.get_transaction_details_batch(
+        [signature for signature in signatures if signature not in known_signatures])
+    failed_indexes = [index for index, signature in enumerate(signatures)
+                      if signature not in known_signatures and not details_by_signature.get(signature)]
+    return known_signatures, details_by_signature, failed_indexes
+
+
+def _store(wallet: Wallet, sig_infos: List[Dict[str, Any]], known_signatures: Set[str],
+           details_by_signature: Dict[str, Optional[Dict[str, Any]]]) -> int:
+    """
+    Verknüpft die bereits gespeicherten und speichert die übrigen Transaktionen aus `sig_infos`.
+
+    Darf erst nach dem Abschneiden an fehlgeschlagenen Signaturen aufgerufen werden: Eine verknüpfte
+    Transaktion jenseits der Fehlerstelle würde die fehlgeschlagene beim nächsten Abruf sonst verdecken.
+
+    :return: Die Anzahl der neu gespeicherten Transaktionen.
+    """
+    link_existing_transactions(wallet, [sig_info["signature"] for sig_info in sig_infos
+                                        if sig_info["signature"] in known_signatures])
+    result = ingest_transactions(
+        wallet,
+        (details_by_signature[sig_info["signature"]] for sig_info in sig_infos
+         if sig_info["signature"] not in known_signatures),
+        {sig_info["signature"]: sig_info for sig_info in sig_infos},
+    )
+    return result.inserted
+
+
+def sync_new_transactions(wallet: Wallet, sol_api: SolanaAPI, initial_limit: int = 10) -> int:
+    """
+    Speichert alle Transaktionen des Wallets, die seit dem letzten Abruf hinzugekommen sind.
+
+    Ist noch keine Transaktion gespeichert, werden nur die neuesten `initial_limit` Transaktionen
+    geladen; die ältere Historie wird über einen Backfill nachgeladen. Sonst wird getSignaturesForAddress
+    mit `until=<neueste gespeicherte Signatur>` aufgerufen, sodass bei einem wiederholten Aufruf ohne neue
+    Transaktionen nur ein einziger RPC-Aufruf anfällt.
+
+    :return: Die Anzahl der neu gespeicherten Transaktionen.
+    :raises SignaturesUnavailable: wenn die Signaturliste nicht (vollständig) abgerufen werden konnte.
+    """
+    newest_signature = (WalletTransaction.objects.filter(wallet=wallet).order_by("-block_time", "-id")
+                        .values_list("transaction__signature", flat=True).first())
+    if newest_signature:
+        sig_infos = fetch_new_signatures(sol_api, wallet.address, newest_signature)
+    else:
+        sig_infos = _signatures_page(sol_api, wallet.address, initial_limit)
+
+    sig_infos = [sig_info for sig_info in sig_infos if sig_info.get("signature")]
+    if not sig_infos:
+        return 0
+
+    known_signatures, details_by_signature, failed_indexes = _fetch_details(sol_api, sig_infos)
+    # Nur ab der ältesten fehlgeschlagenen Signatur (exklusiv) speichern. Würden neuere Transaktionen
+    # trotzdem gespeichert, läge die fehlgeschlagene vor der neuesten gespeicherten Signatur und würde
+    # beim nächsten Aufruf (`until=...`) nie wieder abgerufen.
+    if failed_indexes:
+        logger.warning("Konnte Details für %d Signatur(en) von %s nicht abrufen; "
+                       "neuere Transaktionen werden beim nächsten Abruf erneut versucht.", len(failed_indexes), wallet.address,
+                       extra={"wallet": wallet.address})
+        sig_infos = sig_infos[max(failed_indexes) + 1:]
+    return _store(wallet, sig_infos, known_signatures, details_by_signature)
+
+
+def sync_older_transactions(wallet: Wallet, sol_api: SolanaAPI, limit: int) -> int:
+    """
+    Speichert bis zu `limit` Transaktionen, die älter als die älteste gespeicherte Transaktion des Wallets sind.
+
+    Wird beim Blättern verwendet, wenn die angeforderte Seite noch nicht (vollständig) gespeichert ist.
+    getSignaturesForAddress wird dazu mit `before=<älteste gespeicherte Signatur>` aufgerufen.
+
+    :return: Die Anzahl der neu verknüpften oder gespeicherten Transaktionen.
+    :raises SignaturesUnavailable: wenn die Signaturliste nicht abgerufen werden konnte.
+    """
+    oldest_signature = (WalletTransaction.objects.filter(wallet=wallet).order_by("block_time", "id")
+                        .values_list("transaction__signature", flat=True).first())
+    if not oldest_signature:
+        return 0
+    sig_infos = _signatures_page(sol_api, wallet.address, limit, before_signature=oldest_signature)
+    sig_infos = [sig_info for sig_info in sig_infos if sig_info.get("signature")]
+    if not sig_infos:
+        return 0
+
+    known_signatures, details_by_signature, failed_indexes = _fetch_details(sol_api, sig_infos)
+    # Nur bis zur neuesten fehlgeschlagenen Signatur (exklusiv) speichern, damit die gespeicherte
+    # Historie lückenlos bleibt und der nächste Aufruf an der fehlgeschlagenen Signatur fortsetzt.
+    if failed_indexes:
+        logger.warning("Konnte Details für %d ältere Signatur(en) von %s nicht abrufen.", len(failed_indexes), wallet.address,
+                       extra={"wallet": wallet.address})
+        sig_infos = sig_infos[:min(failed_indexes)]
+    inserted = _store(wallet, sig_infos, known_signatures, details_by_signature)
+    return inserted + sum(1 for sig_info in sig_infos if sig_info["signature"] in known_signatures)
+
+
+def sync_notified_signatures(wallet: Wallet, sol_api: SolanaAPI, signatures: List[str]) -> Optional[int]:
+    """
+    Speichert gemeldete neue Signaturen direkt, ohne getSignaturesForAddress (z.B. aus einer WebSocket-Subscription).
+
+    Das ist nur lückenlos, solange seit dem letzten Abgleich keine Meldung verloren ging. Fehlen die Details
+    einer Signatur, wird nichts gespeichert: Eine neuere gespeicherte Transaktion würde die fehlende sonst
+    beim nächsten `sync_new_transactions` (`until=...`) verdecken.
+
+    :return: Die Anzahl der neu gespeicherten Transaktionen oder None, wenn stattdessen `sync_new_transactions` nötig ist.
+    """
+    if not signatures:
+        return 0
+    sig_infos = [{"signature": signature} for signature in signatures]
+    known_signatures, details_by_signature, failed_indexes = _fetch_details(sol_api, sig_infos)
+    if failed_indexes:
+        return None
+    return _store(wallet, sig_infos, known_signatures, details_by_signature)
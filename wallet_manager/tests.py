@@ -1,3 +1,489 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import os
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from .benchmark import benchmark_sync
+from .cost_basis import PRICE_MISSING_FIELD, CostBasisEngine, holding_period_end
+from .decoder import (ASSOCIATED_TOKEN_PROGRAM_ID, STAKE_PROGRAM_ID, SYSTEM_PROGRAM_ID, TOKEN_PROGRAM_ID, ProgramCall,
+                      SolTransfer, StakeAction, Swap, TokenTransfer, decode_transaction, describe_events)
+from .ingest import ingest_transactions
+from .middleware import RequestMetricsMiddleware
+from .mock_rpc import MockRPCServer, MockWebSocketServer, synthetic_fixtures
+from .models import SyncJob, Wallet, WalletTransaction
+from .queries import iter_keyset
+from .rollups import refresh_daily_rollups
+from .rpc_cache import RPCCache
+from .solana_utils import AsyncSolanaAPI, SolanaAPI, get_health_state
+from .subscriptions import WalletSubscriber
+from .sync import SignaturesUnavailable, sync_new_transactions, sync_notified_signatures, sync_older_transactions
+from .views import PAGE_KEY, _page_links
+
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Der prozessweite RPC-Cache (Standard: SQLite-Datei) überdauert Testläufe; Views sollen den Mock-Server sehen.
+NO_RPC_CACHE = mock.patch("wallet_manager.rpc_cache._rpc_cache", RPCCache())
+
+
+def _signatures(fixtures):
+    return [sig_info["signature"] for sig_info in fixtures.signatures]
+
+
+def _linked(wallet):
+    return set(WalletTransaction.objects.filter(wallet=wallet).values_list("transaction__signature", flat=True))
+
+
+class TransactionDetailsBatchTests(TestCase):
+    """
+    JSON-RPC-Batches gegen `MockRPCServer`: Zuordnung der Antworten über die ID, nicht über die Reihenfolge.
+    """
+    def test_shuffled_responses_are_matched_by_id(self):
+        fixtures = synthetic_fixtures(10, seed=1)
+        signatures = _signatures(fixtures)
+        with MockRPCServer(fixtures, shuffle_batches=True) as rpc:
+            results = SolanaAPI(rpc_endpoint=rpc.url, batch_size=4, cache=RPCCache()).get_transaction_details_batch(signatures)
+        self.assertEqual(set(results), set(signatures))
+        for signature, tx_detail in results.items():
+            self.assertEqual(tx_detail["transaction"]["signatures"][0], signature)
+        self.assertEqual(rpc.stats["batches"], 3)
+        self.assertEqual(rpc.stats["calls.getTransaction"], 10)
+
+    def test_failed_entries_only_affect_their_signature(self):
+        fixtures = synthetic_fixtures(6, seed=2)
+        signatures = _signatures(fixtures)
+        del fixtures.transactions[signatures[2]]
+        with MockRPCServer(fixtures, shuffle_batches=True) as rpc:
+            results = SolanaAPI(rpc_endpoint=rpc.url, batch_size=6, cache=RPCCache()).get_transaction_details_batch(signatures)
+        self.assertIsNone(results[signatures[2]])
+        self.assertEqual([signature for signature in signatures if results[signature]],
+                         signatures[:2] + signatures[3:])
+
+    async def test_async_batches_run_concurrently(self):
+        fixtures = synthetic_fixtures(8, seed=13)
+        signatures = _signatures(fixtures)
+        with MockRPCServer(fixtures, latency=0.3, shuffle_batches=True) as rpc:
+            started_at = time.perf_counter()
+            async with AsyncSolanaAPI(rpc_endpoint=rpc.url, cache=RPCCache(), batch_size=2, max_concurrency=4) as sol_api:
+                results = await sol_api.get_transaction_details_batch(signatures)
+            elapsed = time.perf_counter() - started_at
+        self.assertEqual({signature: tx_detail["transaction"]["signatures"][0] for signature, tx_detail in results.items()},
+                         {signature: signature for signature in signatures})
+        self.assertEqual(rpc.stats["batches"], 4)
+        # Nacheinander wären es mindestens 4 * 0,3 s.
+        self.assertLess(elapsed, 0.9)
+
+
+class FailoverTests(TestCase):
+    """
+    Defekte Endpunkte werden nicht wiederholt, sondern zählen sofort für den Circuit Breaker (Failover im Pool).
+    """
+    def test_server_error_fails_over_without_retry(self):
+        fixtures = synthetic_fixtures(3, seed=12)
+        with MockRPCServer(fixtures, server_error_rate=1.0) as broken, MockRPCServer(fixtures) as rpc, \
+                mock.patch.dict(os.environ, {"SOLANA_RPC_ENDPOINTS": f"{broken.url},{rpc.url}"}), \
+                mock.patch("wallet_manager.rate_limit.record_rpc_retry") as retry:
+            page = SolanaAPI(cache=RPCCache()).get_signatures_page(fixtures.address, limit=10)
+        self.assertEqual(page, fixtures.signatures)
+        self.assertEqual(broken.stats["server_errors"], 1)
+        retry.assert_not_called()
+        self.assertEqual(get_health_state(broken.url).consecutive_failures, 1)
+
+    async def test_async_server_error_fails_over_without_retry(self):
+        fixtures = synthetic_fixtures(3, seed=14)
+        with MockRPCServer(fixtures, server_error_rate=1.0) as broken, MockRPCServer(fixtures) as rpc, \
+                mock.patch.dict(os.environ, {"SOLANA_RPC_ENDPOINTS": f"{broken.url},{rpc.url}"}), \
+                mock.patch("wallet_manager.rate_limit.record_rpc_retry") as retry:
+            async with AsyncSolanaAPI(cache=RPCCache()) as sol_api:
+                signatures = await sol_api.get_transaction_signatures(fixtures.address, limit=10)
+        self.assertEqual(signatures, fixtures.signatures)
+        self.assertEqual(broken.stats["server_errors"], 1)
+        retry.assert_not_called()
+        self.assertEqual(get_health_state(broken.url).consecutive_failures, 1)
+
+
+class IngestTests(TestCase):
+    """
+    Zählung eingefügter und übersprungener Transaktionen in `ingest_transactions`.
+    """
+    def test_counts_inserted_and_skipped(self):
+        fixtures = synthetic_fixtures(5, seed=4)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        details = fixtures.details()
+        with mock.patch("wallet_manager.ingest.refresh_daily_rollups", wraps=refresh_daily_rollups) as refresh:
+            result = ingest_transactions(wallet, details + [None, details[0]], chunk_size=2)
+        self.assertEqual((result.inserted, result.skipped), (5, 2))
+        self.assertEqual(_linked(wallet), set(_signatures(fixtures)))
+        # Tageswerte einmal pro Aufruf, nicht pro Block.
+        refresh.assert_called_once()
+
+        result = ingest_transactions(wallet, details)
+        self.assertEqual((result.inserted, result.skipped), (0, 5))
+
+    def test_existing_transactions_are_linked_to_another_wallet(self):
+        fixtures = synthetic_fixtures(3, seed=5)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        other = Wallet.objects.create(address="Other1111111111111111111111111111111111111")
+        ingest_transactions(wallet, fixtures.details())
+        result = ingest_transactions(other, fixtures.details())
+        self.assertEqual((result.inserted, result.skipped), (0, 3))
+        self.assertEqual(_linked(other), set(_signatures(fixtures)))
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Blättern nach (block_time, id) an Seitengrenzen, auch bei gleichen block_time-Werten.
+    """
+    def setUp(self):
+        fixtures = synthetic_fixtures(7, seed=6)
+        self.wallet = Wallet.objects.create(address=fixtures.address)
+        ingest_transactions(self.wallet, fixtures.details())
+        links = WalletTransaction.objects.filter(wallet=self.wallet)
+        # Vier Einträge mit derselben block_time, damit Seiten mitten in einer Gruppe enden.
+        tied_ids = list(links.order_by("id").values_list("id", flat=True)[:4])
+        links.filter(id__in=tied_ids).update(block_time=1_800_000_000)
+        self.newest_first = list(links.order_by("-block_time", "-id").values_list("id", flat=True))
+
+    def _cursor(self, link):
+        return link.block_time, link.transaction.signature
+
+    def test_pages_cover_all_links_once(self):
+        for page_size in (1, 2, 3, 7, 8):
+            with self.subTest(page_size=page_size):
+                seen, before, has_more = [], None, True
+                while has_more:
+                    page, has_more = _page_links(self.wallet, before, None, page_size)
+                    seen.extend(link.id for link in page)
+                    if page:
+                        before = self._cursor(page[-1])
+                self.assertEqual(seen, self.newest_first)
+
+    def test_after_returns_the_previous_page(self):
+        first, _ = _page_links(self.wallet, None, None, 3)
+        second, _ = _page_links(self.wallet, self._cursor(first[-1]), None, 3)
+        previous, has_more = _page_links(self.wallet, None, self._cursor(second[0]), 3)
+        self.assertEqual([link.id for link in previous], [link.id for link in first])
+        self.assertFalse(has_more)
+
+    def test_iter_keyset_chunk_boundaries(self):
+        rows = WalletTransaction.objects.filter(wallet=self.wallet).values_list(*PAGE_KEY)
+        expected = list(rows.order_by(*PAGE_KEY))
+        for chunk_size in (1, 2, 4, 7, 100):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_keyset(rows, PAGE_KEY, chunk_size)), expected)
+
+
+class DecoderTests(TestCase):
+    """
+    Ereignisse aus äußeren und inneren Instruktionen.
+    """
+    WALLET = "Wa11et1111111111111111111111111111111111111"
+    OTHER = "0ther11111111111111111111111111111111111111"
+    TOKEN_ACCOUNT = "TokenAccount111111111111111111111111111111"
+    OTHER_TOKEN_ACCOUNT = "OtherTokenAccount1111111111111111111111111"
+    MINT = "Mint111111111111111111111111111111111111111"
+    JUPITER = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4"
+
+    def _tx(self, instructions, inner_instructions=()):
+        balances = [{"accountIndex": 1, "mint": self.MINT, "owner": self.WALLET,
+                     "uiTokenAmount": {"amount": "5000000", "decimals": 6}}]
+        return {
+            "meta": {"err": None, "fee": 5000, "innerInstructions": list(inner_instructions),
+                     "preTokenBalances": balances, "postTokenBalances": balances},
+            "transaction": {"signatures": ["sig"], "message": {
+                "accountKeys": [{"pubkey": self.WALLET}, {"pubkey": self.TOKEN_ACCOUNT}, {"pubkey": self.OTHER}],
+                "instructions": list(instructions),
+            }},
+        }
+
+    def _sol_transfer(self, lamports):
+        return {"programId": SYSTEM_PROGRAM_ID, "parsed": {"type": "transfer", "info": {
+            "source": self.WALLET, "destination": self.OTHER, "lamports": lamports}}}
+
+    def test_swap_with_inner_token_transfer(self):
+        token_transfer = {"programId": TOKEN_PROGRAM_ID, "parsed": {"type": "transfer", "info": {
+            "source": self.TOKEN_ACCOUNT, "destination": self.OTHER_TOKEN_ACCOUNT, "authority": self.WALLET,
+            "amount": "1500000"}}}
+        tx = self._tx([{"programId": ASSOCIATED_TOKEN_PROGRAM_ID, "parsed": {"type": "create", "info": {}}},
+                       {"programId": self.JUPITER, "data": "3Bxs"}],
+                      [{"index": 1, "instructions": [token_transfer, self._sol_transfer(10)]}])
+        events = decode_transaction(tx)
+        self.assertEqual([type(event) for event in events], [ProgramCall, Swap, TokenTransfer, SolTransfer])
+        self.assertEqual([(event.instruction_index, event.inner_index) for event in events],
+                         [(0, None), (1, None), (1, 0), (1, 1)])
+        transfer = events[2]
+        # `transfer` nennt keinen Mint; er stammt aus den Token-Salden des Quellkontos.
+        self.assertEqual((transfer.mint, transfer.decimals, transfer.ui_amount), (self.MINT, 6, "1.5"))
+        self.assertEqual(describe_events(events), "Swap über Jupiter")
+
+    def test_stake_takes_precedence_over_transfers(self):
+        stake = {"programId": STAKE_PROGRAM_ID, "parsed": {"type": "delegate", "info": {"stakeAccount": self.OTHER}}}
+        events = decode_transaction(self._tx([self._sol_transfer(2_000_000_000), stake]))
+        self.assertIsInstance(events[1], StakeAction)
+        self.assertEqual((events[1].action, events[1].stake_account, events[1].lamports), ("delegate", self.OTHER, None))
+        self.assertEqual(describe_events(events), "Staking: delegate")
+        self.assertEqual(events[0].lamports, 2_000_000_000)
+
+
+class CostBasisTests(TestCase):
+    """
+    FIFO-Verbrauch, Haltefrist in deutscher Ortszeit und fehlende Preise.
+    """
+    MINT = "Mint111111111111111111111111111111111111111"
+
+    @staticmethod
+    def _berlin(*args) -> int:
+        # Winterzeit (MEZ); alle Zeitpunkte der Tests liegen außerhalb der Sommerzeit.
+        return int(datetime.datetime(*args, tzinfo=datetime.timezone(datetime.timedelta(hours=1))).timestamp())
+
+    @staticmethod
+    def _engine(prices):
+        return CostBasisEngine(lambda keys: {key: prices.get(key) for key in keys})
+
+    def test_holding_period_ends_at_end_of_anniversary_day(self):
+        # 15.01.2023 00:30 Berlin ist noch der 14.01. in UTC.
+        acquired = self._berlin(2023, 1, 15, 0, 30)
+        self.assertEqual(holding_period_end(acquired), self._berlin(2024, 1, 15, 23, 59, 59))
+        self.assertEqual(holding_period_end(self._berlin(2024, 2, 29, 12)), self._berlin(2025, 2, 28, 23, 59, 59))
+
+    def test_fifo_consumes_oldest_lots_first(self):
+        buy_1, buy_2 = self._berlin(2023, 1, 10), self._berlin(2023, 12, 1)
+        sell = holding_period_end(buy_1) + 1
+        engine = self._engine({(self.MINT, buy_1): Decimal(10), (self.MINT, buy_2): Decimal(20),
+                               (self.MINT, sell): Decimal(30)})
+        engine.process_chunk([(1, buy_1, self.MINT, Decimal(100), 2), (2, buy_2, self.MINT, Decimal(100), 2),
+                              (3, sell, self.MINT, Decimal(-150), 2)])
+        disposal, = engine.disposals
+        self.assertEqual(disposal.cost_basis, Decimal(20))
+        self.assertEqual(disposal.proceeds, Decimal(45))
+        # Das erste Lot ist seit über einem Jahr gehalten, das anteilige zweite nicht.
+        self.assertEqual(disposal.tax_free_gain, Decimal(20))
+        self.assertEqual(disposal.taxable_gain, Decimal(5))
+        self.assertEqual(engine.lots[self.MINT].balance(), 50)
+
+    def test_disposal_on_last_day_is_taxable(self):
+        buy = self._berlin(2023, 3, 1, 9)
+        sell = holding_period_end(buy)
+        engine = self._engine({(self.MINT, buy): Decimal(1), (self.MINT, sell): Decimal(3)})
+        engine.process_chunk([(1, buy, self.MINT, Decimal(1), 0), (2, sell, self.MINT, Decimal(-1), 0)])
+        self.assertEqual(engine.disposals[0].taxable_gain, Decimal(2))
+        self.assertEqual(engine.disposals[0].tax_free_gain, Decimal(0))
+
+    def test_missing_price_is_counted_not_summed(self):
+        buy, sell = self._berlin(2023, 3, 1), self._berlin(2023, 3, 20)
+        engine = self._engine({(self.MINT, sell): Decimal(3)})
+        engine.process_chunk([(1, buy, self.MINT, Decimal(1), 0), (2, sell, self.MINT, Decimal(-1), 0)])
+        self.assertTrue(engine.disposals[0].price_missing)
+        totals = engine.yearly[2023]
+        self.assertEqual(totals[PRICE_MISSING_FIELD], 1)
+        self.assertEqual(totals["proceeds"], Decimal(0))
+
+
+@override_settings(CACHES=TEST_CACHES)
+@NO_RPC_CACHE
+class ConditionalGetTests(TestCase):
+    """
+    ETag und 304 der Transaktionsübersicht; neue Transaktionen ändern den ETag.
+    """
+    def test_not_modified_until_new_transaction(self):
+        fixtures = synthetic_fixtures(4, seed=7)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        details = fixtures.details()
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_transactions(wallet, details[1:])
+        url = reverse("wallet_manager:wallet_transactions", args=[wallet.address])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_transactions(wallet, details[:1])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, details[0]["transaction"]["signatures"][0][:20])
+
+    def test_only_etag_while_sync_job_is_pending(self):
+        fixtures = synthetic_fixtures(2, seed=15)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        ingest_transactions(wallet, fixtures.details())
+        SyncJob.objects.create(wallet=wallet, kind=SyncJob.KIND_NEW)
+        url = reverse("wallet_manager:wallet_transactions", args=[wallet.address])
+
+        with mock.patch("wallet_manager.views.sync_due", return_value=False):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertContains(response, "im Hintergrund abgerufen")
+
+    def test_details_only_for_signatures_of_the_wallet(self):
+        fixtures = synthetic_fixtures(5, seed=10)
+        foreign = synthetic_fixtures(1, seed=11)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        other = Wallet.objects.create(address=foreign.address)
+        signatures = _signatures(fixtures)
+        ingest_transactions(wallet, [fixtures.transactions[signatures[4]]])
+        ingest_transactions(other, foreign.details())
+        url = reverse("wallet_manager:wallet_transaction_details", args=[wallet.address])
+        requested = [signatures[0], signatures[4], _signatures(foreign)[0], "unbekannt"]
+
+        with MockRPCServer(fixtures) as rpc, mock.patch.dict(os.environ, {"SOLANA_RPC_ENDPOINTS": rpc.url}):
+            details = self.client.get(url, {"signatures": ",".join(requested)}).json()["transactions"]
+            self.assertEqual(list(details), requested)
+            self.assertIsNotNone(details[signatures[0]])
+            self.assertIsNotNone(details[signatures[4]])
+            self.assertIsNone(details[requested[2]])
+            self.assertIsNone(details["unbekannt"])
+            # Nur die nicht gespeicherte Signatur der Signaturliste wird abgerufen.
+            self.assertEqual(rpc.stats["calls.getTransaction"], 1)
+
+            details = self.client.get(url, {"signatures": ",".join(requested), "limit": 2}).json()["transactions"]
+            self.assertEqual(list(details), requested[:2])
+        bad = self.client.get(reverse("wallet_manager:wallet_transaction_details", args=["keine-adresse"]),
+                              {"signatures": signatures[0]})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_invalid_address_is_rejected(self):
+        response = self.client.get(reverse("wallet_manager:wallet_transactions", args=["keine-adresse"]))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Wallet.objects.exists())
+
+
+@override_settings(CACHES=TEST_CACHES)
+@NO_RPC_CACHE
+class RequestMetricsMiddlewareTests(TestCase):
+    """
+    Die Middleware läuft unter ASGI asynchron und misst trotzdem RPC-Zeit und Gesamtdauer.
+    """
+    async def test_async_chain_stays_async(self):
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        middleware = RequestMetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        self.assertIn("total;dur=", response["Server-Timing"])
+        self.assertFalse(iscoroutinefunction(RequestMetricsMiddleware(lambda request: HttpResponse("ok"))))
+
+    async def test_async_view_through_middleware(self):
+        fixtures = synthetic_fixtures(3, seed=9)
+        url = reverse("wallet_manager:wallet_transactions_async", args=[fixtures.address])
+        with MockRPCServer(fixtures) as rpc, mock.patch.dict(os.environ, {"SOLANA_RPC_ENDPOINTS": rpc.url}):
+            response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(rpc.stats["calls.getSignaturesForAddress"], 1)
+        self.assertIn('rpc;dur=', response["Server-Timing"])
+        self.assertContains(response, fixtures.signatures[0]["signature"][:20])
+
+
+class SyncTruncationTests(TestCase):
+    """
+    Abschneiden an Signaturen ohne Details in sync.py, damit keine Lücke hinter gespeicherten Transaktionen bleibt.
+    """
+    def setUp(self):
+        self.fixtures = synthetic_fixtures(6, seed=8)
+        self.signatures = _signatures(self.fixtures)
+        self.details = dict(self.fixtures.transactions)
+        self.wallet = Wallet.objects.create(address=self.fixtures.address)
+        self.other = Wallet.objects.create(address="Other1111111111111111111111111111111111111")
+
+    def _api(self, rpc):
+        return SolanaAPI(rpc_endpoint=rpc.url, cache=RPCCache())
+
+    def test_new_transactions_stop_at_oldest_failure(self):
+        # Neueste zuerst: s2 fehlt, s1 ist bereits über ein anderes Wallet gespeichert.
+        del self.fixtures.transactions[self.signatures[2]]
+        ingest_transactions(self.other, [self.details[self.signatures[1]]])
+        with MockRPCServer(self.fixtures) as rpc:
+            inserted = sync_new_transactions(self.wallet, self._api(rpc), initial_limit=6)
+        self.assertEqual(inserted, 3)
+        # s1 liegt vor der Fehlerstelle und wird auch nicht verknüpft.
+        self.assertEqual(_linked(self.wallet), set(self.signatures[3:]))
+
+    def test_older_transactions_stop_at_newest_failure(self):
+        ingest_transactions(self.wallet, [self.details[self.signatures[0]]])
+        del self.fixtures.transactions[self.signatures[3]]
+        ingest_transactions(self.other, [self.details[self.signatures[4]]])
+        with MockRPCServer(self.fixtures) as rpc:
+            stored = sync_older_transactions(self.wallet, self._api(rpc), limit=5)
+        self.assertEqual(stored, 2)
+        self.assertEqual(_linked(self.wallet), set(self.signatures[:3]))
+
+    def test_unavailable_signatures_abort_sync(self):
+        ingest_transactions(self.wallet, [self.details[self.signatures[3]]])
+        with MockRPCServer(self.fixtures, error_rate=1.0) as rpc:
+            with self.assertRaises(SignaturesUnavailable):
+                sync_new_transactions(self.wallet, self._api(rpc))
+        self.assertEqual(_linked(self.wallet), {self.signatures[3]})
+
+    def test_notified_signatures_need_all_details(self):
+        del self.fixtures.transactions[self.signatures[1]]
+        with MockRPCServer(self.fixtures) as rpc:
+            self.assertIsNone(sync_notified_signatures(self.wallet, self._api(rpc), self.signatures[:2]))
+            self.assertEqual(sync_notified_signatures(self.wallet, self._api(rpc), self.signatures[2:4]), 2)
+        self.assertEqual(_linked(self.wallet), set(self.signatures[2:4]))
+
+
+class BenchmarkTests(TestCase):
+    """
+    sync-Stufe von `manage.py benchmark` mit eingestreuten Fehlern und Rate Limits des Mock-Servers.
+    """
+    @mock.patch.dict(os.environ, {"SOLANA_RPC_RETRY_BASE_DELAY": "0"})
+    def test_sync_with_error_injection(self):
+        fixtures = synthetic_fixtures(200, seed=16)
+        with MockRPCServer(fixtures, error_rate=0.05, rate_limit_rate=0.1, seed=16) as rpc:
+            result = benchmark_sync(fixtures, rpc, page_size=50, trace_memory=False)
+        self.assertGreater(rpc.stats["injected_errors"], 0)
+        self.assertGreater(result["signatures_unavailable"], 0)
+        self.assertEqual(result["transactions"], WalletTransaction.objects.count())
+        self.assertEqual(result["complete"], result["transactions"] == len(fixtures))
+
+class WalletSubscriberTests(TransactionTestCase):
+    """
+    WebSocket-Ingester gegen `MockWebSocketServer`; die Verarbeitung läuft in Threads mit eigener DB-Verbindung.
+    """
+    def _run(self, subscriber: WalletSubscriber, until, timeout: float = 10.0) -> None:
+        async def main():
+            stop = asyncio.Event()
+            task = asyncio.create_task(subscriber.run(stop))
+            deadline = time.monotonic() + timeout
+            while not until() and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            stop.set()
+            await task
+        asyncio.run(main())
+
+    @staticmethod
+    def _passed(notified_sync) -> set:
+        return {signature for call in notified_sync.call_args_list for signature in call.args[2]}
+
+    def test_notification_imports_signatures(self):
+        fixtures = synthetic_fixtures(5, seed=3)
+        wallet = Wallet.objects.create(address=fixtures.address)
+        notified = [sig_info["signature"] for sig_info in fixtures.signatures[:2]]
+        with MockRPCServer(fixtures) as rpc, MockWebSocketServer(fixtures, notify=2, notify_delay=0.2) as ws_server:
+            subscriber = WalletSubscriber(ws_server.url, SolanaAPI(rpc_endpoint=rpc.url), concurrency=1,
+                                          account_updates=False)
+            with mock.patch("wallet_manager.subscriptions.sync_notified_signatures",
+                            wraps=sync_notified_signatures) as notified_sync, \
+                    mock.patch("wallet_manager.subscriptions.sync_new_transactions", return_value=0) as gap_sync:
+                self._run(subscriber, lambda: len(self._passed(notified_sync)) == len(notified))
+
+        self.assertEqual(ws_server.stats["calls.logsSubscribe"], 1)
+        # Gespeicherte Signaturen dienen als `until` für das finalisierte getSignaturesForAddress.
+        self.assertEqual(ws_server.stats["commitment.finalized"], 1)
+        self.assertEqual(ws_server.stats["notifications"], 2)
+        self.assertEqual(subscriber.stats["notifications"], 2)
+        gap_sync.assert_called_once()
+        self.assertEqual(subscriber.stats["gap_syncs"], 1)
+        self.assertEqual({call.args[0].pk for call in notified_sync.call_args_list}, {wallet.pk})
+        self.assertEqual(self._passed(notified_sync), set(notified))
+        self.assertEqual(_linked(wallet), set(notified))
@@ -5,6 +5,13 @@ app_name = 'wallet_manager'
 
 urlpatterns = [
     path('wallet/<str:address>/transactions/', views.wallet_transactions_view, name='wallet_transactions'),
-    # Wir könnten hier später eine Übersichtsseite für alle Wallets hinzufügen
-    # path('', views.dashboard_view, name='dashboard'),
+    # Asynchrone Variante, nur sinnvoll unter einem ASGI-Server (siehe solana_steuer_tool/asgi.py)
+    path('wallet/<str:address>/transactions/async/', views.wallet_transactions_async_view, name='wallet_transactions_async'),
+    # Gebühr und Beschreibung für Zeilen, die nur aus der Signaturliste gerendert wurden (per JavaScript nachgeladen)
+    path('wallet/<str:address>/transactions/details/', views.wallet_transaction_details_view, name='wallet_transaction_details'),
+    # CSV-Export (gestreamt) der gespeicherten Transaktionen und der Steuerergebnisse
+    path('wallet/<str:address>/export/transactions.csv', views.wallet_transactions_export_view, name='wallet_transactions_export'),
+    path('wallet/<str:address>/export/tax.csv', views.wallet_tax_export_view, name='wallet_tax_export'),
+    # Übersichtsseite für alle Wallets (aus den Tageswerten, siehe rollups.py)
+    path('', views.dashboard_view, name='dashboard'),
 ]
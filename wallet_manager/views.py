@@ -1,42 +1,57 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Max, Sum
 from django.shortcuts import render
-from django.http import Http404
-from .solana_utils import SolanaAPI
-from .models import Wallet # Importieren wir, auch wenn wir es in dieser View noch nicht direkt zum Speichern nutzen
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+                         StreamingHttpResponse)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .solana_utils import AsyncSolanaAPI, SolanaAPI, is_valid_address
+from .models import (BackfillCheckpoint, SyncJob, Transaction, Wallet, WalletDailyFlow, WalletDailySummary,
+                     WalletTransaction)
+from .decoder import NATIVE_SOL_MINT, SOL_DECIMALS, describe_transaction, format_token_amount
+from .export import tax_rows, transaction_rows
+from .jobs import current_job, enqueue_sync, queue_position
+from .metrics import collect, render_prometheus, template_timer
+from .page_cache import get_cached_page, mark_synced, page_etag, set_cached_page, sync_due, wallet_version
+from .prices import lookup_prices
+from .queries import after_key
+from urllib.parse import urlencode
+from typing import Optional
 import datetime
+import hmac
+import os
 
-def wallet_transactions_view(request, address: str):
-    """
-    Zeigt die letzten Transaktionen für eine gegebene Solana-Wallet-Adresse an.
-    """
-    sol_api = SolanaAPI()
+# Anzahl der Transaktionen pro Seite (Standard) und Obergrenze für den Parameter `?limit=`.
+TRANSACTIONS_PER_PAGE = int(os.getenv("TRANSACTIONS_PER_PAGE", "10"))
+MAX_TRANSACTIONS_PER_PAGE = int(os.getenv("MAX_TRANSACTIONS_PER_PAGE", "100"))
+# Solange ein Abgleich aussteht oder läuft, lädt sich die Übersicht nach so vielen Sekunden neu.
+SYNC_REFRESH_SECONDS = int(os.getenv("SYNC_REFRESH_SECONDS", "3"))
+# Solange für ein Wallet noch nichts gespeichert ist, zeigt die Übersicht die Signaturliste (ein RPC-Aufruf)
+# und lädt Gebühr und Beschreibung nachträglich über `wallet_transaction_details_view`.
+SIGNATURE_PREVIEW = os.getenv("WALLET_SIGNATURE_PREVIEW", "true").lower() not in ("0", "false", "no")
 
-    # Überprüfen, ob die Adresse gültig ist (rudimentäre Prüfung, Solana-Adressen sind typischerweise 32-44 Zeichen lang)
-    # Eine korrekte Validierung würde die Base58-Dekodierung und Längenprüfung beinhalten.
-    if not (32 <= len(address) <= 44 and address.isalnum()): # Einfache Prüfung
-        # In einer echten Anwendung wäre hier eine robustere Adressvalidierung nötig
-        # oder man verlässt sich darauf, dass die SolanaAPI Fehler wirft.
-        # raise Http404("Ungültige Solana-Adresse.")
-        # Fürs Erste versuchen wir es einfach, die API kümmert sich um Fehler bei ungültigen Adressen.
-        pass
-
-    if not sol_api.is_connected():
-        # Hier könnten wir eine Fehlerseite oder eine Nachricht rendern
-        # Fürs Erste eine einfache Ausgabe im Kontext.
-        context = {
-            'address': address,
-            'error_message': f"Verbindung zum Solana RPC-Endpunkt ({sol_api.rpc_endpoint}) fehlgeschlagen.",
-            'transactions': []
-        }
-        return render(request, 'wallet_manager/transaction_list.html', context, status=503)
+# Zeitraum der Übersicht aller Wallets in Tagen (Standard) und Obergrenze für den Parameter `?days=`.
+DASHBOARD_DAYS = int(os.getenv("DASHBOARD_DAYS", "30"))
+MAX_DASHBOARD_DAYS = int(os.getenv("MAX_DASHBOARD_DAYS", "366"))
 
-    # Rufe die letzten N Transaktionen ab (z.B. 10)
-    # In einer echten Anwendung sollte die Anzahl konfigurierbar sein oder Paginierung implementiert werden.
-    raw_transactions = sol_api.get_transactions_for_address(address, limit=10)
+# Sortierschlüssel der Übersicht, abgedeckt durch den Index (wallet, -block_time) der Verknüpfungstabelle
+# (die ID ist als Primärschlüssel in jedem Index enthalten).
+PAGE_KEY = ('block_time', 'id')
 
-    # Aufbereitung der Transaktionsdaten für das Template
-    # Die Struktur von `raw_transactions` (Details von get_transaction) ist komplex.
-    # Wir extrahieren hier nur einige Schlüsselelemente.
+def _render(request, context, status=200):
+    """
+    Rendert die Transaktionsübersicht; die Dauer zählt als Template-Zeit des Seitenaufrufs (siehe metrics.py).
+    """
+    with template_timer():
+        return render(request, 'wallet_manager/transaction_list.html', context, status=status)
 
+def _build_display_transactions(raw_transactions):
+    """
+    Bereitet die Rohdaten von get_transaction für das Template auf.
+    Die Struktur von `raw_transactions` (Details von get_transaction) ist komplex.
+    Wir extrahieren hier nur einige Schlüsselelemente.
+    """
     display_transactions = []
     if raw_transactions:
         for tx_detail in raw_transactions:
@@ -51,29 +66,7 @@ def wallet_transactions_view(request, address: str):
                 err = tx_detail.get("meta", {}).get("err")
                 status = "Fehlgeschlagen" if err else "Erfolgreich"
 
-                # Versuch, eine einfache Beschreibung zu generieren
-                # Dies ist sehr rudimentär und müsste für verschiedene Transaktionstypen erweitert werden.
-                description = "Transaktion"
-                instructions = tx_detail.get("transaction", {}).get("message", {}).get("instructions", [])
-                if instructions:
-                    first_instruction_type = instructions[0].get("parsed", {}).get("type", "Unbekannt")
-                    # Beispiel: 'transfer', 'createAccount', 'vote', etc.
-                    # Dies kann für eine erste Beschreibung verwendet werden.
-                    description = f"Typ: {first_instruction_type}"
-
-                    # Spezifischer für Transfers (SOL oder SPL Token)
-                    if first_instruction_type == "transfer" or first_instruction_type == "transferChecked":
-                        info = instructions[0].get("parsed", {}).get("info", {})
-                        source = info.get("source")
-                        destination = info.get("destination")
-                        amount_lamports = info.get("lamports")
-                        amount_tokens = info.get("tokenAmount", {}).get("uiAmountString") # Für SPL Tokens
-
-                        if amount_tokens: # SPL Token Transfer
-                            description = f"Token Transfer: {amount_tokens} von {source[:5]}... zu {destination[:5]}..."
-                        elif amount_lamports: # SOL Transfer
-                            description = f"SOL Transfer: {amount_lamports / 1e9:.6f} SOL von {source[:5]}... zu {destination[:5]}..."
-
+                description = describe_transaction(tx_detail)
 
                 display_transactions.append({
                     'signature': signature,
@@ -96,18 +89,435 @@ def wallet_transactions_view(request, address: str):
                     'description': 'Konnte Transaktionsdetails nicht laden',
                     'raw': None
                 })
+    return display_transactions
+
+
+def _display_from_model(tx):
+    """
+    Bereitet eine gespeicherte `Transaction` für das Template auf.
+    """
+    return {
+        'signature': tx.signature,
+        'block_time_unix': tx.block_time,
+        'block_time_readable': datetime.datetime.fromtimestamp(tx.block_time).strftime('%Y-%m-%d %H:%M:%S UTC') if tx.block_time else "N/A",
+        'slot': tx.slot,
+        'fee_lamports': tx.fee,
+        'status': "Erfolgreich" if tx.success else "Fehlgeschlagen",
+        'description': tx.description or "Transaktion",
+    }
+
+
+def _display_from_signature(sig_info):
+    """
+    Bereitet einen Eintrag von get_signatures_for_address für das Template auf. Gebühr und Beschreibung
+    fehlen dort; das Template lädt sie über `details_url` nach. Ein Memo dient bis dahin als Beschreibung.
+    """
+    block_time_unix = sig_info.get("blockTime")
+    return {
+        'signature': sig_info.get("signature"),
+        'block_time_unix': block_time_unix,
+        'block_time_readable': datetime.datetime.fromtimestamp(block_time_unix).strftime('%Y-%m-%d %H:%M:%S UTC') if block_time_unix else "N/A",
+        'slot': sig_info.get("slot", "N/A"),
+        'fee_lamports': None,
+        'status': "Fehlgeschlagen" if sig_info.get("err") else "Erfolgreich",
+        'description': sig_info.get("memo"),
+        'details_pending': True,
+    }
+
+
+def _detail_fields(display):
+    return {key: display[key] for key in ('fee_lamports', 'status', 'description')}
+
+
+def _page_size(request) -> int:
+    """
+    Seitengröße aus `?limit=`, begrenzt auf 1 bis MAX_TRANSACTIONS_PER_PAGE.
+    """
+    try:
+        page_size = int(request.GET.get('limit', TRANSACTIONS_PER_PAGE))
+    except ValueError:
+        page_size = TRANSACTIONS_PER_PAGE
+    return max(1, min(page_size, MAX_TRANSACTIONS_PER_PAGE))
+
+
+def _parse_cursor(value):
+    """
+    Zerlegt einen Cursor der Form "<block_time>,<signatur>" in ein Tupel, oder None bei ungültigem Wert.
+    """
+    block_time, _, signature = (value or '').partition(',')
+    if not block_time.isdigit() or not signature:
+        return None
+    return int(block_time), signature
+
+
+def _format_cursor(link) -> str:
+    return f"{link.block_time},{link.transaction.signature}"
+
+
+def _page_links(wallet, before, after, page_size):
+    """
+    Liest eine Seite von Verknüpfungen per Keyset-Paginierung (ohne OFFSET), neueste zuerst.
+
+    Der Cursor (block_time, Signatur) wird über die Signatur in den Sortierschlüssel (block_time, id)
+    übersetzt, sodass jede Seite eine Bereichsabfrage auf dem Index ist, egal wie weit hinten sie liegt.
+
+    :return: Tupel (Verknüpfungen der Seite, ob es in Blätterrichtung weitere Einträge gibt).
+    """
+    links = WalletTransaction.objects.filter(wallet=wallet)
+    cursor = before or after
+    if cursor:
+        block_time, signature = cursor
+        link_id = links.filter(block_time=block_time, transaction__signature=signature).values_list('id', flat=True).first()
+        # Unbekannte Signatur: nur nach block_time blättern.
+        if link_id is None:
+            link_id = 0 if before else 2 ** 63 - 1
+        links = links.filter(after_key(PAGE_KEY, (block_time, link_id), descending=bool(before)))
+    order = ('block_time', 'id') if after else ('-block_time', '-id')
+    page = list(links.order_by(*order)
+                .select_related('transaction')
+                .only('block_time', 'transaction', 'transaction__signature', 'transaction__block_time', 'transaction__slot',
+                      'transaction__fee', 'transaction__description', 'transaction__success')
+                [:page_size + 1])
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    if after:
+        page.reverse()
+    return page, has_more
+
+
+def _newest_signature(wallet):
+    return (WalletTransaction.objects.filter(wallet=wallet).order_by('-block_time', '-id')
+            .values_list('transaction__signature', flat=True).first())
+
+
+def _with_cache_headers(response, etag: str, last_modified: Optional[float]):
+    """
+    Setzt ETag und Last-Modified (ohne `last_modified` nur das ETag); `no-cache` lässt Browser und Proxys
+    die Seite bei jedem Aufruf revalidieren.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(int(last_modified))
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _page_last_modified(version: float, job) -> Optional[float]:
+    """
+    Last-Modified der Übersicht. Solange ein Sync-Auftrag aussteht oder läuft, ändert sich die Seite
+    (Fortschrittsanzeige), ohne dass sich das Wallet ändert; dann gilt allein das ETag.
+    """
+    if job is not None and job.status in (SyncJob.STATUS_PENDING, SyncJob.STATUS_RUNNING):
+        return None
+    return version
+
+
+def _history_complete(wallet) -> bool:
+    return BackfillCheckpoint.objects.filter(wallet=wallet, completed=True).exists()
+
+
+def _sync_progress(job):
+    """
+    Fortschrittsanzeige für den aktuellen Sync-Auftrag.
+
+    :return: Tupel (Hinweis zum laufenden Abgleich oder None, Warnung bei fehlgeschlagenem Abgleich oder None).
+    """
+    if job is None or job.status == SyncJob.STATUS_DONE:
+        return None, None
+    if job.status == SyncJob.STATUS_FAILED:
+        return None, f"Abgleich mit dem RPC-Endpunkt fehlgeschlagen ({job.error}). Es werden die gespeicherten Transaktionen angezeigt."
+    what = "Ältere Transaktionen werden" if job.kind == SyncJob.KIND_OLDER else "Neue Transaktionen werden"
+    if job.status == SyncJob.STATUS_RUNNING:
+        return f"{what} gerade abgerufen ...", None
+    if job.error:
+        return f"{what} abgerufen, sobald der RPC-Endpunkt wieder erreichbar ist (letzter Fehler: {job.error}).", None
+    position = queue_position(job)
+    waiting = f" ({position} Aufträge davor)" if position else ""
+    return f"{what} im Hintergrund abgerufen{waiting} ...", None
+
+
+def dashboard_view(request):
+    """
+    Übersicht aller verfolgten Wallets: Transaktionen, gezahlte Gebühren und Netto-Zu-/Abflüsse (SOL und Token)
+    im Zeitraum `?days=` sowie die Werte pro Tag.
+
+    Gelesen werden nur die beim Import fortgeschriebenen Tageswerte (siehe rollups.py), nicht die Transaktionen.
+    Die Anzahl der Abfragen ist fest und die gelesenen Zeilen wachsen mit Wallets mal Tagen, nicht mit den Transaktionen.
+    """
+    try:
+        days = int(request.GET.get('days', DASHBOARD_DAYS))
+    except ValueError:
+        days = DASHBOARD_DAYS
+    days = max(1, min(days, MAX_DASHBOARD_DAYS))
+    until = datetime.datetime.now(datetime.timezone.utc).date()
+    since = until - datetime.timedelta(days=days - 1)
+
+    entries = {
+        wallet.pk: {'wallet': wallet, 'transaction_count': 0, 'failed_count': 0, 'fees_paid': 0, 'net_sol': 0, 'tokens': [], 'days': {}}
+        for wallet in Wallet.objects.only('id', 'address', 'name').order_by('name', 'address')
+    }
+    for row in (WalletDailySummary.objects.filter(day__gte=since, day__lte=until)
+                .values_list('wallet_id', 'day', 'transaction_count', 'failed_count', 'fees_paid')):
+        wallet_id, day, transaction_count, failed_count, fees_paid = row
+        entry = entries.get(wallet_id)
+        if entry is None:
+            continue
+        entry['transaction_count'] += transaction_count
+        entry['failed_count'] += failed_count
+        entry['fees_paid'] += fees_paid
+        entry['days'][day] = {'day': day, 'transaction_count': transaction_count, 'failed_count': failed_count,
+                              'fees_sol': format_token_amount(fees_paid, SOL_DECIMALS), 'net_sol': format_token_amount(0, SOL_DECIMALS)}
+    for wallet_id, day, net_flow in (WalletDailyFlow.objects.filter(day__gte=since, day__lte=until, mint=NATIVE_SOL_MINT)
+                                     .values_list('wallet_id', 'day', 'net_flow')):
+        day_entry = entries.get(wallet_id, {}).get('days', {}).get(day)
+        if day_entry is not None:
+            day_entry['net_sol'] = format_token_amount(int(net_flow), SOL_DECIMALS)
+    for row in (WalletDailyFlow.objects.filter(day__gte=since, day__lte=until).values('wallet_id', 'mint').order_by()
+                .annotate(net_flow=Sum('net_flow'), decimals=Max('decimals'))):
+        entry = entries.get(row['wallet_id'])
+        if entry is None:
+            continue
+        if row['mint'] == NATIVE_SOL_MINT:
+            entry['net_sol'] = int(row['net_flow'])
+        elif row['net_flow']:
+            entry['tokens'].append({'mint': row['mint'], 'net_flow': format_token_amount(int(row['net_flow']), row['decimals'])})
+
+    wallets = []
+    for entry in entries.values():
+        entry['fees_sol'] = format_token_amount(entry['fees_paid'], SOL_DECIMALS)
+        entry['net_sol'] = format_token_amount(entry['net_sol'], SOL_DECIMALS)
+        entry['tokens'].sort(key=lambda token: token['mint'])
+        entry['days'] = sorted(entry['days'].values(), key=lambda day_entry: day_entry['day'], reverse=True)
+        wallets.append(entry)
+
+    context = {
+        'wallets': wallets,
+        'days': days,
+        'since': since,
+        'until': until,
+        'transaction_count': sum(entry['transaction_count'] for entry in wallets),
+        'fees_sol': format_token_amount(sum(entry['fees_paid'] for entry in wallets), SOL_DECIMALS),
+    }
+    with template_timer():
+        return render(request, 'wallet_manager/dashboard.html', context)
+
+
+def wallet_transactions_view(request, address: str):
+    """
+    Zeigt die letzten Transaktionen für eine gegebene Solana-Wallet-Adresse an.
+
+    Die Transaktionen werden aus der Datenbank gelesen. Der Abgleich mit dem RPC-Endpunkt wird nur als
+    Auftrag eingestellt und von `run_sync_worker` ausgeführt (siehe jobs.py), sodass die Antwortzeit nicht
+    von der Anzahl der RPC-Aufrufe abhängt. Solange der Abgleich läuft, lädt sich die Seite neu.
+
+    Geblättert wird mit `?before=<block_time>,<signatur>` (ältere) bzw. `?after=...` (neuere Einträge),
+    die Seitengröße mit `?limit=`.
+    """
+    # Ungültige Adressen (z.B. von Crawlern) dürfen weder ein Wallet anlegen noch einen Sync-Auftrag einstellen.
+    if not is_valid_address(address):
+        return HttpResponseBadRequest("Ungültige Solana-Adresse.")
+    sol_api = SolanaAPI()
 
+    wallet, _ = Wallet.objects.get_or_create(address=address)
+    page_size = _page_size(request)
+    before = _parse_cursor(request.GET.get('before'))
+    after = None if before else _parse_cursor(request.GET.get('after'))
+
+    # Abgleich der seit dem letzten Besuch neuen Transaktionen einstellen. Innerhalb von
+    # WALLET_SYNC_INTERVAL nach dem letzten Abgleich wird kein weiterer Auftrag eingestellt.
+    if sync_due(wallet.pk):
+        enqueue_sync(wallet, SyncJob.KIND_NEW, limit=page_size)
+        mark_synced(wallet.pk)
+    job = current_job(wallet)
+
+    # Unveränderte Seiten: 304 anhand von ETag/Last-Modified oder die gecachte Seite ohne erneutes Rendern.
+    # Der Stand des Sync-Auftrags gehört zur Seite (Fortschrittsanzeige).
+    # Die Version wird einmal vor dem Lesen bestimmt und gilt für ETag, Last-Modified und Cache-Schlüssel.
+    page_params = (before, after, page_size, job and (job.pk, job.status, job.error))
+    last_modified = wallet_version(wallet.pk)
+    newest_signature = _newest_signature(wallet)
+    etag = page_etag(wallet.pk, last_modified, newest_signature, *page_params)
+    page_modified = _page_last_modified(last_modified, job)
+    not_modified = get_conditional_response(request, etag=etag,
+                                            last_modified=int(page_modified) if page_modified is not None else None)
+    if not_modified is not None:
+        return _with_cache_headers(not_modified, etag, page_modified)
+    cached_page = get_cached_page(etag)
+    if cached_page is not None:
+        return _with_cache_headers(HttpResponse(cached_page), etag, page_modified)
+
+    links, has_more = _page_links(wallet, before, after, page_size)
+    history_complete = _history_complete(wallet)
+    # Ältere Seiten, die noch nicht gespeichert sind, werden per `before=<älteste gespeicherte Signatur>`
+    # im Hintergrund nachgeladen, solange der Backfill die Historie nicht vollständig importiert hat.
+    if before and not has_more and not history_complete and not (job and job.status in (SyncJob.STATUS_PENDING, SyncJob.STATUS_RUNNING)):
+        job = enqueue_sync(wallet, SyncJob.KIND_OLDER, limit=page_size + 1 - len(links))
+        page_params = (before, after, page_size, (job.pk, job.status, job.error))
+        etag = page_etag(wallet.pk, last_modified, newest_signature, *page_params)
+        page_modified = _page_last_modified(last_modified, job)
+    sync_message, warning_message = _sync_progress(job)
+    display_transactions = [_display_from_model(link.transaction) for link in links]
+    details_url = None
+    # Erster Besuch: Bis der Sync-Auftrag Transaktionen gespeichert hat, wird die Signaturliste angezeigt statt einer
+    # leeren Seite. Der Auftrag erhält dieselbe Liste danach aus dem RPC-Cache (siehe rpc_cache.py).
+    if (SIGNATURE_PREVIEW and not links and not before and not after
+            and job and job.status in (SyncJob.STATUS_PENDING, SyncJob.STATUS_RUNNING)):
+        display_transactions = [_display_from_signature(sig_info)
+                                for sig_info in sol_api.get_transaction_signatures(address, limit=page_size)
+                                if sig_info.get("signature")]
+        details_url = reverse('wallet_manager:wallet_transaction_details', args=[address])
+
+    # Ältere Seite: vor dem letzten angezeigten Eintrag; neuere Seite: nach dem ersten.
+    # Auf der ersten Seite wird die ältere Seite auch angeboten, wenn sie noch nicht gespeichert ist.
+    next_query = previous_query = None
+    if links and (has_more or after or (not before and len(links) == page_size and not history_complete)):
+        next_query = urlencode({'before': _format_cursor(links[-1]), 'limit': page_size})
+    if links and (has_more if after else before is not None):
+        previous_query = urlencode({'after': _format_cursor(links[0]), 'limit': page_size})
+
+    if warning_message and not display_transactions:
+        context = {
+            'address': address,
+            'error_message': f"Abgleich mit dem Solana RPC-Endpunkt ({sol_api.rpc_endpoint}) fehlgeschlagen: {job.error}",
+            'transactions': []
+        }
+        return _render(request, context, status=503)
 
     context = {
         'address': address,
         'transactions': display_transactions,
         'rpc_endpoint': sol_api.rpc_endpoint,
-        'error_message': None # Wird gesetzt, falls die Verbindung fehlschlägt (siehe oben)
+        'error_message': None,
+        'warning_message': warning_message,
+        'sync_message': sync_message,
+        'refresh_seconds': SYNC_REFRESH_SECONDS if sync_message else None,
+        'page_size': page_size,
+        'next_query': next_query,
+        'previous_query': previous_query,
+        'details_url': details_url,
     }
 
-    # Hier würden wir normalerweise die Transaktionen auch in der Datenbank speichern/aktualisieren.
-    # z.B. Wallet.objects.get_or_create(address=address)
-    # Dann für jede tx_detail: Transaction.objects.update_or_create(signature=..., defaults={...})
-    # Das heben wir uns für eine spätere Iteration auf, um diesen Schritt fokussiert zu halten.
+    response = _render(request, context)
+    set_cached_page(etag, response.content)
+    return _with_cache_headers(response, etag, page_modified)
+
+
+async def wallet_transactions_async_view(request, address: str):
+    """
+    Asynchrone Variante von `wallet_transactions_view`.
+
+    Die Seite wird allein aus der Signaturliste gerendert (ein RPC-Aufruf über `AsyncSolanaAPI`); Gebühr und
+    Beschreibung lädt der Browser danach gesammelt über `wallet_transaction_details_view`. Unter einem
+    ASGI-Server (siehe `solana_steuer_tool/asgi.py`) blockiert ein Seitenaufruf damit keinen Worker.
+    Die Seitengröße (`?limit=`) gilt wie bei `wallet_transactions_view`.
+    """
+    if not is_valid_address(address):
+        return HttpResponseBadRequest("Ungültige Solana-Adresse.")
+    page_size = _page_size(request)
+    async with AsyncSolanaAPI() as sol_api:
+        if not await sol_api.is_connected():
+            context = {
+                'address': address,
+                'error_message': f"Verbindung zum Solana RPC-Endpunkt ({sol_api.rpc_endpoint}) fehlgeschlagen.",
+                'transactions': []
+            }
+            return _render(request, context, status=503)
+
+        signatures = await sol_api.get_transaction_signatures(address, limit=page_size)
 
-    return render(request, 'wallet_manager/transaction_list.html', context)
+    context = {
+        'address': address,
+        'transactions': [_display_from_signature(sig_info) for sig_info in signatures if sig_info.get("signature")],
+        'rpc_endpoint': sol_api.rpc_endpoint,
+        'error_message': None,
+        'page_size': page_size,
+        'details_url': reverse('wallet_manager:wallet_transaction_details', args=[address]),
+    }
+    return _render(request, context)
+
+
+DETAIL_FIELDS = ('signature', 'block_time', 'slot', 'fee', 'description', 'success')
+
+
+def _stored_details(signatures, address=None):
+    """
+    Detailfelder gespeicherter Transaktionen, mit `address` nur solche, die mit diesem Wallet verknüpft sind.
+    """
+    queryset = Transaction.objects.filter(signature__in=signatures)
+    if address is not None:
+        queryset = queryset.filter(wallet_links__wallet__address=address)
+    return {tx.signature: _detail_fields(_display_from_model(tx)) for tx in queryset.only(*DETAIL_FIELDS)}
+
+
+async def wallet_transaction_details_view(request, address: str):
+    """
+    Gebühr, Status und Beschreibung zu `?signatures=<sig1>,<sig2>,...` (höchstens eine Seite, `?limit=`) als JSON,
+    für Zeilen, die aus der Signaturliste gerendert wurden.
+
+    Beantwortet werden nur Signaturen dieses Wallets: mit ihm verknüpfte Transaktionen aus der Datenbank und
+    Signaturen aus seiner Signaturliste (dieselbe, gecachte Liste, aus der die Seite gerendert wurde). Davon
+    noch nicht gespeicherte kommen über `AsyncSolanaAPI.get_transaction_details_batch` (Batches nebenläufig,
+    finalisierte aus dem RPC-Cache); unter ASGI blockiert das Warten darauf keinen Worker. Fremde und nicht
+    abrufbare Signaturen sind `null`.
+    """
+    if not is_valid_address(address):
+        return HttpResponseBadRequest("Ungültige Solana-Adresse.")
+    page_size = _page_size(request)
+    signatures = [signature for signature in request.GET.get('signatures', '').split(',') if signature][:page_size]
+    if not signatures:
+        return HttpResponseBadRequest("Parameter `signatures` fehlt.")
+
+    details = await sync_to_async(_stored_details)(signatures, address)
+    remaining = [signature for signature in signatures if signature not in details]
+    if remaining:
+        async with AsyncSolanaAPI() as sol_api:
+            listed = {sig_info.get("signature") for sig_info in await sol_api.get_transaction_signatures(address, limit=page_size)}
+            remaining = [signature for signature in remaining if signature in listed]
+            details.update(await sync_to_async(_stored_details)(remaining))
+            missing = [signature for signature in remaining if signature not in details]
+            if missing:
+                fetched = await sol_api.get_transaction_details_batch(missing)
+                for signature in missing:
+                    tx_detail = fetched.get(signature)
+                    details[signature] = _detail_fields(_build_display_transactions([tx_detail])[0]) if tx_detail else None
+    return JsonResponse({'transactions': {signature: details.get(signature) for signature in signatures}})
+
+
+def _csv_response(rows, filename: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(rows, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def wallet_transactions_export_view(request, address: str):
+    """
+    Exportiert alle gespeicherten Transaktionen eines Wallets als CSV.
+
+    Die Antwort wird gestreamt (siehe export.py); es findet kein Abruf vom RPC-Endpunkt statt.
+    """
+    wallet = Wallet.objects.filter(address=address).first()
+    if wallet is None:
+        raise Http404("Für dieses Wallet sind keine Transaktionen gespeichert.")
+    return _csv_response(transaction_rows(wallet), f"transaktionen_{address}.csv")
+
+
+def wallet_tax_export_view(request, address: str):
+    """
+    Exportiert die Abgänge eines Wallets mit FIFO-Anschaffungskosten, Gewinnen und Haltefrist als CSV.
+    """
+    wallet = Wallet.objects.filter(address=address).first()
+    if wallet is None:
+        raise Http404("Für dieses Wallet sind keine Transaktionen gespeichert.")
+    return _csv_response(tax_rows(wallet, lookup_prices), f"steuer_{address}.csv")
+
+
+def metrics_view(request):
+    """
+    Kennzahlen aller Worker dieses Hosts im Textformat von Prometheus (siehe metrics.py).
+
+    Ist METRICS_TOKEN gesetzt, muss der Abruf den Header `Authorization: Bearer <token>` senden.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")